@@ -7,11 +7,19 @@ Checks the status of bridge transactions
 import json
 import sys
 import os
+import time
 import urllib.request
 import urllib.error
 from typing import Dict, Optional
 from datetime import datetime
 
+# The block timestamp store is shared with the onchain-analysis skill
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "onchain-analysis", "scripts"))
+try:
+    from block_timestamps import get_store
+except ImportError:
+    get_store = None
+
 # Chain configurations for explorers
 # RPC URLs sourced from Chainlist.org (https://chainlist.org)
 CHAIN_EXPLORERS = {
@@ -140,6 +148,43 @@ def get_tx_status(tx_hash: str, chain: str) -> Dict:
         return {"status": "error", "error": str(e)}
 
 
+def get_block_timestamp(block_number: int, chain: str) -> Optional[int]:
+    """Get block timestamp, consulting the shared block timestamp store first"""
+    config = CHAIN_EXPLORERS.get(chain.lower())
+    if not config or not block_number:
+        return None
+
+    store = get_store(chain.lower()) if get_store else None
+    if store:
+        cached = store.get(block_number)
+        if cached is not None:
+            return cached
+
+    api_key = os.getenv(config["api_key_env"]) or os.getenv("ETHERSCAN_API_KEY")
+
+    params = {
+        "module": "proxy",
+        "action": "eth_getBlockByNumber",
+        "tag": hex(block_number),
+        "boolean": "false"
+    }
+
+    try:
+        data = fetch_api(config["api_url"], params, api_key)
+        block = data.get("result")
+        if not isinstance(block, dict):
+            return None
+        timestamp = int(block.get("timestamp", "0x0"), 16)
+    except (ConnectionError, ValueError):
+        return None
+
+    if store and timestamp:
+        store.put(block_number, timestamp)
+        store.flush()
+
+    return timestamp or None
+
+
 def check_bridge_status(bridge: str, tx_hash: str, source_chain: str, dest_chain: str = None) -> Dict:
     """Check bridge transaction status"""
     bridge = bridge.lower()
@@ -150,6 +195,8 @@ def check_bridge_status(bridge: str, tx_hash: str, source_chain: str, dest_chain
 
     bridge_info = BRIDGE_STATUS_INFO.get(bridge, {})
 
+    block_time = get_block_timestamp(source_status.get("block_number"), source_chain)
+
     result = {
         "success": True,
         "timestamp": datetime.utcnow().isoformat(),
@@ -160,6 +207,8 @@ def check_bridge_status(bridge: str, tx_hash: str, source_chain: str, dest_chain
         "source_transaction": {
             "status": source_status.get("status"),
             "block_number": source_status.get("block_number"),
+            "block_time": datetime.utcfromtimestamp(block_time).isoformat() if block_time else None,
+            "elapsed_minutes": round((time.time() - block_time) / 60, 1) if block_time else None,
             "confirmed": source_status.get("confirmed", False)
         },
         "bridge_status": {
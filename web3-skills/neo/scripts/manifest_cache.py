@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Neo Contract Manifest Cache
+Contract states cached by script hash and revalidated by update counter
+"""
+
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+CACHE_DIR_ENV = "NEO_MANIFEST_CACHE_DIR"
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "spoon-skills", "neo_manifests")
+
+# Cached states are used without any RPC for this long, then revalidated
+# by comparing update counters, which costs a tiny invokescript
+REVALIDATE_AFTER = 3600
+
+LRU_SIZE = 256
+
+
+class ManifestCache:
+    """getcontractstate results on disk (one file per contract) behind an LRU.
+
+    A contract's manifest only changes when ContractManagement.update bumps
+    its updatecounter, so an entry stays valid for as long as the counter on
+    chain matches the cached one. Entries are keyed by script hash; names and
+    ids that getcontractstate also accepts map to it through aliases.json.
+    """
+
+    def __init__(self, network: str, cache_dir: Optional[str] = None, lru_size: int = LRU_SIZE):
+        directory = cache_dir or os.getenv(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR
+        self.directory = os.path.join(directory, network)
+        self.lru_size = lru_size
+        self._lru: "OrderedDict[str, dict]" = OrderedDict()
+
+    def _path(self, contract_hash: str) -> str:
+        return os.path.join(self.directory, f"{contract_hash}.json")
+
+    def get(self, contract_hash: str) -> Optional[dict]:
+        """Cached entry {"state", "checked_at"} for a contract, fresh or not"""
+        contract_hash = contract_hash.lower()
+        entry = self._lru.get(contract_hash)
+        if entry is None:
+            try:
+                with open(self._path(contract_hash), encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                return None
+        self._remember(contract_hash, entry)
+        return entry
+
+    def is_fresh(self, entry: dict) -> bool:
+        return time.time() - entry.get("checked_at", 0) < REVALIDATE_AFTER
+
+    def put(self, contract_hash: str, state: dict):
+        """Store a state just fetched or revalidated against the chain"""
+        contract_hash = contract_hash.lower()
+        entry = {"state": state, "checked_at": int(time.time())}
+        self._remember(contract_hash, entry)
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(contract_hash)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    def resolve_alias(self, identifier: str) -> Optional[str]:
+        """Script hash recorded for a contract name or id that getcontractstate accepted"""
+        try:
+            with open(self._aliases_path(), encoding="utf-8") as f:
+                return json.load(f).get(identifier.lower())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put_alias(self, identifier: str, contract_hash: str):
+        identifier, contract_hash = identifier.lower(), contract_hash.lower()
+        try:
+            with open(self._aliases_path(), encoding="utf-8") as f:
+                aliases = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            aliases = {}
+        if aliases.get(identifier) == contract_hash:
+            return
+        aliases[identifier] = contract_hash
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._aliases_path()
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(aliases, f)
+        os.replace(tmp_path, path)
+
+    def _aliases_path(self) -> str:
+        return os.path.join(self.directory, "aliases.json")
+
+    def discard(self, contract_hash: str):
+        contract_hash = contract_hash.lower()
+        self._lru.pop(contract_hash, None)
+        try:
+            os.remove(self._path(contract_hash))
+        except FileNotFoundError:
+            pass
+
+    def _remember(self, contract_hash: str, entry: dict):
+        self._lru[contract_hash] = entry
+        self._lru.move_to_end(contract_hash)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+
+_caches: Dict[str, ManifestCache] = {}
+
+
+def get_manifest_cache(network: str) -> ManifestCache:
+    """Process-wide manifest cache for a network"""
+    if network not in _caches:
+        _caches[network] = ManifestCache(network)
+    return _caches[network]
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Neo N3 Address Codec
+Base58Check conversion between Neo addresses and script hashes, single or bulk
+"""
+
+import hashlib
+import json
+import sys
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+# Address = base58(version byte + script hash bytes + 4-byte double-sha256 checksum)
+ADDRESS_VERSION = 0x35
+ADDRESS_LENGTH = 34
+PAYLOAD_LENGTH = 25
+
+ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+# Neo addresses always have an even number of digits, so they are converted
+# two characters (one base-3364 digit) at a time, halving the loop
+_PAIR_VALUES = {a + b: i * 58 + j for i, a in enumerate(ALPHABET) for j, b in enumerate(ALPHABET)}
+_PAIR_CHARS = [a + b for a in ALPHABET for b in ALPHABET]
+_PAIR_BASE = 58 * 58
+
+LRU_SIZE = 65536
+
+
+def _checksum(data: bytes) -> bytes:
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()[:4]
+
+
+def _decode_payload(address: str) -> Optional[bytes]:
+    """Version + script hash bytes of a well-formed address, None otherwise"""
+    if len(address) != ADDRESS_LENGTH:
+        return None
+    value = 0
+    try:
+        for i in range(0, ADDRESS_LENGTH, 2):
+            value = value * _PAIR_BASE + _PAIR_VALUES[address[i:i + 2]]
+    except KeyError:
+        return None
+    try:
+        raw = value.to_bytes(PAYLOAD_LENGTH, "big")
+    except OverflowError:
+        return None
+    payload, checksum = raw[:21], raw[21:]
+    if payload[0] != ADDRESS_VERSION or _checksum(payload) != checksum:
+        return None
+    return payload
+
+
+@lru_cache(maxsize=LRU_SIZE)
+def address_to_script_hash(address: str) -> Optional[str]:
+    """0x-prefixed script hash (UInt160, big-endian display) of an address, or None if invalid"""
+    payload = _decode_payload(address)
+    if payload is None:
+        return None
+    return "0x" + payload[:0:-1].hex()
+
+
+def is_valid_address(address: str) -> bool:
+    """True for a Neo N3 address with a correct version byte and checksum"""
+    return isinstance(address, str) and address_to_script_hash(address) is not None
+
+
+@lru_cache(maxsize=LRU_SIZE)
+def script_hash_to_address(script_hash: str) -> str:
+    """Neo N3 address of a 0x-prefixed script hash"""
+    raw = bytes.fromhex(script_hash[2:] if script_hash.startswith("0x") else script_hash)
+    if len(raw) != 20:
+        raise ValueError(f"Invalid script hash: {script_hash}")
+    payload = bytes([ADDRESS_VERSION]) + raw[::-1]
+    value = int.from_bytes(payload + _checksum(payload), "big")
+
+    pairs = []
+    for _ in range(ADDRESS_LENGTH // 2):
+        value, digit = divmod(value, _PAIR_BASE)
+        pairs.append(_PAIR_CHARS[digit])
+    return "".join(reversed(pairs))
+
+
+def addresses_to_script_hashes(addresses: Iterable[str]) -> List[Optional[str]]:
+    """Script hash for each address in order; None for invalid entries.
+
+    Duplicates are decoded once per call through a local dict, which holds
+    however many distinct addresses a holder export has; misses fall back to
+    the address_to_script_hash LRU, which keeps hot addresses across calls.
+    """
+    seen: Dict[str, Optional[str]] = {}
+    result = []
+    for address in addresses:
+        if not isinstance(address, str):
+            result.append(None)
+            continue
+        script_hash = seen.get(address, False)
+        if script_hash is False:
+            script_hash = seen[address] = address_to_script_hash(address)
+        result.append(script_hash)
+    return result
+
+
+def script_hashes_to_addresses(script_hashes: Iterable[str]) -> List[Optional[str]]:
+    """Address for each script hash in order; None for invalid entries"""
+    result = []
+    for script_hash in script_hashes:
+        try:
+            result.append(script_hash_to_address(script_hash.lower()))
+        except (ValueError, AttributeError):
+            result.append(None)
+    return result
+
+
+def main():
+    try:
+        input_data = json.loads(sys.stdin.read())
+
+        if "addresses" in input_data:
+            values = addresses_to_script_hashes(input_data["addresses"])
+            key = "script_hashes"
+        elif "script_hashes" in input_data:
+            values = script_hashes_to_addresses(input_data["script_hashes"])
+            key = "addresses"
+        else:
+            print(json.dumps({"error": "Missing required parameter: addresses or script_hashes"}))
+            sys.exit(1)
+
+        print(json.dumps({
+            "success": True,
+            key: values,
+            "invalid_count": sum(1 for v in values if v is None)
+        }))
+
+    except json.JSONDecodeError:
+        print(json.dumps({"error": "Invalid JSON input"}))
+        sys.exit(1)
+    except Exception as e:
+        print(json.dumps({"error": str(e)}))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,11 @@ Queries NEO and GAS balances using Neo RPC API
 
 import json
 import sys
-import urllib.request
-import urllib.error
-from typing import Optional, Dict
+from typing import Optional, Dict, List
+
+from neo_address import address_to_script_hash, is_valid_address
+from neo_rpc import rpc_batch
+from nep17_metadata import resolve_token_metadata
 
 # Network configurations
 NETWORK_CONFIG = {
@@ -26,85 +28,16 @@ NETWORK_CONFIG = {
 NEO_TOKEN = "0xef4073a0f2b305a38ec4050e4d3d28bc40ea63f5"
 GAS_TOKEN = "0xd2a4cff31913016155e38e474a2c06d08be276cf"
 
-
-def rpc_call(url: str, method: str, params: list) -> dict:
-    """Make a JSON-RPC call to Neo node"""
-    payload = json.dumps({
-        "jsonrpc": "2.0",
-        "method": method,
-        "params": params,
-        "id": 1
-    }).encode("utf-8")
-
-    try:
-        req = urllib.request.Request(
-            url,
-            data=payload,
-            headers={"Content-Type": "application/json"}
-        )
-        with urllib.request.urlopen(req, timeout=30) as response:
-            return json.loads(response.read().decode())
-    except urllib.error.URLError as e:
-        raise ConnectionError(f"RPC call failed: {e}")
+MAX_BULK_ADDRESSES = 1000
+MAX_OTHER_TOKENS = 50
 
 
 def address_to_scripthash(address: str) -> str:
-    """Convert Neo address to script hash (simplified)"""
-    # Note: In production, use proper base58 decoding
-    # This is a placeholder that returns the address for RPC params
-    return address
-
-
-def get_nep17_balances(address: str, network: str) -> Dict:
-    """Get all NEP-17 token balances for an address"""
-    config = NETWORK_CONFIG.get(network)
-    if not config:
-        raise ValueError(f"Unknown network: {network}")
-
-    result = rpc_call(
-        config["rpc_url"],
-        "getnep17balances",
-        [address]
-    )
-
-    if "error" in result:
-        raise ValueError(result["error"].get("message", "RPC error"))
-
-    return result.get("result", {})
-
-
-def get_unclaimed_gas(address: str, network: str) -> float:
-    """Get unclaimed GAS for an address"""
-    config = NETWORK_CONFIG.get(network)
-    if not config:
-        raise ValueError(f"Unknown network: {network}")
-
-    result = rpc_call(
-        config["rpc_url"],
-        "getunclaimedgas",
-        [address]
-    )
-
-    if "error" in result:
-        return 0
-
-    unclaimed = result.get("result", {}).get("unclaimed", "0")
-    return int(unclaimed) / 1e8
-
-
-def get_block_count(network: str) -> int:
-    """Get current block count"""
-    config = NETWORK_CONFIG.get(network)
-    if not config:
-        raise ValueError(f"Unknown network: {network}")
-
-    result = rpc_call(
-        config["rpc_url"],
-        "getblockcount",
-        []
-    )
-
-    return result.get("result", 0)
+    """Convert Neo address to script hash"""
+    script_hash = address_to_script_hash(address)
+    if script_hash is None:
+        raise ValueError(f"Invalid Neo address: {address}")
+    return script_hash
 
 
 def format_balance(amount: str, decimals: int) -> float:
@@ -115,15 +48,36 @@ def format_balance(amount: str, decimals: int) -> float:
         return 0
 
 
-def get_balance(address: str, network: str = "mainnet") -> dict:
-    """Get comprehensive balance for a Neo address"""
-    # Validate address format (Neo addresses start with 'N')
-    if not address.startswith("N") or len(address) != 34:
+def validate_address(address: str):
+    # Neo addresses start with 'N' and carry a base58check checksum
+    if not isinstance(address, str) or not address.startswith("N") or len(address) != 34:
         raise ValueError(f"Invalid Neo address format: {address}")
+    if not is_valid_address(address):
+        raise ValueError(f"Invalid Neo address checksum: {address}")
+
+
+def other_asset_hashes(balances_data: Dict) -> List[str]:
+    """Asset hashes in a getnep17balances result other than NEO and GAS"""
+    native = (NEO_TOKEN.lower(), GAS_TOKEN.lower())
+    return [
+        b.get("assethash", "").lower() for b in balances_data.get("balance", [])
+        if b.get("assethash", "").lower() not in native
+    ]
+
+
+def lookup_token_metadata(asset_hashes: List[str], network: str) -> Dict[str, dict]:
+    """Token symbols and decimals; a failed lookup leaves amounts unscaled"""
+    if not asset_hashes:
+        return {}
+    try:
+        return resolve_token_metadata(asset_hashes, NETWORK_CONFIG[network]["rpc_url"], network)
+    except ConnectionError:
+        return {}
 
-    # Get NEP-17 balances
-    balances_data = get_nep17_balances(address, network)
 
+def build_balance(address: str, network: str, balances_data: Dict, unclaimed_result: dict,
+                  block_height: int, token_metadata: Dict[str, dict]) -> dict:
+    """Balance result from the getnep17balances and getunclaimedgas responses"""
     # Parse balances
     neo_balance = 0
     gas_balance = 0
@@ -139,17 +93,22 @@ def get_balance(address: str, network: str = "mainnet") -> dict:
         elif asset_hash == GAS_TOKEN.lower():
             gas_balance = format_balance(amount, 8)  # GAS has 8 decimals
         else:
-            other_tokens.append({
+            token = {
                 "asset_hash": asset_hash,
                 "amount": amount,
                 "last_updated_block": last_updated
-            })
-
-    # Get unclaimed GAS
-    unclaimed_gas = get_unclaimed_gas(address, network)
-
-    # Get current block height
-    block_height = get_block_count(network)
+            }
+            metadata = token_metadata.get(asset_hash)
+            if metadata:
+                token["symbol"] = metadata["symbol"]
+                token["decimals"] = metadata["decimals"]
+                token["balance"] = format_balance(amount, metadata["decimals"])
+            other_tokens.append(token)
+
+    # Unclaimed GAS errors are treated as nothing to claim
+    unclaimed = 0
+    if "error" not in unclaimed_result:
+        unclaimed = int(unclaimed_result.get("result", {}).get("unclaimed", "0")) / 1e8
 
     return {
         "success": True,
@@ -168,19 +127,119 @@ def get_balance(address: str, network: str = "mainnet") -> dict:
                 "contract": GAS_TOKEN
             }
         },
-        "unclaimed_gas": round(unclaimed_gas, 8),
-        "other_tokens": other_tokens[:10],  # Limit to top 10
+        "unclaimed_gas": round(unclaimed, 8),
+        "other_tokens": other_tokens[:MAX_OTHER_TOKENS],
+        "other_tokens_count": len(other_tokens),
         "rpc_endpoint": NETWORK_CONFIG[network]["rpc_url"]
     }
 
 
+def get_balance(address: str, network: str = "mainnet") -> dict:
+    """Get comprehensive balance for a Neo address"""
+    validate_address(address)
+
+    config = NETWORK_CONFIG.get(network)
+    if not config:
+        raise ValueError(f"Unknown network: {network}")
+
+    # Balances, unclaimed GAS and block height in one batched request
+    balances, unclaimed, block_count = rpc_batch(config["rpc_url"], [
+        ("getnep17balances", [address]),
+        ("getunclaimedgas", [address]),
+        ("getblockcount", [])
+    ])
+
+    if "error" in balances:
+        raise ValueError(balances["error"].get("message", "RPC error"))
+
+    balances_data = balances.get("result", {})
+    token_metadata = lookup_token_metadata(other_asset_hashes(balances_data), network)
+
+    return build_balance(address, network, balances_data, unclaimed,
+                         block_count.get("result", 0), token_metadata)
+
+
+def get_balances(addresses: List[str], network: str = "mainnet") -> dict:
+    """Balances for many addresses with two batched calls per address.
+
+    Invalid addresses and per-address RPC errors are reported in place
+    instead of failing the whole request.
+    """
+    config = NETWORK_CONFIG.get(network)
+    if not config:
+        raise ValueError(f"Unknown network: {network}")
+
+    addresses = list(dict.fromkeys(addresses))
+    if len(addresses) > MAX_BULK_ADDRESSES:
+        raise ValueError(f"Too many addresses: {len(addresses)} (max {MAX_BULK_ADDRESSES})")
+
+    valid = []
+    errors = {}
+    for address in addresses:
+        try:
+            validate_address(address)
+            valid.append(address)
+        except ValueError as e:
+            errors[address] = str(e)
+
+    calls = [("getblockcount", [])]
+    for address in valid:
+        calls.append(("getnep17balances", [address]))
+        calls.append(("getunclaimedgas", [address]))
+    responses = rpc_batch(config["rpc_url"], calls)
+    block_height = responses[0].get("result", 0)
+
+    fetched = {}
+    for i, address in enumerate(valid):
+        balances, unclaimed = responses[1 + 2 * i], responses[2 + 2 * i]
+        if "error" in balances:
+            errors[address] = balances["error"].get("message", "RPC error")
+        else:
+            fetched[address] = (balances.get("result", {}), unclaimed)
+
+    # Metadata for every token held by any address in one more round trip
+    asset_hashes = [h for balances_data, _ in fetched.values() for h in other_asset_hashes(balances_data)]
+    token_metadata = lookup_token_metadata(asset_hashes, network)
+
+    by_address = {
+        address: build_balance(address, network, balances_data, unclaimed, block_height, token_metadata)
+        for address, (balances_data, unclaimed) in fetched.items()
+    }
+
+    results = []
+    for address in addresses:
+        if address in by_address:
+            result = by_address[address]
+            del result["network"], result["block_height"], result["rpc_endpoint"]
+        else:
+            result = {"success": False, "address": address, "error": errors[address]}
+        results.append(result)
+
+    return {
+        "success": True,
+        "network": network,
+        "block_height": block_height,
+        "count": len(results),
+        "results": results,
+        "rpc_endpoint": config["rpc_url"]
+    }
+
+
 def main():
     try:
         input_data = json.loads(sys.stdin.read())
 
         address = input_data.get("address")
+        addresses = input_data.get("addresses")
         network = input_data.get("network", "mainnet")
 
+        if addresses:
+            if not isinstance(addresses, list):
+                print(json.dumps({"error": "addresses must be a list"}))
+                sys.exit(1)
+            print(json.dumps(get_balances(addresses, network), indent=2))
+            return
+
         if not address:
             print(json.dumps({"error": "Missing required parameter: address"}))
             sys.exit(1)
@@ -4,11 +4,15 @@ Neo N3 Contract Script
 Query and invoke Neo N3 smart contracts via RPC
 """
 
+import base64
 import json
 import sys
-import urllib.request
-import urllib.error
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, Iterator, List, Any
+
+import neo_rpc
+from neo_address import address_to_script_hash
+from manifest_cache import get_manifest_cache
+from neo_script import PICKITEM, ScriptBuilder, hash160_bytes
 
 # Network configurations
 NETWORK_CONFIG = {
@@ -34,26 +38,18 @@ KNOWN_CONTRACTS = {
     "CryptoLib": "0x726cb6e0cd8628a1350a611384688911ab75f51b"
 }
 
+# Calls compiled into one script; larger batches are split across scripts
+# sent together in one JSON-RPC batch
+CALLS_PER_SCRIPT = 64
+MAX_BATCH_CALLS = 1000
+
+# Items per traverseiterator call (the node's MaxIteratorResultItems default)
+ITERATOR_PAGE_SIZE = 100
+
 
 def rpc_call(url: str, method: str, params: list) -> dict:
     """Make a JSON-RPC call to Neo node"""
-    payload = json.dumps({
-        "jsonrpc": "2.0",
-        "method": method,
-        "params": params,
-        "id": 1
-    }).encode("utf-8")
-
-    try:
-        req = urllib.request.Request(
-            url,
-            data=payload,
-            headers={"Content-Type": "application/json"}
-        )
-        with urllib.request.urlopen(req, timeout=60) as response:
-            return json.loads(response.read().decode())
-    except urllib.error.URLError as e:
-        raise ConnectionError(f"RPC call failed: {e}")
+    return neo_rpc.rpc_call(url, method, params, timeout=60)
 
 
 def format_param(param: Any) -> Dict:
@@ -64,7 +60,8 @@ def format_param(param: Any) -> Dict:
             return {"type": "Hash160", "value": param[2:]}
         elif param.startswith("N") and len(param) == 34:
             # Address - convert to script hash format
-            return {"type": "Hash160", "value": param}
+            script_hash = address_to_script_hash(param)
+            return {"type": "Hash160", "value": script_hash[2:] if script_hash else param}
         else:
             # String
             return {"type": "String", "value": param}
@@ -104,8 +101,126 @@ def invoke_function(
     return result.get("result", {})
 
 
-def get_contract_state(contract_hash: str, network: str = "mainnet") -> Dict:
-    """Get contract state/info"""
+def script_arg(param: Any) -> Any:
+    """Convert a query parameter to a NeoVM script argument.
+
+    Accepts the same plain values as format_param (0x script hashes become
+    Hash160 bytes) plus explicit {"type", "value"} contract parameters.
+    """
+    if isinstance(param, dict):
+        param_type = param.get("type")
+        value = param.get("value")
+        if param_type == "Hash160":
+            return hash160_bytes(value)
+        if param_type == "Integer":
+            return int(value)
+        if param_type == "Boolean":
+            return value if isinstance(value, bool) else str(value).lower() == "true"
+        if param_type == "ByteArray":
+            return base64.b64decode(value)
+        if param_type == "Array":
+            return [script_arg(v) for v in value or []]
+        if param_type == "Any":
+            return None
+        return str(value)
+    if isinstance(param, str):
+        if param.startswith("0x") and len(param) == 42:
+            return hash160_bytes(param)
+        if param.startswith("N") and len(param) == 34:
+            script_hash = address_to_script_hash(param)
+            if script_hash is None:
+                raise ValueError(f"Invalid Neo address: {param}")
+            return hash160_bytes(script_hash)
+        return param
+    if isinstance(param, list):
+        return [script_arg(p) for p in param]
+    if param is None or isinstance(param, (bool, int)):
+        return param
+    return str(param)
+
+
+def build_batch_script(calls: List[Dict]) -> str:
+    """Compile calls into one script; each leaves [result] or its exception"""
+    builder = ScriptBuilder()
+    for call in calls:
+        builder.checked_contract_call(call["contract"], call["method"], [script_arg(p) for p in call["params"]])
+    return builder.to_base64()
+
+
+def normalize_calls(calls: List[Any]) -> List[Dict]:
+    """Accept {"contract", "method", "params"} dicts or [contract, method, params] lists"""
+    normalized = []
+    for call in calls:
+        if isinstance(call, dict):
+            contract, method, params = call.get("contract"), call.get("method"), call.get("params", [])
+        elif isinstance(call, (list, tuple)) and len(call) in (2, 3):
+            contract, method = call[0], call[1]
+            params = call[2] if len(call) == 3 else []
+        else:
+            raise ValueError(f"Invalid call: {call}")
+        if not contract or not method:
+            raise ValueError(f"Call needs a contract and a method: {call}")
+        normalized.append({
+            "contract": KNOWN_CONTRACTS.get(contract, contract),
+            "method": method,
+            "params": params or []
+        })
+    return normalized
+
+
+def invoke_batch(calls: List[Any], network: str = "mainnet") -> Dict:
+    """Run many read-only calls with one invokescript per CALLS_PER_SCRIPT calls.
+
+    All scripts go out in a single JSON-RPC request. A failing call reports
+    its exception without affecting the others; only a fault of the whole
+    script (e.g. running out of GAS) fails every call in that script.
+    """
+    config = NETWORK_CONFIG.get(network)
+    if not config:
+        raise ValueError(f"Unknown network: {network}")
+
+    calls = normalize_calls(calls)
+    if len(calls) > MAX_BATCH_CALLS:
+        raise ValueError(f"Too many calls: {len(calls)} (max {MAX_BATCH_CALLS})")
+
+    chunks = [calls[i:i + CALLS_PER_SCRIPT] for i in range(0, len(calls), CALLS_PER_SCRIPT)]
+    responses = neo_rpc.rpc_batch(
+        config["rpc_url"],
+        [("invokescript", [build_batch_script(chunk)]) for chunk in chunks],
+        timeout=60
+    )
+
+    results = []
+    gas_consumed = 0
+    for chunk, response in zip(chunks, responses):
+        invocation = response.get("result") or {}
+        stack = invocation.get("stack") or []
+        gas_consumed += int(invocation.get("gasconsumed") or 0)
+
+        if "error" in response or invocation.get("state") != "HALT" or len(stack) != len(chunk):
+            error = (response.get("error", {}).get("message") or invocation.get("exception")
+                     or f"Script ended in state {invocation.get('state')}")
+            results.extend({**call, "success": False, "error": error} for call in chunk)
+            continue
+
+        for call, item in zip(chunk, stack):
+            if item.get("type") == "Array" and len(item.get("value") or []) == 1:
+                value = item["value"][0]
+                results.append({**call, "success": True, "stack_item": value, "parsed": parse_stack_item(value)})
+            else:
+                results.append({**call, "success": False, "error": parse_stack_item(item)})
+
+    return {
+        "success": True,
+        "network": network,
+        "call_count": len(results),
+        "gas_consumed": str(gas_consumed),
+        "results": results
+    }
+
+
+def fetch_contract_state(contract_hash: str, network: str = "mainnet") -> Dict:
+    """Get contract state/info from the node"""
     config = NETWORK_CONFIG.get(network)
     if not config:
         raise ValueError(f"Unknown network: {network}")
@@ -122,6 +237,74 @@ def get_contract_state(contract_hash: str, network: str = "mainnet") -> Dict:
     return result.get("result", {})
 
 
+def get_update_counter(contract_hash: str, network: str = "mainnet") -> Optional[int]:
+    """Current updatecounter of a contract, without transferring its manifest.
+
+    Runs ContractManagement.getContract(hash)[1] as an invokescript, so only
+    one integer comes back. None if the contract no longer exists.
+    """
+    config = NETWORK_CONFIG[network]
+    script = (
+        ScriptBuilder()
+        .contract_call(KNOWN_CONTRACTS["ContractManagement"], "getContract", [hash160_bytes(contract_hash)])
+        .push_int(1)
+        .emit(PICKITEM)
+        .to_base64()
+    )
+    result = rpc_call(config["rpc_url"], "invokescript", [script])
+    invocation = result.get("result") or {}
+    stack = invocation.get("stack") or []
+    if "error" in result or invocation.get("state") != "HALT" or not stack:
+        return None
+    try:
+        return int(stack[0].get("value"))
+    except (TypeError, ValueError):
+        return None
+
+
+def is_script_hash(value: str) -> bool:
+    return isinstance(value, str) and len(value) == 42 and value[:2] in ("0x", "0X") and all(
+        c in "0123456789abcdefABCDEF" for c in value[2:])
+
+
+def get_contract_state(contract_hash: str, network: str = "mainnet", use_cache: bool = True) -> Dict:
+    """Get contract state/info, served from the manifest cache when still current.
+
+    The cache is keyed by the script hash the node returns, so identifiers
+    such as native contract names or numeric ids are revalidated by hash too.
+    """
+    if network not in NETWORK_CONFIG:
+        raise ValueError(f"Unknown network: {network}")
+    if not use_cache:
+        return fetch_contract_state(contract_hash, network)
+
+    cache = get_manifest_cache(network)
+    identifier = str(contract_hash)
+    script_hash = identifier.lower() if is_script_hash(identifier) else cache.resolve_alias(identifier)
+
+    entry = cache.get(script_hash) if script_hash else None
+    if entry:
+        if cache.is_fresh(entry):
+            return entry["state"]
+        # Unchanged update counter means the cached manifest is still current
+        try:
+            counter = get_update_counter(script_hash, network)
+        except ValueError:
+            counter = None
+        if counter is not None and counter == entry["state"].get("updatecounter"):
+            cache.put(script_hash, entry["state"])
+            return entry["state"]
+        cache.discard(script_hash)
+
+    state = fetch_contract_state(contract_hash, network)
+    state_hash = state.get("hash")
+    if is_script_hash(state_hash):
+        cache.put(state_hash, state)
+        if state_hash.lower() != identifier.lower():
+            cache.put_alias(identifier, state_hash)
+    return state
+
+
 def get_native_contracts(network: str = "mainnet") -> List[Dict]:
     """Get list of native contracts"""
     config = NETWORK_CONFIG.get(network)
@@ -140,36 +323,174 @@ def get_native_contracts(network: str = "mainnet") -> List[Dict]:
     return result.get("result", [])
 
 
-def parse_stack_item(item: Dict) -> Any:
-    """Parse a stack item from invoke result"""
-    item_type = item.get("type", "")
-    value = item.get("value")
+class LazyByteString:
+    """ByteString/Buffer stack item whose base64 payload is decoded on first use"""
+
+    __slots__ = ("encoded", "_raw")
+
+    def __init__(self, encoded: str):
+        self.encoded = encoded or ""
+        self._raw: Optional[bytes] = None
+
+    @property
+    def raw(self) -> bytes:
+        if self._raw is None:
+            self._raw = base64.b64decode(self.encoded)
+        return self._raw
+
+    @property
+    def hex(self) -> str:
+        return self.raw.hex()
+
+    @property
+    def value(self) -> str:
+        """UTF-8 text when the bytes are valid UTF-8, else the base64 payload"""
+        try:
+            return self.raw.decode("utf-8")
+        except (ValueError, UnicodeDecodeError):
+            return self.encoded
+
+    def __str__(self) -> str:
+        return self.value
+
+    def __repr__(self) -> str:
+        return f"LazyByteString({self.encoded!r})"
+
+
+def json_default(value: Any) -> Any:
+    """json.dumps hook for values produced by the lazy stack decoder"""
+    if isinstance(value, LazyByteString):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
 
+def _parse_primitive(item_type: str, value: Any, lazy: bool) -> Any:
     if item_type == "Integer":
         return int(value) if value else 0
-    elif item_type == "Boolean":
-        return value
-    elif item_type == "ByteString":
-        # Try to decode as string, fall back to hex
+    if item_type == "Boolean":
+        return value if isinstance(value, bool) else str(value).lower() == "true"
+    if item_type in ("ByteString", "Buffer"):
+        decoded = LazyByteString(value)
+        return decoded if lazy else decoded.value
+    if item_type == "Any":
+        return None
+    return value
+
+
+def parse_stack_item(item: Dict, lazy: bool = False) -> Any:
+    """Parse a stack item from invoke result.
+
+    Walks nested Arrays, Structs and Maps with an explicit stack instead of
+    recursion, so deeply nested results cannot hit the recursion limit. With
+    lazy=True ByteStrings are returned as LazyByteString and only decoded when
+    read. Iterators come back as {"iterator": id} for iterate_session, or as
+    their expanded items when the node has sessions disabled.
+    """
+    root: List[Any] = []
+    # (stack item, parent container, key in parent or None to append)
+    work: List[tuple] = [(item, root, None)]
+
+    while work:
+        node, parent, key = work.pop()
+        item_type = node.get("type", "")
+        value = node.get("value")
+
+        if item_type in ("Array", "Struct"):
+            parsed: Any = []
+            for child in reversed(value or []):
+                work.append((child, parsed, None))
+        elif item_type == "Map":
+            parsed = {}
+            for entry in reversed(value or []):
+                # Map keys are always primitive types
+                entry_key = entry.get("key", {})
+                map_key = _parse_primitive(entry_key.get("type", ""), entry_key.get("value"), False)
+                work.append((entry.get("value", {}), parsed, str(map_key)))
+        elif item_type == "InteropInterface":
+            if isinstance(value, list):
+                parsed = []
+                for child in reversed(value):
+                    work.append((child, parsed, None))
+            else:
+                parsed = {"iterator": node.get("id"), "interface": node.get("interface")}
+        else:
+            parsed = _parse_primitive(item_type, value, lazy)
+
+        if key is None:
+            parent.append(parsed)
+        else:
+            parent[key] = parsed
+
+    return root[0] if root else None
+
+
+def iterate_session(session: str, iterator_id: str, network: str = "mainnet",
+                    page_size: int = ITERATOR_PAGE_SIZE, lazy: bool = True) -> Iterator[Any]:
+    """Stream every item of a session iterator, one traverseiterator page at a time.
+
+    Only one page is held in memory, and the session is terminated when the
+    generator finishes or is closed early.
+    """
+    url = NETWORK_CONFIG[network]["rpc_url"]
+    try:
+        while True:
+            result = rpc_call(url, "traverseiterator", [session, iterator_id, page_size])
+            if "error" in result:
+                raise ValueError(result["error"].get("message", "Iterator traversal failed"))
+            page = result.get("result") or []
+            for item in page:
+                yield parse_stack_item(item, lazy)
+            if len(page) < page_size:
+                break
+    finally:
         try:
-            import base64
-            decoded = base64.b64decode(value)
-            return decoded.decode("utf-8")
-        except:
-            return value
-    elif item_type == "Array":
-        return [parse_stack_item(v) for v in (value or [])]
-    elif item_type == "Map":
-        result = {}
-        for entry in (value or []):
-            key = parse_stack_item(entry.get("key", {}))
-            val = parse_stack_item(entry.get("value", {}))
-            result[str(key)] = val
-        return result
-    elif item_type == "Struct":
-        return [parse_stack_item(v) for v in (value or [])]
-    else:
-        return value
+            rpc_call(url, "terminatesession", [session])
+        except ConnectionError:
+            pass
+
+
+def iterate_contract(contract_hash: str, method: str, params: List[Any] = None,
+                     network: str = "mainnet", lazy: bool = True) -> Iterator[Any]:
+    """Invoke a method that returns an iterator (e.g. tokens) and stream its items"""
+    contract_hash = KNOWN_CONTRACTS.get(contract_hash, contract_hash)
+    invoke_result = invoke_function(contract_hash, method, params or [], network)
+    if invoke_result.get("state") != "HALT":
+        raise ValueError(invoke_result.get("exception") or "Invocation failed")
+
+    stack = invoke_result.get("stack") or []
+    if not stack or stack[0].get("type") != "InteropInterface":
+        raise ValueError(f"{method} did not return an iterator")
+
+    iterator = stack[0]
+    if isinstance(iterator.get("value"), list):
+        # Node without sessions expands (and may truncate) iterators inline
+        for item in iterator["value"]:
+            yield parse_stack_item(item, lazy)
+        return
+
+    session = invoke_result.get("session")
+    if not session:
+        raise ValueError("Node returned an iterator without a session")
+    yield from iterate_session(session, iterator.get("id"), network, lazy=lazy)
+
+
+def find_storage(contract_hash: str, prefix: bytes = b"", network: str = "mainnet") -> Iterator[Dict]:
+    """Stream a contract's storage entries under a prefix via paged findstorage calls"""
+    url = NETWORK_CONFIG[network]["rpc_url"]
+    contract_hash = KNOWN_CONTRACTS.get(contract_hash, contract_hash)
+    encoded_prefix = base64.b64encode(prefix).decode()
+    start = 0
+
+    while True:
+        result = rpc_call(url, "findstorage", [contract_hash, encoded_prefix, start])
+        if "error" in result:
+            raise ValueError(result["error"].get("message", "Storage lookup failed"))
+        page = result.get("result") or {}
+        for entry in page.get("results") or []:
+            yield {"key": LazyByteString(entry.get("key")), "value": LazyByteString(entry.get("value"))}
+        if not page.get("truncated"):
+            break
+        start = page.get("next", start)
 
 
 def query_contract(
@@ -274,6 +595,32 @@ def get_contract_info(contract_hash: str, network: str = "mainnet") -> Dict:
     }
 
 
+def stream_items(action: str, contract_hash: str, method: Optional[str], params: List[Any],
+                 network: str, options: dict):
+    """Print iterator items or storage entries as JSON lines, then a summary line"""
+    limit = options.get("limit")
+    if action == "iterate":
+        items = iterate_contract(contract_hash, method, params, network)
+    else:
+        prefix = bytes.fromhex(options.get("prefix", "").removeprefix("0x"))
+        items = (
+            {"key": entry["key"].hex, "value": entry["value"]}
+            for entry in find_storage(contract_hash, prefix, network)
+        )
+
+    count = 0
+    try:
+        for item in items:
+            if limit is not None and count >= limit:
+                break
+            print(json.dumps(item, default=json_default))
+            count += 1
+    finally:
+        items.close()
+
+    print(json.dumps({"success": True, "network": network, "count": count}))
+
+
 def main():
     try:
         input_data = json.loads(sys.stdin.read())
@@ -284,7 +631,21 @@ def main():
         params = input_data.get("params", [])
         network = input_data.get("network", "mainnet")
 
-        if action == "info":
+        if action in ("iterate", "storage"):
+            if not contract_hash or (action == "iterate" and not method):
+                print(json.dumps({"error": "Missing contract_hash or method"}))
+                sys.exit(1)
+            stream_items(action, contract_hash, method, params, network, input_data)
+            return
+
+        if action == "batch":
+            calls = input_data.get("calls")
+            if not calls or not isinstance(calls, list):
+                print(json.dumps({"error": "Missing calls list"}))
+                sys.exit(1)
+            result = invoke_batch(calls, network)
+
+        elif action == "info":
             if not contract_hash:
                 print(json.dumps({"error": "Missing contract_hash"}))
                 sys.exit(1)
@@ -311,7 +672,7 @@ def main():
                 sys.exit(1)
             result = query_contract(contract_hash, method, params, network)
 
-        print(json.dumps(result, indent=2))
+        print(json.dumps(result, indent=2, default=json_default))
 
     except json.JSONDecodeError:
         print(json.dumps({"error": "Invalid JSON input"}))
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Neo N3 RPC Client
+JSON-RPC calls and batches over one persistent HTTPS connection per node
+"""
+
+import http.client
+import json
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+
+# Calls per batched POST; the reference node accepts large batches, but
+# keeping bodies small bounds the cost of a retry
+RPC_BATCH_SIZE = 500
+
+USER_AGENT = "NeoSkill/1.0"
+
+_connections: Dict[str, http.client.HTTPConnection] = {}
+
+
+def _connect(url: str, timeout: float) -> Tuple[http.client.HTTPConnection, str]:
+    """Cached keep-alive connection for a node URL, and the request path"""
+    parts = urlsplit(url)
+    path = parts.path or "/"
+    conn = _connections.get(url)
+    if conn is None:
+        if parts.scheme == "https":
+            conn = http.client.HTTPSConnection(parts.hostname, parts.port, timeout=timeout)
+        else:
+            conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=timeout)
+        _connections[url] = conn
+    return conn, path
+
+
+def _drop(url: str):
+    conn = _connections.pop(url, None)
+    if conn is not None:
+        conn.close()
+
+
+def post_json(url: str, payload, timeout: float = 30):
+    """POST a JSON body and decode the JSON reply, reusing the node connection.
+
+    A kept-alive connection may have been closed by the server since the last
+    request, so a failure on a reused connection is retried once on a fresh one.
+    """
+    body = json.dumps(payload).encode("utf-8")
+    headers = {"Content-Type": "application/json", "User-Agent": USER_AGENT}
+
+    for attempt in range(2):
+        reused = url in _connections
+        conn, path = _connect(url, timeout)
+        try:
+            conn.request("POST", path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+        except (http.client.HTTPException, OSError) as e:
+            _drop(url)
+            if reused and attempt == 0:
+                continue
+            raise ConnectionError(f"RPC call failed: {e}")
+
+        if response.getheader("Connection", "").lower() == "close":
+            _drop(url)
+        if response.status != 200:
+            raise ConnectionError(f"RPC call failed: HTTP {response.status} {response.reason}")
+        try:
+            return json.loads(data.decode())
+        except json.JSONDecodeError:
+            raise ConnectionError("RPC call failed: invalid JSON response")
+
+
+def rpc_call(url: str, method: str, params: list, timeout: float = 30) -> dict:
+    """Make a JSON-RPC call to Neo node"""
+    return post_json(url, {"jsonrpc": "2.0", "method": method, "params": params, "id": 1}, timeout)
+
+
+def rpc_batch(url: str, calls: List[Tuple[str, list]], timeout: float = 30) -> List[dict]:
+    """Send calls as JSON-RPC batches and return the responses in call order.
+
+    Each response is the node's reply object, so per-call failures show up
+    as an "error" key exactly as they do for rpc_call.
+    """
+    responses: List[dict] = [{"error": {"message": "No response from node"}} for _ in calls]
+
+    for start in range(0, len(calls), RPC_BATCH_SIZE):
+        chunk = calls[start:start + RPC_BATCH_SIZE]
+        payload = [
+            {"jsonrpc": "2.0", "method": method, "params": params, "id": start + i}
+            for i, (method, params) in enumerate(chunk)
+        ]
+        replies = post_json(url, payload, timeout)
+
+        # A malformed batch is rejected with a single error object
+        if isinstance(replies, dict):
+            message = replies.get("error", {}).get("message", "invalid batch response")
+            raise ConnectionError(f"RPC batch failed: {message}")
+
+        # Replies may come back in any order; match them by id
+        for reply in replies:
+            reply_id = reply.get("id")
+            if isinstance(reply_id, int) and 0 <= reply_id < len(responses):
+                responses[reply_id] = reply
+
+    return responses
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+NeoVM Script Builder
+Compiles read-only contract calls into one script for a single invokescript
+"""
+
+import base64
+import hashlib
+from typing import Any, List
+
+# Opcodes
+PUSHINT8 = 0x00
+PUSHT = 0x08
+PUSHF = 0x09
+PUSHNULL = 0x0B
+PUSHDATA1 = 0x0C
+PUSHDATA2 = 0x0D
+PUSHDATA4 = 0x0E
+PUSHM1 = 0x0F
+PUSH0 = 0x10
+TRY = 0x3B
+TRY_L = 0x3C
+ENDTRY = 0x3D
+ENDTRY_L = 0x3E
+SYSCALL = 0x41
+DROP = 0x45
+PACK = 0xC0
+NEWARRAY0 = 0xC2
+PICKITEM = 0xCE
+
+# CallFlags.ReadStates | CallFlags.AllowCall
+CALL_FLAGS_READ_ONLY = 0x05
+
+
+def interop_hash(name: str) -> bytes:
+    """SYSCALL operand: first four bytes of the sha256 of the interop name"""
+    return hashlib.sha256(name.encode()).digest()[:4]
+
+
+CONTRACT_CALL = interop_hash("System.Contract.Call")
+
+
+def hash160_bytes(script_hash: str) -> bytes:
+    """Script bytes of a 0x-prefixed UInt160 (displayed big-endian, stored little-endian)"""
+    raw = bytes.fromhex(script_hash[2:] if script_hash.startswith("0x") else script_hash)
+    if len(raw) != 20:
+        raise ValueError(f"Invalid script hash: {script_hash}")
+    return raw[::-1]
+
+
+class ScriptBuilder:
+    """Emits NeoVM instructions the same way the reference ScriptBuilder does"""
+
+    def __init__(self):
+        self.script = bytearray()
+
+    def emit(self, opcode: int, operand: bytes = b"") -> "ScriptBuilder":
+        self.script.append(opcode)
+        self.script += operand
+        return self
+
+    def push_int(self, value: int) -> "ScriptBuilder":
+        if -1 <= value <= 16:
+            return self.emit(PUSH0 + value if value >= 0 else PUSHM1)
+        # PUSHINT8..PUSHINT256 take 1, 2, 4, ... 32 little-endian bytes
+        for index, size in enumerate((1, 2, 4, 8, 16, 32)):
+            try:
+                operand = value.to_bytes(size, "little", signed=True)
+            except OverflowError:
+                continue
+            return self.emit(PUSHINT8 + index, operand)
+        raise ValueError(f"Integer out of range: {value}")
+
+    def push_bytes(self, data: bytes) -> "ScriptBuilder":
+        length = len(data)
+        if length < 0x100:
+            return self.emit(PUSHDATA1, bytes([length]) + data)
+        if length < 0x10000:
+            return self.emit(PUSHDATA2, length.to_bytes(2, "little") + data)
+        return self.emit(PUSHDATA4, length.to_bytes(4, "little") + data)
+
+    def push(self, value: Any) -> "ScriptBuilder":
+        """Push a Python value: None, bool, int, str (UTF-8), bytes or a list"""
+        if value is None:
+            return self.emit(PUSHNULL)
+        if isinstance(value, bool):
+            return self.emit(PUSHT if value else PUSHF)
+        if isinstance(value, int):
+            return self.push_int(value)
+        if isinstance(value, str):
+            return self.push_bytes(value.encode("utf-8"))
+        if isinstance(value, (bytes, bytearray)):
+            return self.push_bytes(bytes(value))
+        if isinstance(value, list):
+            return self.push_array(value)
+        raise ValueError(f"Unsupported script argument: {value!r}")
+
+    def push_array(self, items: List[Any]) -> "ScriptBuilder":
+        if not items:
+            return self.emit(NEWARRAY0)
+        for item in reversed(items):
+            self.push(item)
+        self.push_int(len(items))
+        return self.emit(PACK)
+
+    def contract_call(self, script_hash: str, method: str, args: List[Any] = None,
+                      flags: int = CALL_FLAGS_READ_ONLY) -> "ScriptBuilder":
+        """System.Contract.Call leaving the method's return value on the stack"""
+        self.push_array(list(args or []))
+        self.push_int(flags)
+        self.push(method)
+        self.push_bytes(hash160_bytes(script_hash))
+        return self.emit(SYSCALL, CONTRACT_CALL)
+
+    def _emit_try(self, body: bytes, catch: bytes) -> "ScriptBuilder":
+        """TRY { body } CATCH { catch }, where catch ends with its own ENDTRY"""
+        # Offsets are relative to the instruction carrying them
+        if len(body) + 5 <= 127:
+            self.emit(TRY, bytes([3 + len(body) + 2, 0]))
+            self.script += body
+            self.emit(ENDTRY, bytes([2 + len(catch)]))
+        else:
+            self.emit(TRY_L, (9 + len(body) + 5).to_bytes(4, "little") + bytes(4))
+            self.script += body
+            self.emit(ENDTRY_L, (5 + len(catch)).to_bytes(4, "little"))
+        self.script += catch
+        return self
+
+    def try_contract_call(self, script_hash: str, method: str, args: List[Any] = None,
+                          flags: int = CALL_FLAGS_READ_ONLY) -> "ScriptBuilder":
+        """contract_call that leaves null instead of faulting the whole script.
+
+        Emits TRY { call } CATCH { DROP exception; PUSHNULL } so one missing
+        contract or reverting method does not lose every other result.
+        """
+        call = ScriptBuilder().contract_call(script_hash, method, args, flags).script
+        return self._emit_try(bytes(call), bytes([DROP, PUSHNULL, ENDTRY, 2]))
+
+    def checked_contract_call(self, script_hash: str, method: str, args: List[Any] = None,
+                              flags: int = CALL_FLAGS_READ_ONLY) -> "ScriptBuilder":
+        """contract_call that leaves [result] on success and the exception on failure.
+
+        Unlike try_contract_call this keeps a null return value distinguishable
+        from a failed call: success is always a one-element Array.
+        """
+        call = ScriptBuilder().contract_call(script_hash, method, args, flags).push_int(1).emit(PACK).script
+        return self._emit_try(bytes(call), bytes([ENDTRY, 2]))
+
+    def to_base64(self) -> str:
+        return base64.b64encode(bytes(self.script)).decode()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+NEP-17 Token Metadata Resolver
+Resolves symbol and decimals for many tokens with one invokescript, cached on disk
+"""
+
+import base64
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+
+from neo_rpc import rpc_batch
+from neo_script import ScriptBuilder
+
+CACHE_DIR_ENV = "NEP17_METADATA_CACHE_DIR"
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "spoon-skills", "nep17_tokens")
+
+# Contracts per script; keeps each invocation well under the node's GAS limit
+TOKENS_PER_SCRIPT = 50
+
+# Native tokens never need a lookup
+KNOWN_TOKENS = {
+    "0xef4073a0f2b305a38ec4050e4d3d28bc40ea63f5": {"symbol": "NEO", "decimals": 0},
+    "0xd2a4cff31913016155e38e474a2c06d08be276cf": {"symbol": "GAS", "decimals": 8},
+}
+
+
+class TokenMetadataCache:
+    """Per-network JSON file of contract hash -> {"symbol", "decimals"}"""
+
+    def __init__(self, network: str, cache_dir: Optional[str] = None):
+        directory = cache_dir or os.getenv(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR
+        self.path = os.path.join(directory, f"{network}.json")
+        self._tokens: Optional[Dict[str, dict]] = None
+
+    def _read(self) -> Dict[str, dict]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def tokens(self) -> Dict[str, dict]:
+        if self._tokens is None:
+            self._tokens = self._read()
+        return self._tokens
+
+    def get(self, contract_hash: str) -> Optional[dict]:
+        contract_hash = contract_hash.lower()
+        return KNOWN_TOKENS.get(contract_hash) or self.tokens().get(contract_hash)
+
+    def update(self, resolved: Dict[str, dict]):
+        """Add entries and rewrite the file, keeping entries other processes added"""
+        if not resolved:
+            return
+        merged = self._read()
+        merged.update(resolved)
+        self._tokens = merged
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(merged, f)
+        os.replace(tmp_path, self.path)
+
+
+def build_metadata_script(contract_hashes: List[str]) -> str:
+    """One script calling symbol() and decimals() on every contract, in order.
+
+    Each call is wrapped in TRY/CATCH, so a contract that is missing or not
+    NEP-17 yields nulls instead of faulting the whole invocation.
+    """
+    builder = ScriptBuilder()
+    for contract_hash in contract_hashes:
+        builder.try_contract_call(contract_hash, "symbol")
+        builder.try_contract_call(contract_hash, "decimals")
+    return builder.to_base64()
+
+
+def _symbol(item: dict) -> Optional[str]:
+    if item.get("type") != "ByteString":
+        return None
+    try:
+        return base64.b64decode(item.get("value") or "").decode("utf-8")
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def _decimals(item: dict) -> Optional[int]:
+    if item.get("type") != "Integer":
+        return None
+    try:
+        return int(item.get("value"))
+    except (TypeError, ValueError):
+        return None
+
+
+def resolve_token_metadata(contract_hashes: Iterable[str], rpc_url: str, network: str,
+                           cache: Optional[TokenMetadataCache] = None) -> Dict[str, dict]:
+    """Symbol and decimals for each contract, from the cache or one batched invokescript.
+
+    Contracts that do not answer both methods are left out of the result.
+    """
+    cache = cache or TokenMetadataCache(network)
+    result: Dict[str, dict] = {}
+    unknown = []
+
+    for contract_hash in dict.fromkeys(h.lower() for h in contract_hashes):
+        cached = cache.get(contract_hash)
+        if cached:
+            result[contract_hash] = cached
+        else:
+            unknown.append(contract_hash)
+
+    if not unknown:
+        return result
+
+    chunks = [unknown[i:i + TOKENS_PER_SCRIPT] for i in range(0, len(unknown), TOKENS_PER_SCRIPT)]
+    responses = rpc_batch(rpc_url, [("invokescript", [build_metadata_script(chunk)]) for chunk in chunks])
+
+    resolved = {}
+    for chunk, response in zip(chunks, responses):
+        invocation = response.get("result") or {}
+        stack = invocation.get("stack") or []
+        if invocation.get("state") != "HALT" or len(stack) != 2 * len(chunk):
+            continue
+        for i, contract_hash in enumerate(chunk):
+            symbol = _symbol(stack[2 * i])
+            decimals = _decimals(stack[2 * i + 1])
+            if symbol is not None and decimals is not None:
+                resolved[contract_hash] = {"symbol": symbol, "decimals": decimals}
+
+    cache.update(resolved)
+    result.update(resolved)
+    return result
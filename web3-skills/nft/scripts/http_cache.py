@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+NFT HTTP Cache
+Stores JSON responses with their validators and revalidates with conditional requests
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Callable, Dict, Optional
+
+import rate_limit
+
+CACHE_DIR_ENV = "NFT_HTTP_CACHE_DIR"
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "spoon-skills", "nft_http")
+
+# Seconds a stored response is served without contacting the server, by URL.
+# Once that passes the request is sent with If-None-Match / If-Modified-Since,
+# so an unchanged resource costs a 304 instead of the full body.
+ENDPOINT_TTLS = [
+    (re.compile(r"/collections/[^/?]+/stats(\?|$)"), 60),
+    (re.compile(r"/collections\?"), 300),  # Collection rankings
+    (re.compile(r"/collections/[^/?]+(\?|$)"), 3600),
+    (re.compile(r"/traits/[^/?]+(\?|$)"), 3600),
+]
+DEFAULT_TTL = 60
+
+
+def endpoint_ttl(url: str) -> int:
+    for pattern, ttl in ENDPOINT_TTLS:
+        if pattern.search(url):
+            return ttl
+    return DEFAULT_TTL
+
+
+class HttpCache:
+    """One file per URL holding the body, ETag, Last-Modified and store time"""
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or os.getenv(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode()).hexdigest()[:32] + ".json")
+
+    def get(self, url: str) -> Optional[Dict]:
+        try:
+            with open(self._path(url), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    def put(self, url: str, entry: Dict):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(url)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(dict(entry, url=url), f)
+        os.replace(tmp_path, path)
+
+
+_cache: Optional[HttpCache] = None
+
+
+def get_cache() -> HttpCache:
+    global _cache
+    if _cache is None:
+        _cache = HttpCache()
+    return _cache
+
+
+def fetch_json(url: str, headers: Dict[str, str], ttl: Optional[int] = None, timeout: int = 30,
+               on_send: Optional[Callable[[], None]] = None) -> dict:
+    """GET a JSON resource through the cache.
+
+    HTTP and network errors propagate as urllib raises them, so callers keep
+    their own error mapping. Only 200 responses are stored. on_send is passed
+    to rate_limit.urlopen and is not called when the cache answers.
+    """
+    cache = get_cache()
+    ttl = endpoint_ttl(url) if ttl is None else ttl
+    entry = cache.get(url)
+
+    if entry is not None and time.time() - entry.get("stored_at", 0) < ttl:
+        return json.loads(entry["body"])
+
+    request_headers = dict(headers)
+    if entry is not None:
+        if entry.get("etag"):
+            request_headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            request_headers["If-Modified-Since"] = entry["last_modified"]
+
+    try:
+        req = urllib.request.Request(url, headers=request_headers)
+        with rate_limit.urlopen(req, timeout=timeout, on_send=on_send) as response:
+            body = response.read().decode()
+            etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+    except urllib.error.HTTPError as e:
+        if e.code != 304 or entry is None:
+            raise
+        # Not modified: keep the stored body and start a new TTL window
+        entry["stored_at"] = time.time()
+        cache.put(url, entry)
+        return json.loads(entry["body"])
+
+    data = json.loads(body)
+    if etag or last_modified or ttl > 0:
+        cache.put(url, {"body": body, "etag": etag, "last_modified": last_modified, "stored_at": time.time()})
+    return data
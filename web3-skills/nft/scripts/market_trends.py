@@ -7,10 +7,12 @@ Fetches NFT market trends and top collections
 import json
 import sys
 import os
-import urllib.request
 import urllib.error
 from datetime import datetime
 
+import http_cache
+import rate_limit
+
 OPENSEA_API_V2 = "https://api.opensea.io/api/v2"
 
 
@@ -25,9 +27,7 @@ def fetch_json(url: str, api_key: str = None) -> dict:
         headers["X-API-KEY"] = api_key
 
     try:
-        req = urllib.request.Request(url, headers=headers)
-        with urllib.request.urlopen(req, timeout=30) as response:
-            return json.loads(response.read().decode())
+        return http_cache.fetch_json(url, headers)
     except urllib.error.HTTPError as e:
         raise ConnectionError(f"API error: {e.code} - {e.reason}")
     except urllib.error.URLError as e:
@@ -183,7 +183,7 @@ def main():
         else:
             result = get_trending_collections(timeframe, chain, limit)
 
-        print(json.dumps(result, indent=2))
+        print(json.dumps(rate_limit.attach_stats(result), indent=2))
 
     except json.JSONDecodeError:
         print(json.dumps({"error": "Invalid JSON input"}))
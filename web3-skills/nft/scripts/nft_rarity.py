@@ -7,15 +7,45 @@ Calculates rarity scores based on trait distribution
 import json
 import sys
 import os
+import hashlib
+import urllib.parse
 import urllib.request
 import urllib.error
 import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import http_cache
+import rate_limit
+from rarity_index import (RarityIndex, clear_checkpoint, index_path, load_checkpoint, mark_checked, open_index,
+                          resolve_alias, save_alias, save_checkpoint, write_index)
+
+try:
+    import numpy as np
+except ImportError:  # Only collection ranking needs it
+    np = None
 
 OPENSEA_API_V2 = "https://api.opensea.io/api/v2"
 
+# Collection ranking
+NFTS_PAGE_SIZE = 200  # OpenSea list endpoint maximum
+MAX_COLLECTION_SIZE = 50000  # Larger collections are refused rather than ranked from a partial crawl
+TRAIT_FETCH_WORKERS = 8  # Concurrent single-NFT fetches for listings without traits
+TRAIT_FETCH_BATCH = 32  # Single-NFT fetches between checkpoints, about 8s at 4 requests/s
+CHECKPOINT_PAGES = 10  # Listing pages between checkpoints
+CRAWL_BUDGET = 80  # Seconds a rank call crawls before checkpointing, under the 120s script timeout
+DEFAULT_RANKING_LIMIT = 100
+
+# Numeric traits (levels, dates, boosts) are not categorical and are left out
+# of frequency-based rarity, as OpenRarity does
+NUMERIC_DISPLAY_TYPES = {"number", "boost_number", "boost_percentage", "date"}
+MISSING_TRAIT = "None"
+
 
-def fetch_json(url: str, api_key: str = None) -> dict:
-    """Fetch JSON from URL with optional API key"""
+def fetch_json(url: str, api_key: str = None, cached: bool = False) -> dict:
+    """Fetch JSON from URL with optional API key, optionally through the HTTP cache"""
     headers = {
         "Accept": "application/json",
         "User-Agent": "NFT-Skill/1.0"
@@ -25,8 +55,10 @@ def fetch_json(url: str, api_key: str = None) -> dict:
         headers["X-API-KEY"] = api_key
 
     try:
+        if cached:
+            return http_cache.fetch_json(url, headers)
         req = urllib.request.Request(url, headers=headers)
-        with urllib.request.urlopen(req, timeout=30) as response:
+        with rate_limit.urlopen(req, timeout=30) as response:
             return json.loads(response.read().decode())
     except urllib.error.HTTPError as e:
         raise ConnectionError(f"API error: {e.code} - {e.reason}")
@@ -186,19 +218,389 @@ def get_recommendation(score: float, tier: str) -> str:
         return "Common traits. Likely to trade at or near floor price. Consider for floor sweeping."
 
 
+def resolve_collection_slug(collection: str, chain: str, api_key: str = None) -> str:
+    """Collection slug for a slug or contract address"""
+    if collection.startswith("0x") and len(collection) == 42:
+        data = fetch_json(f"{OPENSEA_API_V2}/chain/{chain}/contract/{collection}", api_key)
+        slug = data.get("collection")
+        if not slug:
+            raise ValueError(f"No OpenSea collection for contract: {collection}")
+        return slug
+    return collection
+
+
+def categorical_traits(traits: Optional[list]) -> Dict[str, str]:
+    """trait_type -> value for the traits that count towards rarity"""
+    return {
+        str(t.get("trait_type", "Unknown")): str(t.get("value", "Unknown"))
+        for t in traits or []
+        if t.get("display_type") not in NUMERIC_DISPLAY_TYPES
+    }
+
+
+class CrawlIncomplete(Exception):
+    """A collection crawl stopped at its deadline with its progress checkpointed"""
+
+    def __init__(self, slug: str, progress: Dict):
+        super().__init__(f"Crawl of {slug} is not finished")
+        self.slug = slug
+        self.progress = progress
+
+
+def fetch_collection_traits(slug: str, chain: str = "ethereum", api_key: str = None,
+                            deadline: Optional[float] = None) -> Tuple[List[Tuple[Tuple[str, str], Dict[str, str]]], Dict]:
+    """((contract, token_id), traits) for every NFT in a collection, plus crawl stats.
+
+    Pages through the collection listing endpoint once. OpenSea's v2 listing
+    usually omits traits and there is no bulk traits endpoint, so those NFTs
+    are fetched individually: about supply / OPENSEA_RATE_LIMIT seconds, the
+    cost reported as trait_fetches. Collections over MAX_COLLECTION_SIZE
+    raise instead of being ranked from a partial crawl.
+
+    Progress is checkpointed as it goes. Past the time.monotonic() deadline
+    the crawl stops with CrawlIncomplete, and the next call resumes it.
+    """
+    checkpoint = load_checkpoint(chain, slug) or {"started_at": time.time()}
+    tokens: Dict[Tuple[str, str], Optional[Dict[str, str]]] = {
+        tuple(key.split("/", 1)): traits for key, traits in checkpoint.get("tokens", {}).items()
+    }
+    cursor = checkpoint.get("cursor")
+    listed = checkpoint.get("listed", False)
+    trait_fetches = checkpoint.get("trait_fetches", 0)
+
+    def save():
+        save_checkpoint(chain, slug, {
+            "started_at": checkpoint["started_at"],
+            "cursor": cursor,
+            "listed": listed,
+            "trait_fetches": trait_fetches,
+            "tokens": {f"{contract}/{token_id}": traits for (contract, token_id), traits in tokens.items()}
+        })
+
+    def stop_if_out_of_time():
+        if deadline is not None and time.monotonic() >= deadline:
+            save()
+            raise CrawlIncomplete(slug, {
+                "listed": len(tokens),
+                "listing_complete": listed,
+                "traits_missing": sum(1 for traits in tokens.values() if traits is None),
+                "trait_fetches": trait_fetches
+            })
+
+    pages = 0
+    while not listed:
+        url = f"{OPENSEA_API_V2}/collection/{slug}/nfts?limit={NFTS_PAGE_SIZE}"
+        if cursor:
+            url += f"&next={urllib.parse.quote(cursor)}"
+        data = fetch_json(url, api_key)
+
+        for nft in data.get("nfts", []):
+            key = (str(nft.get("contract", "")).lower(), str(nft.get("identifier")))
+            traits = nft.get("traits")
+            tokens[key] = categorical_traits(traits) if traits is not None else None
+
+        cursor = data.get("next")
+        if not cursor:
+            listed = True
+            break
+        if len(tokens) >= MAX_COLLECTION_SIZE:
+            clear_checkpoint(chain, slug)
+            raise ValueError(f"Collection {slug} has more than {MAX_COLLECTION_SIZE} NFTs, too many to rank")
+
+        pages += 1
+        if pages % CHECKPOINT_PAGES == 0:
+            save()
+        stop_if_out_of_time()
+
+    missing = [key for key, traits in tokens.items() if traits is None]
+
+    def fetch_traits(key: Tuple[str, str]) -> Dict[str, str]:
+        contract, token_id = key
+        url = f"{OPENSEA_API_V2}/chain/{chain}/contract/{contract}/nfts/{token_id}"
+        return categorical_traits(fetch_json(url, api_key).get("nft", {}).get("traits"))
+
+    with ThreadPoolExecutor(max_workers=TRAIT_FETCH_WORKERS) as pool:
+        for start in range(0, len(missing), TRAIT_FETCH_BATCH):
+            stop_if_out_of_time()
+            batch = missing[start:start + TRAIT_FETCH_BATCH]
+            for key, traits in zip(batch, pool.map(fetch_traits, batch)):
+                tokens[key] = traits
+            trait_fetches += len(batch)
+            save()
+
+    clear_checkpoint(chain, slug)
+    return list(tokens.items()), {"listed": len(tokens), "trait_fetches": trait_fetches}
+
+
+def rank_tokens(tokens: List[Tuple[Tuple[str, str], Dict[str, str]]]) -> Dict:
+    """Score and rank every token of a collection in one pass.
+
+    Builds a tokens x trait-types matrix of value codes (absent traits count
+    as the value "None"), turns it into trait frequencies with bincount, and
+    derives three scores per token:
+
+    - information_content: sum of -log2(frequency), normalized by the
+      collection's trait entropy (the OpenRarity score, used for ranking)
+    - rarity_score: sum of 1 / frequency (the rarity.tools score)
+    - statistical_log10: log10 of the product of frequencies (lower is rarer)
+    """
+    if np is None:
+        raise ValueError("numpy package not installed. Run: pip install numpy")
+    if not tokens:
+        raise ValueError("Collection has no tokens")
+
+    keys = [key for key, _ in tokens]
+    trait_types = sorted({trait_type for _, traits in tokens for trait_type in traits})
+    n = len(tokens)
+
+    codes = np.zeros((n, max(len(trait_types), 1)), dtype=np.int32)
+    values: List[List[str]] = []
+    for column, trait_type in enumerate(trait_types):
+        lookup: Dict[str, int] = {}
+        codes[:, column] = [
+            lookup.setdefault(traits.get(trait_type, MISSING_TRAIT), len(lookup)) for _, traits in tokens
+        ]
+        values.append(list(lookup))
+
+    counts = [np.bincount(codes[:, column]) for column in range(len(trait_types))]
+    if trait_types:
+        frequencies = np.column_stack([counts[column][codes[:, column]] for column in range(len(trait_types))]) / n
+    else:
+        frequencies = np.ones((n, 1))
+
+    information = -np.log2(frequencies).sum(axis=1)
+    entropy = sum(float(-(p * np.log2(p)).sum()) for p in (c / n for c in counts))
+    information_content = information / entropy if entropy > 0 else np.zeros(n)
+    rarity_score = (1 / frequencies).sum(axis=1)
+    statistical_log10 = np.log10(frequencies).sum(axis=1)
+
+    # Competition ranking: equal scores share a rank
+    keys = -np.round(information_content, 10)
+    ranks = np.searchsorted(np.sort(keys), keys, side="left") + 1
+    percentile = 100.0 * (n - ranks) / (n - 1) if n > 1 else np.full(n, 100.0)
+
+    trait_summary = []
+    for column, trait_type in enumerate(trait_types):
+        rarest = int(np.argmin(counts[column]))
+        trait_summary.append({
+            "trait_type": trait_type,
+            "values": len(values[column]),
+            "rarest": {"value": values[column][rarest], "count": int(counts[column][rarest])}
+        })
+
+    return {
+        "tokens": keys,
+        "ranks": ranks,
+        "information_content": information_content,
+        "rarity_score": rarity_score,
+        "statistical_log10": statistical_log10,
+        "percentile": percentile,
+        "trait_types": trait_types,
+        "trait_summary": trait_summary
+    }
+
+
+def ranking_entry(ranking: Dict, index: int) -> Dict:
+    percentile = float(ranking["percentile"][index])
+    contract, token_id = ranking["tokens"][index]
+    return {
+        "contract": contract,
+        "token_id": token_id,
+        "rank": int(ranking["ranks"][index]),
+        "score": round(float(ranking["information_content"][index]), 6),
+        "rarity_score": round(float(ranking["rarity_score"][index]), 4),
+        "statistical_log10": round(float(ranking["statistical_log10"][index]), 4),
+        "percentile": round(percentile, 2),
+        "tier": get_rarity_tier(percentile)
+    }
+
+
+def collection_fingerprint(slug: str, api_key: str = None) -> Tuple[int, Optional[bytes]]:
+    """Total supply and a hash of the trait counts, the two things a ranking depends on.
+
+    The digest is None when the trait counts could not be fetched, meaning
+    unknown rather than changed.
+    """
+    info = fetch_json(f"{OPENSEA_API_V2}/collections/{slug}", api_key, cached=True)
+    try:
+        counts = fetch_json(f"{OPENSEA_API_V2}/traits/{slug}", api_key, cached=True).get("counts", {})
+    except ConnectionError:
+        return int(info.get("total_supply") or 0), None
+    digest = hashlib.sha256(json.dumps(counts, sort_keys=True).encode()).digest() if counts else b""
+    return int(info.get("total_supply") or 0), digest
+
+
+def build_rarity_index(slug: str, chain: str, api_key: str = None,
+                       fingerprint: Optional[Tuple[int, bytes]] = None,
+                       deadline: Optional[float] = None) -> RarityIndex:
+    """Crawl, rank and write the collection's rarity index; CrawlIncomplete past the deadline"""
+    if np is None:
+        raise ValueError("numpy package not installed. Run: pip install numpy")
+
+    supply, digest = fingerprint or collection_fingerprint(slug, api_key)
+    digest = digest or b""
+    tokens, crawl = fetch_collection_traits(slug, chain, api_key, deadline)
+    ranking = rank_tokens(tokens)
+    entries = (ranking_entry(ranking, i) for i in range(len(ranking["tokens"])))
+
+    path = index_path(chain, slug)
+    write_index(path, entries, supply, len(ranking["trait_types"]), digest, ranking["trait_summary"], crawl)
+    return RarityIndex(path)
+
+
+def get_rarity_index(collection: str, chain: str = "ethereum", api_key: str = None,
+                     refresh: bool = False, deadline: Optional[float] = None) -> Tuple[RarityIndex, str]:
+    """The collection's rarity index and how it was obtained ("index", "revalidated",
+    "unverified" or "built").
+
+    A recently checked index is used with no network access. An older one
+    costs two small requests to compare supply and trait counts, and the
+    collection is only crawled again when either has changed. If the trait
+    counts cannot be fetched the index is kept as is and checked again on
+    the next call.
+    """
+    slug = resolve_alias(chain, collection) or resolve_collection_slug(collection, chain, api_key)
+    if slug != collection:
+        save_alias(chain, collection, slug)
+
+    index = None if refresh else open_index(chain, slug)
+    if index is not None:
+        if index.is_fresh():
+            return index, "index"
+        fingerprint = collection_fingerprint(slug, api_key)
+        if fingerprint[0] == index.supply and fingerprint[1] is None:
+            return index, "unverified"
+        if fingerprint[0] == index.supply and fingerprint[1].ljust(32, b"\0") == index.fingerprint:
+            mark_checked(index.path)
+            return index, "revalidated"
+        index.close()
+        return build_rarity_index(slug, chain, api_key, fingerprint, deadline), "built"
+
+    return build_rarity_index(slug, chain, api_key, deadline=deadline), "built"
+
+
+def collection_contract(collection: str) -> Optional[str]:
+    """The contract address when a collection is given as one, else None"""
+    return collection.lower() if collection.startswith("0x") and len(collection) == 42 else None
+
+
+def find_local_index(collection: str, chain: str = "ethereum") -> Optional[RarityIndex]:
+    """An existing index for a slug or previously seen contract address, without network access"""
+    return open_index(chain, resolve_alias(chain, collection) or collection)
+
+
+def rank_collection(collection: str, chain: str = "ethereum", limit: int = DEFAULT_RANKING_LIMIT,
+                    token_id: Optional[str] = None, refresh: bool = False,
+                    crawl_budget: Optional[float] = CRAWL_BUDGET) -> dict:
+    """Rank every NFT in a collection by trait rarity.
+
+    A crawl that does not finish within crawl_budget seconds is checkpointed
+    and reported as in progress; repeating the call continues it.
+    """
+    api_key = os.getenv("OPENSEA_API_KEY")
+    deadline = time.monotonic() + crawl_budget if crawl_budget is not None else None
+    try:
+        index, source = get_rarity_index(collection, chain, api_key, refresh, deadline)
+    except CrawlIncomplete as e:
+        return {
+            "success": True,
+            "collection": e.slug,
+            "chain": chain,
+            "status": "crawling",
+            "crawl": e.progress,
+            "note": "Crawl progress is saved; repeat this request to continue it"
+        }
+    slug = os.path.splitext(os.path.basename(index.path))[0]
+
+    result = {
+        "success": True,
+        "collection": slug,
+        "chain": chain,
+        "total_supply": index.count,
+        "trait_types": index.trait_types,
+        "ranking_method": "information_content",
+        "rankings": index.top(limit),
+        "trait_summary": index.trait_summary(),
+        "index": {
+            "source": source,
+            "built_at": datetime.utcfromtimestamp(index.built_at).isoformat(),
+            "crawl": index.crawl_stats()
+        }
+    }
+
+    if token_id is not None:
+        result["token"] = index.get(token_id, collection_contract(collection))
+
+    index.close()
+    return result
+
+
+def lookup_indexed_rarity(collection: str, token_id: str, chain: str = "ethereum") -> Optional[dict]:
+    """Rank and score of one token from an existing index, or None if the collection has none.
+
+    Never crawls: an index past its revalidation window is still served, with
+    "stale": true, and only a "rank" call rebuilds it.
+    """
+    index = find_local_index(collection, chain)
+    if index is None:
+        return None
+
+    entry = index.get(token_id, collection_contract(collection))
+    total = index.count
+    stale = not index.is_fresh()
+    index.close()
+    if entry is None:
+        return None
+
+    return {
+        "success": True,
+        "nft": {
+            "collection": collection,
+            "token_id": token_id
+        },
+        "rarity": {
+            "score": entry["score"],
+            "rank": entry["rank"],
+            "out_of": total,
+            "percentile": entry["percentile"],
+            "tier": entry["tier"],
+            "rarity_score": entry["rarity_score"]
+        },
+        "analysis": {
+            "recommendation": get_recommendation(entry["percentile"], entry["tier"])
+        },
+        "source": "rarity_index",
+        "stale": stale
+    }
+
+
 def main():
     try:
         input_data = json.loads(sys.stdin.read())
 
         collection = input_data.get("collection")
         token_id = input_data.get("token_id")
+        action = input_data.get("action", "token")
+
+        if action == "rank" and collection:
+            result = rank_collection(
+                collection,
+                input_data.get("chain", "ethereum"),
+                int(input_data.get("limit", DEFAULT_RANKING_LIMIT)),
+                str(token_id) if token_id is not None else None,
+                bool(input_data.get("refresh", False))
+            )
+            print(json.dumps(rate_limit.attach_stats(result), indent=2))
+            return
 
         if not collection or not token_id:
             print(json.dumps({"error": "Missing required parameters: collection, token_id"}))
             sys.exit(1)
 
-        result = calculate_rarity(collection, str(token_id))
-        print(json.dumps(result, indent=2))
+        result = lookup_indexed_rarity(collection, str(token_id), input_data.get("chain", "ethereum"))
+        if result is None:
+            result = calculate_rarity(collection, str(token_id))
+        print(json.dumps(rate_limit.attach_stats(result), indent=2))
 
     except json.JSONDecodeError:
         print(json.dumps({"error": "Invalid JSON input"}))
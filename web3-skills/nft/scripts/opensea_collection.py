@@ -7,13 +7,27 @@ Fetches collection data from OpenSea API
 import json
 import sys
 import os
-import urllib.request
+import threading
+import time
 import urllib.error
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+
+import http_cache
+import rate_limit
 
 OPENSEA_API_V2 = "https://api.opensea.io/api/v2"
 
+# A keyed request that fails, or has not answered this long after it was
+# sent, is raced against an unkeyed one; whichever succeeds first wins
+HEDGE_DELAY = 1.0
+
+REQUEST_WORKERS = 32  # Concurrent HTTP requests across all collections
+COLLECTION_WORKERS = 16  # Collections processed at once in multi-collection mode
+MAX_COLLECTIONS = 500
+
 
-def fetch_json(url: str, api_key: str = None) -> dict:
+def fetch_json(url: str, api_key: str = None, on_send: Optional[Callable[[], None]] = None) -> dict:
     """Fetch JSON from URL with optional API key"""
     headers = {
         "Accept": "application/json",
@@ -24,9 +38,7 @@ def fetch_json(url: str, api_key: str = None) -> dict:
         headers["X-API-KEY"] = api_key
 
     try:
-        req = urllib.request.Request(url, headers=headers)
-        with urllib.request.urlopen(req, timeout=30) as response:
-            return json.loads(response.read().decode())
+        return http_cache.fetch_json(url, headers, on_send=on_send)
     except urllib.error.HTTPError as e:
         if e.code == 401:
             raise ValueError("Invalid or missing OpenSea API key")
@@ -37,42 +49,106 @@ def fetch_json(url: str, api_key: str = None) -> dict:
         raise ConnectionError(f"Failed to fetch data: {e}")
 
 
-def get_collection_stats(collection_slug: str, api_key: str = None) -> dict:
-    """Get collection statistics from OpenSea"""
-    url = f"{OPENSEA_API_V2}/collections/{collection_slug}/stats"
-    data = fetch_json(url, api_key)
-
-    if not data:
-        raise ValueError(f"No stats found for collection: {collection_slug}")
-
-    return data
-
-
-def get_collection_info(collection_slug: str, api_key: str = None) -> dict:
-    """Get collection information from OpenSea"""
-    url = f"{OPENSEA_API_V2}/collections/{collection_slug}"
-    data = fetch_json(url, api_key)
-
-    if not data:
-        raise ValueError(f"Collection not found: {collection_slug}")
-
-    return data
+_request_pool: Optional[ThreadPoolExecutor] = None
+_request_pool_lock = threading.Lock()
+
+
+def request_pool() -> ThreadPoolExecutor:
+    """Process-wide pool that runs individual HTTP requests"""
+    global _request_pool
+    with _request_pool_lock:
+        if _request_pool is None:
+            _request_pool = ThreadPoolExecutor(max_workers=REQUEST_WORKERS)
+    return _request_pool
+
+
+class HedgedRequest:
+    """A keyed request for one URL, raced against an unkeyed one when it fails
+    or has been on the wire for HEDGE_DELAY.
+
+    The delay is timed from when the keyed request is actually sent, after
+    its pool slot and rate limit token, so queueing never triggers a hedge.
+    The first success resolves future and the other attempt is cancelled if
+    it has not started; if every attempt fails, the keyed error is raised.
+    """
+
+    def __init__(self, pool: ThreadPoolExecutor, url: str, api_key: str = None):
+        self.future: Future = Future()
+        self._pool = pool
+        self._url = url
+        self._lock = threading.Lock()
+        self._attempts: List[Future] = []
+        self._timer: Optional[threading.Timer] = None
+        self._hedged = not api_key  # Without a key there is nothing to hedge with
+        self._submit(fetch_json, url, api_key, None if self._hedged else self._on_send)
+
+    def _submit(self, *args):
+        attempt = self._pool.submit(*args)
+        with self._lock:
+            self._attempts.append(attempt)
+        attempt.add_done_callback(self._on_done)
+
+    def _on_send(self):
+        with self._lock:
+            if self._timer is not None or self.future.done():
+                return
+            self._timer = threading.Timer(HEDGE_DELAY, self._hedge)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _hedge(self):
+        with self._lock:
+            if self._hedged or self.future.done():
+                return
+            self._hedged = True
+        self._submit(fetch_json, self._url)
+
+    def _on_done(self, attempt: Future):
+        if attempt.cancelled():
+            return
+        if attempt.exception() is None:
+            with self._lock:
+                if self.future.done():
+                    return
+                self.future.set_result(attempt.result())
+                losers = [other for other in self._attempts if other is not attempt]
+                timer = self._timer
+            if timer is not None:
+                timer.cancel()
+            for loser in losers:
+                loser.cancel()
+            return
+
+        self._hedge()
+        with self._lock:
+            if not self.future.done() and self._hedged and all(a.done() for a in self._attempts):
+                self.future.set_exception(self._attempts[0].exception())
+
+
+def fetch_hedged(urls: List[str], api_key: str = None) -> Dict[str, Future]:
+    """Fetch several URLs concurrently, hedging keyed requests with unkeyed ones.
+
+    Returns a future per URL holding the first successful response.
+    """
+    pool = request_pool()
+    return {url: HedgedRequest(pool, url, api_key).future for url in urls}
 
 
 def get_collection_data(collection_slug: str, chain: str = "ethereum") -> dict:
     """Get comprehensive collection data"""
     api_key = os.getenv("OPENSEA_API_KEY")
 
-    # Fetch collection info
-    try:
-        info = get_collection_info(collection_slug, api_key)
-    except Exception as e:
-        # Try without API key for public data
-        info = get_collection_info(collection_slug)
+    # Fetch collection info and stats together
+    info_url = f"{OPENSEA_API_V2}/collections/{collection_slug}"
+    stats_url = f"{OPENSEA_API_V2}/collections/{collection_slug}/stats"
+    responses = fetch_hedged([info_url, stats_url], api_key)
+
+    info = responses[info_url].result()
+    if not info:
+        raise ValueError(f"Collection not found: {collection_slug}")
 
-    # Fetch collection stats
     try:
-        stats = get_collection_stats(collection_slug, api_key)
+        stats = responses[stats_url].result() or {}
     except Exception:
         stats = {}
 
@@ -133,6 +209,47 @@ def get_collection_data(collection_slug: str, chain: str = "ethereum") -> dict:
     }
 
 
+def get_collections_data(collection_slugs: List[str], chain: str = "ethereum",
+                         max_parallel: int = COLLECTION_WORKERS,
+                         on_result: Optional[Callable[[dict], None]] = None) -> dict:
+    """Collection data for many slugs, a bounded number at a time.
+
+    Results come back in input order, or, when on_result is given, are
+    passed to it in completion order and left out of the returned summary.
+    """
+    slugs = list(dict.fromkeys(collection_slugs))
+    if len(slugs) > MAX_COLLECTIONS:
+        raise ValueError(f"Too many collections: {len(slugs)} (max {MAX_COLLECTIONS})")
+
+    def fetch(slug: str) -> dict:
+        try:
+            return get_collection_data(slug, chain)
+        except Exception as e:
+            return {"success": False, "slug": slug, "error": str(e)}
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_parallel, REQUEST_WORKERS))) as pool:
+        if on_result is None:
+            results = list(pool.map(fetch, slugs))
+        else:
+            results = []
+            for future in as_completed([pool.submit(fetch, slug) for slug in slugs]):
+                result = future.result()
+                on_result(result)
+                results.append({"success": result.get("success")})
+
+    summary = {
+        "success": True,
+        "chain": chain,
+        "count": len(results),
+        "errors": sum(1 for r in results if not r.get("success")),
+        "elapsed_seconds": round(time.monotonic() - started, 2)
+    }
+    if on_result is None:
+        summary["results"] = results
+    return summary
+
+
 def calculate_liquidity_score(total_stats: dict, day_stats: dict) -> str:
     """Calculate a simple liquidity score based on volume and sales"""
     daily_volume = day_stats.get("volume", 0)
@@ -153,14 +270,32 @@ def main():
         input_data = json.loads(sys.stdin.read())
 
         collection = input_data.get("collection")
+        collections = input_data.get("collections")
         chain = input_data.get("chain", "ethereum")
 
+        if collections:
+            if not isinstance(collections, list):
+                print(json.dumps({"error": "collections must be a list"}))
+                sys.exit(1)
+            max_parallel = int(input_data.get("max_parallel", COLLECTION_WORKERS))
+            if input_data.get("stream", False):
+                # One line per collection as it completes, so a killed run keeps what it finished
+                def on_result(item: dict):
+                    print(json.dumps(item), flush=True)
+
+                summary = get_collections_data(collections, chain, max_parallel, on_result)
+                print(json.dumps({"stats": rate_limit.attach_stats(summary)}), flush=True)
+                return
+            result = get_collections_data(collections, chain, max_parallel)
+            print(json.dumps(rate_limit.attach_stats(result), indent=2))
+            return
+
         if not collection:
             print(json.dumps({"error": "Missing required parameter: collection"}))
             sys.exit(1)
 
         result = get_collection_data(collection, chain)
-        print(json.dumps(result, indent=2))
+        print(json.dumps(rate_limit.attach_stats(result), indent=2))
 
     except json.JSONDecodeError:
         print(json.dumps({"error": "Invalid JSON input"}))
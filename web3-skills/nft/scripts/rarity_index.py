@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+NFT Rarity Index
+Per-collection rarity scores and ranks in an mmap-able binary file
+
+File layout (all integers little-endian):
+    header   magic b"NFTR", uint32 version, uint32 token count, uint32 total supply,
+             uint32 trait type count, uint32 by-rank offset, uint32 summary offset,
+             uint32 padding, float64 built at, float64 checked at, fingerprint[32]
+    records  sorted by token id then contract, 84 bytes each: token id[32] (uint256
+             big-endian), contract[20] (zero for non-EVM contracts), float64 score,
+             float64 rarity score, float32 statistical log10, uint32 rank,
+             float32 percentile, uint8 tier, 3 bytes padding
+    by rank  uint32 record indices in rank order
+    summary  UTF-8 JSON {"traits": trait summary, "crawl": crawl stats}
+
+The fingerprint hashes the collection's trait counts as OpenSea reports them,
+so together with the total supply it tells whether the ranking is stale.
+"""
+
+import json
+import mmap
+import os
+import struct
+import time
+from typing import Dict, Iterable, List, Optional
+
+MAGIC = b"NFTR"
+VERSION = 2
+HEADER = struct.Struct("<4sIIIIIIIdd32s")
+RECORD = struct.Struct("<32s20sddfIfB3x")
+INDEX = struct.Struct("<I")
+CHECKED_AT_OFFSET = 40  # Byte offset of "checked at", rewritten on revalidation
+
+TIERS = ["COMMON", "UNCOMMON", "RARE", "EPIC", "LEGENDARY"]
+
+INDEX_DIR_ENV = "NFT_RARITY_INDEX_DIR"
+DEFAULT_INDEX_DIR = os.path.join(os.path.expanduser("~"), ".cache", "spoon-skills", "rarity_index")
+
+# Indexes are trusted without any network call for this long, then checked
+# against the collection's supply and trait counts
+REVALIDATE_AFTER = 6 * 3600
+
+# A partial crawl older than this is started over rather than resumed
+CHECKPOINT_MAX_AGE = 24 * 3600
+
+TOKEN_ID_WIDTH = 32
+CONTRACT_WIDTH = 20
+KEY_WIDTH = TOKEN_ID_WIDTH + CONTRACT_WIDTH
+NO_CONTRACT = bytes(CONTRACT_WIDTH)
+
+
+def contract_key(contract: Optional[str]) -> bytes:
+    """20 address bytes of an EVM contract, zeros for anything else"""
+    if contract and len(contract) == 42 and contract[:2] in ("0x", "0X"):
+        try:
+            return bytes.fromhex(contract[2:])
+        except ValueError:
+            pass
+    return NO_CONTRACT
+
+
+def token_key(token_id: str, contract: Optional[str] = None) -> Optional[bytes]:
+    """Fixed-width sort key of a numeric token id and its contract, None for non-numeric ids"""
+    try:
+        return int(token_id).to_bytes(TOKEN_ID_WIDTH, "big") + contract_key(contract)
+    except (ValueError, OverflowError):
+        return None
+
+
+class RarityIndex:
+    """Read-only token lookups that binary-search the mapped file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, count, supply, trait_types, by_rank_offset, summary_offset, _,
+         built_at, checked_at, fingerprint) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"Not a rarity index: {path}")
+
+        self.count = count
+        self.supply = supply
+        self.trait_types = trait_types
+        self.built_at = built_at
+        self.checked_at = checked_at
+        self.fingerprint = fingerprint
+        self._by_rank_offset = by_rank_offset
+        self._summary_offset = summary_offset
+
+    def is_fresh(self) -> bool:
+        return time.time() - self.checked_at < REVALIDATE_AFTER
+
+    def _key_at(self, index: int) -> bytes:
+        start = HEADER.size + index * RECORD.size
+        return self._mm[start:start + KEY_WIDTH]
+
+    def _entry(self, index: int) -> Dict:
+        token, contract, score, rarity_score, statistical, rank, percentile, tier = RECORD.unpack_from(
+            self._mm, HEADER.size + index * RECORD.size)
+        entry = {
+            "token_id": str(int.from_bytes(token, "big")),
+            "rank": rank,
+            "score": round(score, 6),
+            "rarity_score": round(rarity_score, 4),
+            "statistical_log10": round(statistical, 4),
+            "percentile": round(percentile, 2),
+            "tier": TIERS[tier]
+        }
+        if contract != NO_CONTRACT:
+            entry["contract"] = "0x" + contract.hex()
+        return entry
+
+    def get(self, token_id: str, contract: Optional[str] = None) -> Optional[Dict]:
+        """Score, rank and tier of a token, or None if it is not in the index.
+
+        Without a contract the first token with this id is returned, which is
+        only ambiguous for collections spanning several contracts.
+        """
+        key = token_key(token_id, contract)
+        if key is None:
+            return None
+        if contract is None:
+            key = key[:TOKEN_ID_WIDTH]
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self._key_at(lo)[:len(key)] == key:
+            return self._entry(lo)
+        return None
+
+    def top(self, limit: int) -> List[Dict]:
+        """The rarest tokens, best rank first"""
+        return [
+            self._entry(INDEX.unpack_from(self._mm, self._by_rank_offset + position * INDEX.size)[0])
+            for position in range(min(limit, self.count))
+        ]
+
+    def trait_summary(self) -> List[Dict]:
+        return json.loads(self._mm[self._summary_offset:].decode())["traits"]
+
+    def crawl_stats(self) -> Dict:
+        """Tokens listed and single-NFT trait fetches made when the index was built"""
+        return json.loads(self._mm[self._summary_offset:].decode())["crawl"]
+
+    def close(self):
+        self._mm.close()
+
+
+def index_path(chain: str, slug: str) -> str:
+    directory = os.getenv(INDEX_DIR_ENV) or DEFAULT_INDEX_DIR
+    return os.path.join(directory, chain, f"{slug}.bin")
+
+
+def open_index(chain: str, slug: str) -> Optional[RarityIndex]:
+    """The collection's index if one has been built, else None"""
+    try:
+        return RarityIndex(index_path(chain, slug))
+    except (OSError, ValueError):
+        return None
+
+
+def write_index(path: str, entries: Iterable[Dict], supply: int, trait_types: int,
+                fingerprint: bytes, trait_summary: List[Dict], crawl: Optional[Dict] = None) -> int:
+    """Write an index from ranked entries (contract, token_id, rank, score, rarity_score,
+    statistical_log10, percentile, tier); tokens with non-numeric ids are skipped"""
+    keyed = []
+    for entry in entries:
+        key = token_key(entry["token_id"], entry.get("contract"))
+        if key is not None:
+            keyed.append((key, entry))
+    keyed.sort(key=lambda item: item[0])
+
+    records = bytearray()
+    for key, entry in keyed:
+        records += RECORD.pack(key[:TOKEN_ID_WIDTH], key[TOKEN_ID_WIDTH:], entry["score"], entry["rarity_score"],
+                               entry["statistical_log10"], entry["rank"], entry["percentile"],
+                               TIERS.index(entry["tier"]))
+
+    by_rank_order = sorted(range(len(keyed)), key=lambda i: (keyed[i][1]["rank"], keyed[i][0]))
+    by_rank = b"".join(INDEX.pack(i) for i in by_rank_order)
+
+    by_rank_offset = HEADER.size + len(records)
+    summary_offset = by_rank_offset + len(by_rank)
+    now = time.time()
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(keyed), supply, trait_types, by_rank_offset, summary_offset, 0,
+                            now, now, fingerprint.ljust(32, b"\0")[:32]))
+        f.write(records)
+        f.write(by_rank)
+        f.write(json.dumps({"traits": trait_summary, "crawl": crawl or {}}).encode())
+    os.replace(tmp_path, path)
+
+    return len(keyed)
+
+
+def mark_checked(path: str):
+    """Record that the index was just confirmed current"""
+    with open(path, "r+b") as f:
+        f.seek(CHECKED_AT_OFFSET)
+        f.write(struct.pack("<d", time.time()))
+
+
+def _aliases_path(chain: str) -> str:
+    directory = os.getenv(INDEX_DIR_ENV) or DEFAULT_INDEX_DIR
+    return os.path.join(directory, chain, "aliases.json")
+
+
+def resolve_alias(chain: str, collection: str) -> Optional[str]:
+    """Slug previously recorded for a contract address"""
+    try:
+        with open(_aliases_path(chain), encoding="utf-8") as f:
+            return json.load(f).get(collection.lower())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def save_alias(chain: str, collection: str, slug: str):
+    path = _aliases_path(chain)
+    try:
+        with open(path, encoding="utf-8") as f:
+            aliases = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        aliases = {}
+    if aliases.get(collection.lower()) == slug:
+        return
+    aliases[collection.lower()] = slug
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(aliases, f)
+    os.replace(tmp_path, path)
+
+
+def _checkpoint_path(chain: str, slug: str) -> str:
+    directory = os.getenv(INDEX_DIR_ENV) or DEFAULT_INDEX_DIR
+    return os.path.join(directory, chain, f"{slug}.crawl.json")
+
+
+def load_checkpoint(chain: str, slug: str) -> Optional[Dict]:
+    """Saved state of an unfinished collection crawl, if recent enough to resume"""
+    try:
+        with open(_checkpoint_path(chain, slug), encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if time.time() - checkpoint.get("started_at", 0) > CHECKPOINT_MAX_AGE:
+        return None
+    return checkpoint
+
+
+def save_checkpoint(chain: str, slug: str, checkpoint: Dict):
+    """Best effort: an unwritable index directory only means the next call starts over"""
+    path = _checkpoint_path(chain, slug)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def clear_checkpoint(chain: str, slug: str):
+    try:
+        os.remove(_checkpoint_path(chain, slug))
+    except OSError:
+        pass
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+NFT API Rate Limiter
+Token bucket shared by every process on the machine through a locked state file
+"""
+
+import email.utils
+import os
+import random
+import struct
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: the bucket is only shared within a process
+    fcntl = None
+
+STATE_DIR_ENV = "NFT_RATE_LIMIT_DIR"
+DEFAULT_STATE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "spoon-skills", "rate_limits")
+
+# Requests per second and burst size for the OpenSea API key
+RATE_ENV = "OPENSEA_RATE_LIMIT"
+BURST_ENV = "OPENSEA_RATE_BURST"
+DEFAULT_RATE = 4.0
+DEFAULT_BURST = 4
+
+RETRIES = 4  # Attempts after a 429 response
+BACKOFF_BASE = 1.0  # Seconds, doubled per attempt when there is no Retry-After
+BACKOFF_CAP = 30.0
+
+# The bucket is stored as a single timestamp, as in GCRA: the time at which
+# it would next be completely full. One float per host, updated under flock.
+STATE = struct.Struct("<d")
+
+
+class TokenBucket:
+    """Cross-process token bucket for one API host.
+
+    Each request reserves a token under an exclusive file lock and then
+    sleeps outside the lock until its slot, so waiting callers queue in
+    order and the combined rate of all processes stays at rate_per_sec.
+    """
+
+    def __init__(self, name: str, rate_per_sec: float, burst: int, state_dir: Optional[str] = None):
+        self.interval = 1.0 / rate_per_sec
+        self.tolerance = (max(burst, 1) - 1) * self.interval
+        directory = state_dir or os.getenv(STATE_DIR_ENV) or DEFAULT_STATE_DIR
+        self.path = os.path.join(directory, f"{name}.bin")
+        self._thread_lock = threading.Lock()
+
+    def _update(self, reserve_at) -> float:
+        """Apply reserve_at(full_at, now) -> (new full_at, wait) under the lock"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        with self._thread_lock, os.fdopen(fd, "r+b") as f:
+            try:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                f.seek(0)
+                data = f.read(STATE.size)
+                full_at = STATE.unpack(data)[0] if len(data) == STATE.size else 0.0
+                now = time.time()
+                full_at, wait = reserve_at(full_at, now)
+                f.seek(0)
+                f.truncate()
+                f.write(STATE.pack(full_at))
+                f.flush()
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        return wait
+
+    def acquire(self) -> float:
+        """Take a token, sleeping until one is available; returns the seconds waited"""
+        def reserve(full_at: float, now: float):
+            full_at = max(full_at, now)
+            return full_at + self.interval, max(0.0, full_at - self.tolerance - now)
+
+        wait = self._update(reserve)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float):
+        """Hold every caller, in every process, for at least this long"""
+        def drain(full_at: float, now: float):
+            return max(full_at, now + seconds + self.tolerance), 0.0
+
+        self._update(drain)
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+_stats = {"requests": 0, "queue_wait_total": 0.0, "queue_wait_max": 0.0, "rate_limited": 0}
+_stats_lock = threading.Lock()
+
+
+def get_bucket(host: str) -> TokenBucket:
+    with _buckets_lock:
+        if host not in _buckets:
+            rate = float(os.getenv(RATE_ENV) or DEFAULT_RATE)
+            burst = int(os.getenv(BURST_ENV) or DEFAULT_BURST)
+            _buckets[host] = TokenBucket(host, rate, burst)
+        return _buckets[host]
+
+
+def retry_delay(error: urllib.error.HTTPError, attempt: int) -> float:
+    """Seconds to back off after a 429: Retry-After when given, else exponential, both jittered"""
+    retry_after = error.headers.get("Retry-After") if error.headers else None
+    if retry_after:
+        if retry_after.strip().isdigit():
+            return float(retry_after) + random.uniform(0, 0.5)
+        try:
+            moment = email.utils.parsedate_to_datetime(retry_after).timestamp()
+            return max(0.0, moment - time.time()) + random.uniform(0, 0.5)
+        except (TypeError, ValueError):
+            pass
+    delay = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def urlopen(req: urllib.request.Request, timeout: int = 30, on_send: Optional[Callable[[], None]] = None):
+    """urllib.request.urlopen behind the shared bucket for the request's host.
+
+    A 429 pauses the bucket for everyone, then the request is retried;
+    other errors propagate unchanged. on_send is called each time a token
+    has been taken and the request is about to go out.
+    """
+    bucket = get_bucket(urllib.parse.urlparse(req.full_url).hostname or "default")
+
+    for attempt in range(RETRIES + 1):
+        waited = bucket.acquire()
+        with _stats_lock:
+            _stats["requests"] += 1
+            _stats["queue_wait_total"] += waited
+            _stats["queue_wait_max"] = max(_stats["queue_wait_max"], waited)
+        if on_send:
+            on_send()
+        try:
+            return urllib.request.urlopen(req, timeout=timeout)
+        except urllib.error.HTTPError as e:
+            if e.code != 429 or attempt == RETRIES:
+                raise
+            with _stats_lock:
+                _stats["rate_limited"] += 1
+            bucket.pause(retry_delay(e, attempt))
+
+
+def stats() -> Dict:
+    """Requests sent by this process and the time they spent queued for a token"""
+    with _stats_lock:
+        requests = _stats["requests"]
+        return {
+            "requests": requests,
+            "rate_limited": _stats["rate_limited"],
+            "queue_wait_total_seconds": round(_stats["queue_wait_total"], 3),
+            "queue_wait_avg_seconds": round(_stats["queue_wait_total"] / requests, 3) if requests else 0,
+            "queue_wait_max_seconds": round(_stats["queue_wait_max"], 3)
+        }
+
+
+def attach_stats(result: dict) -> dict:
+    """Add this process's rate limit stats to a script result, if it sent any requests"""
+    current = stats()
+    if current["requests"]:
+        result["rate_limit"] = current
+    return result
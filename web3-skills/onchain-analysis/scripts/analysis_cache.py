@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Contract Analysis Cache
+Content-addressed store for contract_analyzer results keyed by source or bytecode hash
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Optional
+
+CACHE_DIR_ENV = "CONTRACT_ANALYSIS_CACHE_DIR"
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "spoon-skills", "contract_analysis")
+
+# Bump when the analysis output changes so stale entries are ignored
+ANALYSIS_VERSION = 2
+
+# Proxies can be repointed, so their address mapping is rechecked after this long
+PROXY_MAPPING_TTL = 3600
+
+# An unverified contract can be verified later, so an address mapped to its
+# bytecode hash is rechecked against getsourcecode after this long
+UNVERIFIED_MAPPING_TTL = 6 * 3600
+
+
+def source_key(source_info: dict) -> str:
+    """Content key for a verified contract from its getsourcecode entry"""
+    digest = hashlib.sha256()
+    for field in ("SourceCode", "ABI", "ContractName", "CompilerVersion", "Proxy"):
+        digest.update(str(source_info.get(field, "")).encode())
+        digest.update(b"\0")
+    return f"src-{digest.hexdigest()}"
+
+
+def bytecode_key(runtime_code: str) -> str:
+    """Content key for an unverified contract from its runtime bytecode"""
+    return f"code-{hashlib.sha256(runtime_code.lower().encode()).hexdigest()}"
+
+
+class AnalysisCache:
+    """Analysis results stored once per content hash, plus an address -> hash map.
+
+    Results live in one JSON file per hash. The address map is an append-only
+    JSON-lines log (later lines win), so recording thousands of addresses costs
+    one small append each instead of rewriting a large index. Writes are best
+    effort: a read-only or full cache directory leaves the analysis uncached.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or os.getenv(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR
+        self.results_dir = os.path.join(self.cache_dir, f"v{ANALYSIS_VERSION}")
+        self.index_path = os.path.join(self.results_dir, "addresses.jsonl")
+        self._addresses: Optional[Dict[str, dict]] = None
+        self._results: Dict[str, dict] = {}
+
+    def _load_addresses(self) -> Dict[str, dict]:
+        if self._addresses is None:
+            self._addresses = {}
+            try:
+                with open(self.index_path, encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue  # Torn write from a crashed process
+                        self._addresses[entry["id"]] = entry
+            except FileNotFoundError:
+                pass
+        return self._addresses
+
+    @staticmethod
+    def _expired(entry: dict) -> bool:
+        if entry.get("is_proxy"):
+            ttl = PROXY_MAPPING_TTL
+        elif entry["key"].startswith("code-"):
+            ttl = UNVERIFIED_MAPPING_TTL
+        else:
+            return False
+        return time.time() - entry.get("recorded_at", 0) > ttl
+
+    def lookup_address(self, chain: str, address: str) -> Optional[str]:
+        """Content key previously recorded for an address, if still valid"""
+        entry = self._load_addresses().get(f"{chain}:{address.lower()}")
+        if not entry or self._expired(entry):
+            return None
+        return entry["key"]
+
+    def record_address(self, chain: str, address: str, key: str, is_proxy: bool = False,
+                       implementation: Optional[str] = None):
+        entry = {
+            "id": f"{chain}:{address.lower()}",
+            "key": key,
+            "is_proxy": is_proxy,
+            "implementation": implementation,
+            "recorded_at": int(time.time())
+        }
+        addresses = self._load_addresses()
+        previous = addresses.get(entry["id"])
+        if previous and previous.get("key") == key and not self._expired(previous):
+            return
+        addresses[entry["id"]] = entry
+
+        try:
+            os.makedirs(self.results_dir, exist_ok=True)
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError:
+            pass
+
+    def address_entry(self, chain: str, address: str) -> Optional[dict]:
+        return self._load_addresses().get(f"{chain}:{address.lower()}")
+
+    def get(self, key: str) -> Optional[dict]:
+        """Cached analysis for a content key"""
+        if key in self._results:
+            return self._results[key]
+        try:
+            with open(os.path.join(self.results_dir, f"{key}.json"), encoding="utf-8") as f:
+                result = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        self._results[key] = result
+        return result
+
+    def put(self, key: str, analysis: dict):
+        self._results[key] = analysis
+        path = os.path.join(self.results_dir, f"{key}.json")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.results_dir, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(analysis, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+
+_cache: Optional[AnalysisCache] = None
+
+
+def get_cache() -> AnalysisCache:
+    """Process-wide analysis cache"""
+    global _cache
+    if _cache is None:
+        _cache = AnalysisCache()
+    return _cache
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Security Pattern Scanner Benchmark
+Compares the single-pass scanner against one re.findall per pattern
+
+Usage:
+    python bench_security_patterns.py [flattened_source.sol ...]
+
+Without arguments a multi-megabyte source is synthesised from a sample
+contract. Real-world inputs can be produced from Etherscan's getsourcecode
+output (e.g. a Uniswap router or an OpenZeppelin-heavy token) and passed in.
+"""
+
+import json
+import re
+import sys
+import time
+from typing import Callable, Dict, List
+
+from contract_analyzer import SECURITY_PATTERNS, analyze_security_patterns, flatten_source
+
+SAMPLE_CONTRACT = '''
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.20;
+
+import "@openzeppelin/contracts/access/Ownable.sol";
+import "@openzeppelin/contracts/security/ReentrancyGuard.sol";
+import "@openzeppelin/contracts/security/Pausable.sol";
+
+/**
+ * @dev Vault holding user deposits. Never use tx.origin for auth and
+ * never selfdestruct: both are flagged by reviewers.
+ */
+contract Vault is Ownable, ReentrancyGuard, Pausable {
+    mapping(address => uint256) public balances;
+    address public constant TREASURY = 0x1111111111111111111111111111111111111111;
+    string public constant NOTE = "onlyOwner functions: pause, unpause, sweep";
+
+    function deposit() external payable whenNotPaused nonReentrant {
+        balances[msg.sender] += msg.value;
+    }
+
+    function withdraw(uint256 amount) external nonReentrant {
+        require(balances[msg.sender] >= amount, "insufficient");
+        unchecked { balances[msg.sender] -= amount; }
+        (bool ok, ) = msg.sender.call{value: amount}("");
+        require(ok, "transfer failed");
+    }
+
+    function sweep(address target, bytes calldata data) external onlyOwner {
+        (bool ok, ) = target.delegatecall(data);
+        require(ok);
+    }
+
+    function pause() external onlyOwner { _pause(); }
+    function unpause() external onlyOwner { _unpause(); }
+}
+'''
+
+TARGET_BYTES = 4 * 1024 * 1024
+
+
+def legacy_scan(source_code: str) -> Dict[str, int]:
+    """The previous implementation: one full scan per pattern"""
+    return {
+        name: len(re.findall(info["pattern"], source_code, re.IGNORECASE))
+        for name, info in SECURITY_PATTERNS.items()
+    }
+
+
+def single_pass_scan(source_code: str) -> Dict[str, int]:
+    return {f["pattern"]: f["occurrences"] for f in analyze_security_patterns(source_code)}
+
+
+def best_of(fn: Callable[[str], Dict[str, int]], source_code: str, runs: int = 3) -> float:
+    timings: List[float] = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(source_code)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def load_sources(paths: List[str]) -> Dict[str, str]:
+    if not paths:
+        repeats = TARGET_BYTES // len(SAMPLE_CONTRACT) + 1
+        return {"synthetic": SAMPLE_CONTRACT * repeats}
+
+    sources = {}
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            sources[path] = flatten_source(f.read())
+    return sources
+
+
+def main():
+    results = []
+    for name, source_code in load_sources(sys.argv[1:]).items():
+        legacy = best_of(legacy_scan, source_code)
+        single = best_of(single_pass_scan, source_code)
+        results.append({
+            "source": name,
+            "size_mb": round(len(source_code) / 1e6, 2),
+            "legacy_seconds": round(legacy, 4),
+            "single_pass_seconds": round(single, 4),
+            "speedup": round(legacy / single, 2) if single else None,
+            "legacy_counts": legacy_scan(source_code),
+            "single_pass_counts": single_pass_scan(source_code)
+        })
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Block Timestamp Store
+Persistent block number -> timestamp cache shared by onchain, bridge and wallet scripts
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to unlocked writes
+    fcntl = None
+
+# One file per chain of sorted little-endian (uint32 block, uint32 timestamp) records
+RECORD = struct.Struct("<II")
+RECORD_SIZE = RECORD.size
+
+CACHE_DIR_ENV = "BLOCK_TIMESTAMP_CACHE_DIR"
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "spoon-skills", "block_timestamps")
+
+UINT32_MAX = 0xFFFFFFFF
+
+
+def get_cache_dir() -> str:
+    """Directory holding the per-chain store files"""
+    return os.getenv(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR
+
+
+class BlockTimestampStore:
+    """Memory-mapped block timestamp cache for one chain.
+
+    Lookups binary-search the mapped file without loading it. New entries
+    stay in memory until flush(), which merges them into the file and swaps
+    it in atomically so readers in other processes never see a partial file.
+    """
+
+    def __init__(self, chain: str, cache_dir: Optional[str] = None):
+        self.chain = chain
+        self.path = os.path.join(cache_dir or get_cache_dir(), f"{chain}.bin")
+        self.pending: Dict[int, int] = {}
+        self._mm: Optional[mmap.mmap] = None
+        self._count = 0
+        self._loaded = False
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size >= RECORD_SIZE:
+                    self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    self._count = size // RECORD_SIZE
+        except FileNotFoundError:
+            pass
+
+    def _record(self, index: int) -> Tuple[int, int]:
+        return RECORD.unpack_from(self._mm, index * RECORD_SIZE)
+
+    def _find(self, block: int) -> int:
+        """Index of the first record with block number >= block"""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._record(mid)[0] < block:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def __len__(self) -> int:
+        self._load()
+        return self._count + sum(1 for b in self.pending if not self._on_disk(b))
+
+    def _on_disk(self, block: int) -> bool:
+        i = self._find(block)
+        return i < self._count and self._record(i)[0] == block
+
+    def get(self, block: int) -> Optional[int]:
+        """Cached timestamp for a block, or None"""
+        if block in self.pending:
+            return self.pending[block]
+        self._load()
+        if not self._count:
+            return None
+        i = self._find(block)
+        if i < self._count:
+            found_block, timestamp = self._record(i)
+            if found_block == block:
+                return timestamp
+        return None
+
+    def get_many(self, blocks: Iterable[int]) -> Dict[int, int]:
+        """Cached timestamps for the given blocks; misses are left out"""
+        result = {}
+        for block in blocks:
+            timestamp = self.get(block)
+            if timestamp is not None:
+                result[block] = timestamp
+        return result
+
+    def put(self, block: int, timestamp: int):
+        """Queue a block timestamp for the next flush"""
+        if 0 <= block <= UINT32_MAX and 0 < timestamp <= UINT32_MAX:
+            self.pending[block] = timestamp
+
+    def put_many(self, timestamps: Dict[int, int]):
+        for block, timestamp in timestamps.items():
+            self.put(block, timestamp)
+
+    def flush(self):
+        """Merge pending entries into the on-disk store.
+
+        Best effort: if the cache directory is read-only or full, the entries
+        stay pending in memory, still answer get(), and are retried next flush.
+        """
+        if not self.pending:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            lock_path = self.path + ".lock"
+
+            with open(lock_path, "a") as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    # Re-read under the lock so entries written by other processes survive
+                    records = array("I")
+                    try:
+                        with open(self.path, "rb") as f:
+                            records.frombytes(f.read())
+                    except FileNotFoundError:
+                        pass
+                    if sys.byteorder != "little":
+                        records.byteswap()
+
+                    merged = dict(zip(records[0::2], records[1::2]))
+                    merged.update(self.pending)
+
+                    out = array("I")
+                    for block in sorted(merged):
+                        out.append(block)
+                        out.append(merged[block])
+                    if sys.byteorder != "little":
+                        out.byteswap()
+
+                    tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                    with open(tmp_path, "wb") as f:
+                        out.tofile(f)
+                    os.replace(tmp_path, self.path)
+                finally:
+                    if fcntl:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+        except OSError:
+            return
+
+        self.pending.clear()
+        self.close()
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+        self._mm = None
+        self._count = 0
+        self._loaded = False
+
+    def block_at_time(self, timestamp: int) -> Optional[Dict]:
+        """Estimate the block produced at a unix timestamp without RPC calls.
+
+        Interpolates linearly between the two cached blocks bracketing the
+        timestamp. The estimate is exact when the neighbours are adjacent
+        blocks; otherwise the bracketing blocks bound the true answer.
+        """
+        self.flush()
+        self._load()
+        if self._count < 2:
+            return None
+
+        # Timestamps are non-decreasing in block order, so binary search them too
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._record(mid)[1] <= timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        upper_index = min(max(lo, 1), self._count - 1)
+
+        lower_block, lower_time = self._record(upper_index - 1)
+        upper_block, upper_time = self._record(upper_index)
+
+        if upper_time == lower_time:
+            estimate = lower_block
+        else:
+            ratio = (timestamp - lower_time) / (upper_time - lower_time)
+            estimate = lower_block + int(ratio * (upper_block - lower_block))
+
+        # "Block at time" is the last block with timestamp <= the target
+        in_range = lower_time <= timestamp <= upper_time
+        if in_range:
+            ceiling = upper_block if timestamp >= upper_time else upper_block - 1
+            estimate = max(lower_block, min(ceiling, estimate))
+
+        return {
+            "block": max(0, estimate),
+            "exact": in_range and (timestamp == lower_time or upper_block - lower_block <= 1),
+            "extrapolated": not in_range,
+            "lower": {"block": lower_block, "timestamp": lower_time},
+            "upper": {"block": upper_block, "timestamp": upper_time}
+        }
+
+
+_stores: Dict[str, BlockTimestampStore] = {}
+
+
+def get_store(chain: str) -> BlockTimestampStore:
+    """Process-wide store for a chain"""
+    if chain not in _stores:
+        _stores[chain] = BlockTimestampStore(chain)
+    return _stores[chain]
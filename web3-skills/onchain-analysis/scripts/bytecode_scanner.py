@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+EVM Bytecode Scanner
+Finds risky opcodes and dispatcher selectors in runtime bytecode without source code
+"""
+
+import re
+from typing import Dict, List, Optional
+
+# Opcodes reported by the scanner
+RISKY_OPCODES = {
+    0x32: "ORIGIN",
+    0xF2: "CALLCODE",
+    0xF4: "DELEGATECALL",
+    0xFF: "SELFDESTRUCT",
+}
+
+PUSH1 = 0x60
+PUSH4 = 0x63
+PUSH32 = 0x7F
+EQ = 0x14
+DUP1 = 0x80
+DUP16 = 0x8F
+
+MAX_REPORTED_OFFSETS = 10
+
+
+def _build_scanner() -> re.Pattern:
+    """Regex that walks instructions in C and stops only at interesting ones.
+
+    Each match consumes any number of uninteresting instructions (PUSH data
+    included, so data bytes are never read as opcodes) and then one risky
+    opcode or PUSH4. A truncated trailing PUSH or the end of the code also
+    ends a match, so scanning never restarts in the middle of an instruction.
+    """
+    interesting = set(RISKY_OPCODES) | {PUSH4}
+    plain = "".join(
+        re.escape(bytes([op])).decode("latin-1")
+        for op in range(256)
+        if op not in interesting and not PUSH1 <= op <= PUSH32
+    )
+    pushes = "|".join(
+        f"\\x{op:02x}.{{{op - PUSH1 + 1}}}"
+        for op in range(PUSH1, PUSH32 + 1) if op != PUSH4
+    )
+    risky = "".join(f"\\x{op:02x}" for op in RISKY_OPCODES)
+    pattern = (
+        f"(?:[{plain}]|{pushes})*"
+        f"(?:(?P<op>[{risky}])|\\x{PUSH4:02x}(?P<push4>.{{4}})|[\\x{PUSH1:02x}-\\x{PUSH32:02x}].*\\Z|\\Z)"
+    )
+    return re.compile(pattern.encode("latin-1"), re.DOTALL)
+
+
+SCANNER = _build_scanner()
+
+
+def strip_metadata(code: bytes) -> bytes:
+    """Drop the CBOR metadata trailer solc appends, which is data, not code"""
+    if len(code) < 2:
+        return code
+    length = int.from_bytes(code[-2:], "big")
+    start = len(code) - 2 - length
+    # The trailer is a CBOR map with 1-3 entries (0xa1-0xa3)
+    if 0 < length < len(code) and code[start] in (0xA1, 0xA2, 0xA3):
+        return code[:start]
+    return code
+
+
+def parse_bytecode(runtime_code: str) -> Optional[bytes]:
+    """Hex runtime code from eth_getCode to raw bytes; None if empty or invalid"""
+    hex_part = runtime_code[2:] if runtime_code.startswith("0x") else runtime_code
+    if not hex_part:
+        return None
+    try:
+        return bytes.fromhex(hex_part)
+    except ValueError:
+        return None
+
+
+def scan_bytecode(runtime_code: str) -> Dict:
+    """Scan runtime bytecode for risky opcodes and function selectors.
+
+    Returns opcode counts with their first offsets, and the selectors the
+    dispatcher compares calldata against (PUSH4 followed by EQ, optionally
+    with a DUP in between), in dispatch order.
+    """
+    raw = parse_bytecode(runtime_code)
+    if raw is None:
+        return {"code_size": 0, "opcodes": {}, "offsets": {}, "selectors": []}
+
+    code = memoryview(strip_metadata(raw))
+    size = len(code)
+    counts: Dict[str, int] = {}
+    offsets: Dict[str, List[int]] = {}
+    selectors: List[str] = []
+    seen_selectors = set()
+
+    for match in SCANNER.finditer(code):
+        op = match.group("op")
+        if op is not None:
+            name = RISKY_OPCODES[op[0]]
+            counts[name] = counts.get(name, 0) + 1
+            found = offsets.setdefault(name, [])
+            if len(found) < MAX_REPORTED_OFFSETS:
+                found.append(match.end() - 1)
+            continue
+
+        value = match.group("push4")
+        if value is None:
+            continue
+
+        end = match.end()
+        follows_eq = (
+            end < size and code[end] == EQ
+            or end + 1 < size and DUP1 <= code[end] <= DUP16 and code[end + 1] == EQ
+        )
+        if follows_eq and value != b"\xff\xff\xff\xff":
+            selector = "0x" + value.hex()
+            if selector not in seen_selectors:
+                seen_selectors.add(selector)
+                selectors.append(selector)
+
+    return {
+        "code_size": len(raw),
+        "opcodes": counts,
+        "offsets": offsets,
+        "selectors": selectors
+    }
@@ -4,13 +4,21 @@ Smart Contract Analyzer Script
 Analyzes smart contract code and security patterns
 """
 
+import asyncio
 import json
 import sys
 import os
 import re
+import time
 import urllib.request
 import urllib.error
-from typing import Optional, List, Dict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional, List, Dict
+
+from analysis_cache import AnalysisCache, bytecode_key, get_cache, source_key
+from bytecode_scanner import scan_bytecode
+from rate_limiter import RateLimiter
+from selector_db import lookup_signature
 
 # Chain configurations
 # Note: Etherscan API V1 is deprecated and will stop working on August 15, 2025
@@ -138,11 +146,27 @@ SECURITY_PATTERNS = {
 }
 
 
+# bytes32(uint256(keccak256("eip1967.proxy.implementation")) - 1)
+EIP1967_IMPLEMENTATION_SLOT = "0x360894a13ba1a3210667c828492db98dca3e2076cc3735a920a3ca505d382bbc"
+
+# Bulk mode settings
+BULK_RATE_LIMIT = 4.0  # Explorer calls per second (free tier allows 5)
+BULK_MAX_FETCHES = 8  # Concurrent fetch stage workers
+MAX_BULK_ADDRESSES = 10000
+
+
+# Set by bulk mode so every explorer call shares one rate limit
+explorer_limiter: Optional[RateLimiter] = None
+
+
 def fetch_api(base_url: str, params: dict, api_key: Optional[str] = None) -> dict:
     """Fetch data from Etherscan-like API"""
     if api_key:
         params["apikey"] = api_key
 
+    if explorer_limiter:
+        explorer_limiter.wait()
+
     query = "&".join(f"{k}={v}" for k, v in params.items())
     url = f"{base_url}?{query}"
 
@@ -176,51 +200,290 @@ def get_contract_source(address: str, chain: str) -> dict:
     return {}
 
 
-def get_contract_abi(address: str, chain: str) -> list:
-    """Get contract ABI from Etherscan"""
+def rpc_call(chain: str, method: str, params: list):
+    """Single JSON-RPC call to the chain's public RPC"""
     config = CHAIN_CONFIG.get(chain)
     if not config:
         raise ValueError(f"Unsupported chain: {chain}")
 
-    api_key = os.getenv(config["api_key_env"]) or os.getenv("ETHERSCAN_API_KEY")
+    payload = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
+    req = urllib.request.Request(
+        config["rpc_url"],
+        data=json.dumps(payload).encode(),
+        method="POST",
+        headers={"Content-Type": "application/json", "User-Agent": "ContractAnalyzer/1.0"}
+    )
 
-    params = {
-        "module": "contract",
-        "action": "getabi",
-        "address": address
-    }
+    try:
+        with urllib.request.urlopen(req, timeout=60) as response:
+            data = json.loads(response.read().decode())
+    except urllib.error.URLError as e:
+        raise ConnectionError(f"Failed to fetch data: {e}")
 
-    data = fetch_api(config["api_url"], params, api_key)
+    if "error" in data:
+        raise ConnectionError(f"RPC error: {data['error'].get('message', 'unknown error')}")
 
-    if data.get("status") == "1" and data.get("result"):
-        try:
-            return json.loads(data["result"])
-        except json.JSONDecodeError:
-            return []
+    return data.get("result")
+
+
+def get_runtime_code(address: str, chain: str) -> str:
+    """Get deployed runtime bytecode via the chain RPC"""
+    return rpc_call(chain, "eth_getCode", [address, "latest"]) or "0x"
+
+
+def get_eip1967_implementation(address: str, chain: str) -> Optional[str]:
+    """Implementation address in the EIP-1967 proxy slot, None if the slot is empty or unreadable"""
+    try:
+        word = rpc_call(chain, "eth_getStorageAt", [address, EIP1967_IMPLEMENTATION_SLOT, "latest"])
+    except ConnectionError:
+        return None
+    if not word or len(word) < 42 or int(word, 16) == 0:
+        return None
+    return "0x" + word[-40:]
+
+
+def parse_abi(abi_text: str) -> list:
+    """ABI from a getsourcecode entry (a JSON string, or a notice for unverified contracts)"""
+    if not abi_text:
+        return []
+    try:
+        abi = json.loads(abi_text)
+    except json.JSONDecodeError:
+        return []
+    return abi if isinstance(abi, list) else []
+
+
+def scan_regex(pattern: str):
+    """Yield (index, char, depth) for unescaped characters outside [...] classes"""
+    depth, i = 0, 0
+    in_class = False
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i += 2
+            continue
+        if in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        else:
+            if char == ")":
+                depth -= 1
+            yield i, char, depth
+            if char == "(":
+                depth += 1
+        i += 1
+
+
+def split_alternatives(pattern: str) -> List[str]:
+    """Split a regex on its top-level "|" separators"""
+    parts, start = [], 0
+    for i, char, depth in scan_regex(pattern):
+        if char == "|" and depth == 0:
+            parts.append(pattern[start:i])
+            start = i + 1
+    parts.append(pattern[start:])
+    return parts
+
+
+def group_end(pattern: str) -> Optional[int]:
+    """Index of the ")" closing the group that opens the pattern"""
+    for i, char, depth in scan_regex(pattern):
+        if char == ")" and depth == 0:
+            return i
+    return None
+
+
+def first_chars(pattern: str) -> Optional[set]:
+    """Characters a match of the pattern can start with, or None if unknown.
+
+    Only understands literals, escaped punctuation, simple character classes
+    and leading non-capturing groups, which covers SECURITY_PATTERNS. Anything
+    else returns None so the scanner falls back to trying every position.
+    """
+    chars = set()
+    for alternative in split_alternatives(pattern):
+        if alternative.startswith("(?:"):
+            # Only a group that is not optional can decide the first character
+            end = group_end(alternative)
+            if end is None or alternative[end + 1:end + 2] in ("?", "*", "{"):
+                return None
+            inner = first_chars(alternative[3:end])
+            if inner is None:
+                return None
+            chars |= inner
+        elif alternative[:1] == "\\" and not alternative[1:2].isalnum():
+            chars.add(alternative[1])
+        elif alternative[:1] == "[":
+            end = alternative.find("]")
+            body = alternative[1:end]
+            if end < 0 or body.startswith("^") or "\\" in body:
+                return None
+            for match in re.finditer(r"(.)-(.)|(.)", body):
+                if match.group(3):
+                    chars.add(match.group(3))
+                else:
+                    chars.update(chr(c) for c in range(ord(match.group(1)), ord(match.group(2)) + 1))
+        elif alternative[:1].isalnum() or alternative[:1] in "_":
+            if alternative[1:2] in ("?", "*", "{"):
+                return None
+            chars.add(alternative[0])
+        else:
+            return None
+    return chars
+
+
+# Opcode findings for unverified contracts, reported like the source patterns
+BYTECODE_PATTERNS = {
+    "SELFDESTRUCT": "selfdestruct",
+    "DELEGATECALL": "delegatecall",
+    "ORIGIN": "tx_origin",
+    "CALLCODE": "callcode"
+}
+
+CALLCODE_PATTERN = {
+    "description": "CALLCODE usage (deprecated, runs foreign code in own storage)",
+    "severity": "HIGH",
+    "good": False
+}
+
+
+def compile_security_scanner(patterns: Dict[str, Dict]) -> re.Pattern:
+    """Combine all security patterns into one alternation with a named group each.
+
+    Comments and string literals are matched first so their contents never
+    count as findings. Capturing groups inside the patterns are made
+    non-capturing so match.lastgroup always names the pattern that matched.
+    When every pattern's first characters are known, a lookahead on them lets
+    the engine reject most positions without trying each alternative.
+    """
+    alternatives = [
+        r"(?P<_skip>//[^\n]*|(?s:/\*.*?(?:\*/|\Z))"
+        r"|\"(?:\\.|[^\"\\\n])*\"|'(?:\\.|[^'\\\n])*')"
+    ]
+    starts: Optional[set] = {"/", '"', "'"}
+    for name, info in patterns.items():
+        pattern = re.sub(r"(?<!\\)\((?!\?)", "(?:", info["pattern"])
+        alternatives.append(f"(?P<{name}>{pattern})")
+
+        pattern_starts = first_chars(pattern)
+        starts = starts | pattern_starts if starts is not None and pattern_starts is not None else None
+
+    combined = "|".join(alternatives)
+    if starts is not None:
+        starts |= {c.swapcase() for c in starts}
+        combined = f"(?=[{''.join(re.escape(c) for c in sorted(starts))}])(?:{combined})"
+
+    return re.compile(combined, re.IGNORECASE | re.ASCII)
 
-    return []
+
+SECURITY_SCANNER = compile_security_scanner(SECURITY_PATTERNS)
+MAX_REPORTED_LINES = 10
+
+
+def flatten_source(source_code: str) -> str:
+    """Join multi-file sources from Etherscan's standard-JSON format into one text"""
+    stripped = source_code.strip()
+    if not stripped.startswith("{"):
+        return source_code
+
+    # Standard JSON input is wrapped in an extra pair of braces
+    if stripped.startswith("{{") and stripped.endswith("}}"):
+        stripped = stripped[1:-1]
+
+    try:
+        parsed = json.loads(stripped)
+    except json.JSONDecodeError:
+        return source_code
+
+    sources = parsed.get("sources", parsed) if isinstance(parsed, dict) else {}
+    contents = [
+        entry.get("content", "") for entry in sources.values()
+        if isinstance(entry, dict)
+    ]
+    return "\n".join(contents) if contents else source_code
 
 
 def analyze_security_patterns(source_code: str) -> List[Dict]:
-    """Analyze source code for security patterns"""
-    findings = []
+    """Analyze source code for security patterns in a single pass"""
+    source_code = flatten_source(source_code)
 
-    for pattern_name, pattern_info in SECURITY_PATTERNS.items():
-        matches = re.findall(pattern_info["pattern"], source_code, re.IGNORECASE)
+    counts: Dict[str, int] = {}
+    lines: Dict[str, List[int]] = {}
+    line = 1
+    position = 0
+
+    for match in SECURITY_SCANNER.finditer(source_code):
+        name = match.lastgroup
+        if name == "_skip":
+            continue
+
+        # Advance the line counter incrementally so the whole scan stays linear
+        start = match.start()
+        line += source_code.count("\n", position, start)
+        position = start
+
+        counts[name] = counts.get(name, 0) + 1
+        pattern_lines = lines.setdefault(name, [])
+        if len(pattern_lines) < MAX_REPORTED_LINES:
+            pattern_lines.append(line)
 
-        if matches:
+    findings = []
+    for pattern_name, pattern_info in SECURITY_PATTERNS.items():
+        if pattern_name in counts:
             findings.append({
                 "pattern": pattern_name,
                 "description": pattern_info["description"],
                 "severity": pattern_info["severity"],
                 "found": True,
                 "is_positive": pattern_info["good"],
-                "occurrences": len(matches)
+                "occurrences": counts[pattern_name],
+                "lines": lines[pattern_name]
+            })
+
+    return findings
+
+
+def analyze_bytecode_patterns(bytecode_scan: Dict) -> List[Dict]:
+    """Turn opcode counts from the bytecode scanner into security findings"""
+    findings = []
+
+    for opcode, pattern_name in BYTECODE_PATTERNS.items():
+        count = bytecode_scan["opcodes"].get(opcode)
+        if count:
+            info = SECURITY_PATTERNS.get(pattern_name, CALLCODE_PATTERN)
+            findings.append({
+                "pattern": pattern_name,
+                "description": info["description"],
+                "severity": info["severity"],
+                "found": True,
+                "is_positive": info["good"],
+                "occurrences": count,
+                "offsets": bytecode_scan["offsets"].get(opcode, []),
+                "source": "bytecode"
             })
 
     return findings
 
 
+def extract_functions_from_selectors(selectors: List[str]) -> List[Dict]:
+    """Approximate function info for unverified contracts from dispatcher selectors"""
+    functions = []
+
+    for selector in selectors:
+        signature = lookup_signature(selector)
+        functions.append({
+            "name": signature.split("(")[0] if signature else selector,
+            "signature": signature,
+            "selector": selector,
+            "state_mutability": "unknown",
+            "is_view": False,
+            "is_payable": False
+        })
+
+    return functions
+
+
 def extract_functions_from_abi(abi: list) -> List[Dict]:
     """Extract function information from ABI"""
     functions = []
@@ -306,45 +569,33 @@ def calculate_risk_score(findings: List[Dict], is_verified: bool, is_proxy: bool
     }
 
 
-def analyze_contract(address: str, chain: str) -> dict:
-    """Comprehensive contract analysis"""
-    config = CHAIN_CONFIG.get(chain)
-    if not config:
-        raise ValueError(f"Unsupported chain: {chain}")
-
-    # Validate address format
-    if not address.startswith("0x") or len(address) != 42:
-        raise ValueError(f"Invalid address format: {address}")
-
-    # Fetch contract source
-    source_info = get_contract_source(address, chain)
-
-    if not source_info:
-        return {
-            "success": True,
-            "chain": chain,
-            "address": address,
-            "is_contract": False,
-            "note": "Address is not a contract or contract source is not available"
-        }
+def analyze_source(source_info: dict, abi: list, runtime_code: Optional[str] = None) -> dict:
+    """Address-independent analysis of a contract's source and ABI.
 
+    Unverified contracts are analyzed from their runtime bytecode instead.
+    Identical sources (clones, factory deployments, proxies sharing an
+    implementation) produce identical results, which makes this the unit
+    stored in the analysis cache.
+    """
     contract_name = source_info.get("ContractName", "Unknown")
     is_verified = bool(source_info.get("SourceCode"))
     is_proxy = source_info.get("Proxy") == "1"
-    implementation = source_info.get("Implementation") if is_proxy else None
     compiler_version = source_info.get("CompilerVersion", "Unknown")
     source_code = source_info.get("SourceCode", "")
 
-    # Get ABI
-    abi = get_contract_abi(address, chain)
-
     # Analyze security patterns (if source is available)
     security_findings = []
+    bytecode_scan = None
     if source_code:
         security_findings = analyze_security_patterns(source_code)
+        functions = extract_functions_from_abi(abi)
+    elif runtime_code:
+        bytecode_scan = scan_bytecode(runtime_code)
+        security_findings = analyze_bytecode_patterns(bytecode_scan)
+        functions = extract_functions_from_selectors(bytecode_scan["selectors"])
+    else:
+        functions = extract_functions_from_abi(abi)
 
-    # Extract functions from ABI
-    functions = extract_functions_from_abi(abi)
     admin_functions = identify_admin_functions(functions, source_code)
 
     # Calculate risk score
@@ -356,17 +607,13 @@ def analyze_contract(address: str, chain: str) -> dict:
     payable_functions = [f for f in functions if f["is_payable"]]
 
     return {
-        "success": True,
-        "chain": chain,
-        "address": address,
-        "explorer_url": f"{config['explorer']}/address/{address}",
         "contract_info": {
             "name": contract_name,
             "compiler": compiler_version,
             "verified": is_verified,
             "is_proxy": is_proxy,
-            "implementation": implementation,
-            "source_lines": len(source_code.split("\n")) if source_code else 0
+            "source_lines": len(source_code.split("\n")) if source_code else 0,
+            "bytecode_size": bytecode_scan["code_size"] if bytecode_scan else None
         },
         "function_analysis": {
             "total_functions": len(functions),
@@ -389,6 +636,303 @@ def analyze_contract(address: str, chain: str) -> dict:
     }
 
 
+def build_contract_result(address: str, chain: str, analysis: dict, implementation: Optional[str],
+                          cache_info: dict) -> dict:
+    """Attach address-specific fields to a (possibly cached) source analysis"""
+    config = CHAIN_CONFIG[chain]
+    contract_info = dict(analysis["contract_info"])
+    contract_info["implementation"] = implementation
+
+    return {
+        "success": True,
+        "chain": chain,
+        "address": address,
+        "explorer_url": f"{config['explorer']}/address/{address}",
+        "contract_info": contract_info,
+        "function_analysis": analysis["function_analysis"],
+        "security_analysis": analysis["security_analysis"],
+        "risk_assessment": analysis["risk_assessment"],
+        "cache": cache_info
+    }
+
+
+def not_contract_result(address: str, chain: str, note: str) -> dict:
+    return {
+        "success": True,
+        "chain": chain,
+        "address": address,
+        "is_contract": False,
+        "note": note
+    }
+
+
+def fetch_contract(address: str, chain: str, cache: Optional[AnalysisCache]) -> dict:
+    """Network stage of an analysis: everything except the CPU-bound scan.
+
+    Returns a job dict whose "status" is "cached" (analysis found by address or
+    content key), "not_contract", or "fetched" (source and ABI ready for
+    analyze_source).
+    """
+    # Known address: no network access at all
+    if cache:
+        key = cache.lookup_address(chain, address)
+        analysis = cache.get(key) if key else None
+        if analysis:
+            entry = cache.address_entry(chain, address)
+            return {"status": "cached", "via": "address", "key": key, "analysis": analysis,
+                    "is_proxy": entry.get("is_proxy", False), "implementation": entry.get("implementation")}
+
+    # Fetch contract source
+    source_info = get_contract_source(address, chain)
+
+    if not source_info:
+        return {"status": "not_contract", "note": "Address is not a contract or contract source is not available"}
+
+    is_verified = bool(source_info.get("SourceCode"))
+    is_proxy = source_info.get("Proxy") == "1"
+    job = {
+        "status": "fetched",
+        "source_info": source_info,
+        "is_proxy": is_proxy,
+        "implementation": source_info.get("Implementation") if is_proxy else None,
+        "key": None
+    }
+
+    # Unverified contracts are analyzed (and cached) by their runtime bytecode
+    runtime_code = None
+    if not is_verified:
+        try:
+            runtime_code = get_runtime_code(address, chain)
+        except ConnectionError:
+            runtime_code = None
+        if runtime_code == "0x":
+            return {"status": "not_contract", "note": "Address has no contract code"}
+    job["runtime_code"] = runtime_code
+
+    # Content key: source hash when verified, runtime bytecode hash otherwise
+    if cache:
+        if is_verified:
+            job["key"] = source_key(source_info)
+        else:
+            job["key"] = bytecode_key(runtime_code) if runtime_code else None
+
+        analysis = cache.get(job["key"]) if job["key"] else None
+        if analysis:
+            job.update(status="cached", via="content", analysis=analysis)
+            return job
+
+    # getsourcecode already carries the ABI, so no separate getabi call
+    job["abi"] = parse_abi(source_info.get("ABI", ""))
+    return job
+
+
+def is_address(value: Optional[str]) -> bool:
+    return bool(value) and value.startswith("0x") and len(value) == 42
+
+
+def finish_contract(address: str, chain: str, job: dict, analysis: dict,
+                    cache: Optional[AnalysisCache]) -> dict:
+    """Store a fresh analysis, record the address mapping and build the result"""
+    key = job.get("key")
+    if cache and key:
+        if job["status"] == "fetched":
+            cache.put(key, analysis)
+        if job.get("via") != "address":
+            cache.record_address(chain, address, key, job["is_proxy"], job["implementation"])
+
+    cache_hit = job["status"] == "cached"
+    return build_contract_result(address, chain, analysis, job["implementation"],
+                                 {"hit": cache_hit, "via": job.get("via"), "key": key})
+
+
+def complete_contract(address: str, chain: str, job: dict, cache: Optional[AnalysisCache]) -> dict:
+    """Analyze a fetched job in this process and build its result"""
+    if job["status"] == "not_contract":
+        return not_contract_result(address, chain, job["note"])
+
+    if job["status"] == "cached":
+        analysis = job["analysis"]
+    else:
+        analysis = analyze_source(job["source_info"], job["abi"], job["runtime_code"])
+
+    return finish_contract(address, chain, job, analysis, cache)
+
+
+def prefetch_slot_implementation(executor: ThreadPoolExecutor, address: str, chain: str,
+                                 cache: Optional[AnalysisCache]) -> Optional[tuple]:
+    """(implementation, future of its fetch) from the EIP-1967 slot, None when the slot is empty.
+
+    Runs beside the proxy's own getsourcecode, so a first-time proxy costs
+    about one round trip before both fetches are in flight.
+    """
+    implementation = get_eip1967_implementation(address, chain)
+    if not is_address(implementation) or implementation.lower() == address.lower():
+        return None
+    return implementation, executor.submit(fetch_contract, implementation, chain, cache)
+
+
+def analyze_contract(address: str, chain: str, use_cache: bool = True) -> dict:
+    """Comprehensive contract analysis, reusing cached results for identical code.
+
+    For proxies the implementation is fetched concurrently and analyzed too.
+    A previously recorded implementation address is prefetched alongside the
+    proxy itself. For an address not seen before, the EIP-1967 implementation
+    slot is read while the proxy source is fetched, and the implementation
+    fetch starts from it; only proxies the slot does not describe wait for
+    the explorer to name their implementation.
+    """
+    config = CHAIN_CONFIG.get(chain)
+    if not config:
+        raise ValueError(f"Unsupported chain: {chain}")
+
+    # Validate address format
+    if not is_address(address):
+        raise ValueError(f"Invalid address format: {address}")
+
+    cache = get_cache() if use_cache else None
+    entry = cache.address_entry(chain, address) if cache else None
+    prefetched: Dict[str, Future] = {}
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        known_implementation = entry.get("implementation") if entry else None
+        if is_address(known_implementation):
+            prefetched[known_implementation.lower()] = executor.submit(
+                fetch_contract, known_implementation, chain, cache)
+        slot_read = executor.submit(prefetch_slot_implementation, executor, address, chain, cache) if not entry else None
+
+        job = fetch_contract(address, chain, cache)
+
+        if slot_read is not None:
+            try:
+                slot_prefetch = slot_read.result()
+            except Exception:
+                slot_prefetch = None
+            if slot_prefetch:
+                prefetched[slot_prefetch[0].lower()] = slot_prefetch[1]
+
+        implementation = job.get("implementation")
+        if not is_address(implementation) or implementation.lower() == address.lower():
+            implementation = None
+        elif implementation.lower() not in prefetched:
+            prefetched[implementation.lower()] = executor.submit(fetch_contract, implementation, chain, cache)
+
+        result = complete_contract(address, chain, job, cache)
+
+        if implementation:
+            try:
+                implementation_job = prefetched[implementation.lower()].result()
+                implementation_result = complete_contract(implementation, chain, implementation_job, cache)
+            except Exception as e:
+                implementation_result = {"success": False, "address": implementation, "error": str(e)}
+            implementation_result.pop("chain", None)
+            result["implementation_analysis"] = implementation_result
+
+    return result
+
+
+async def analyze_contracts_bulk(addresses: List[str], chain: str, on_result: Callable[[dict], None],
+                                 use_cache: bool = True, workers: Optional[int] = None,
+                                 rate_limit: float = BULK_RATE_LIMIT) -> dict:
+    """Analyze many contracts with a rate-limited fetch stage feeding a process pool.
+
+    Fetches run in threads under a shared explorer rate limit; the CPU-bound
+    source analysis runs in a ProcessPoolExecutor, and contracts sharing a
+    content key are analyzed once. on_result is called for each contract in
+    completion order. Returns throughput and queue-depth statistics.
+    """
+    global explorer_limiter
+
+    if chain not in CHAIN_CONFIG:
+        raise ValueError(f"Unsupported chain: {chain}")
+
+    addresses = list(dict.fromkeys(addresses))
+    if len(addresses) > MAX_BULK_ADDRESSES:
+        raise ValueError(f"Too many addresses: {len(addresses)} (max {MAX_BULK_ADDRESSES})")
+
+    loop = asyncio.get_running_loop()
+    cache = get_cache() if use_cache else None
+    fetch_slots = asyncio.Semaphore(BULK_MAX_FETCHES)
+    in_flight: Dict[str, asyncio.Future] = {}
+    stats = {
+        "requested": len(addresses),
+        "completed": 0,
+        "errors": 0,
+        "not_contracts": 0,
+        "cache_hits": 0,
+        "analyzed": 0,
+        "deduplicated": 0,
+        "max_fetch_queue": 0,
+        "max_analysis_queue": 0
+    }
+    waiting_fetch = 0
+    pending_analysis = 0
+    analysis_depth_samples: List[int] = []
+
+    async def process(address: str, pool: ProcessPoolExecutor) -> dict:
+        nonlocal waiting_fetch, pending_analysis
+
+        if not is_address(address):
+            raise ValueError(f"Invalid address format: {address}")
+
+        waiting_fetch += 1
+        stats["max_fetch_queue"] = max(stats["max_fetch_queue"], waiting_fetch)
+        async with fetch_slots:
+            waiting_fetch -= 1
+            job = await asyncio.to_thread(fetch_contract, address, chain, cache)
+
+        if job["status"] == "not_contract":
+            stats["not_contracts"] += 1
+            return not_contract_result(address, chain, job["note"])
+
+        if job["status"] == "cached":
+            stats["cache_hits"] += 1
+            return finish_contract(address, chain, job, job["analysis"], cache)
+
+        key = job["key"]
+        if key and key in in_flight:
+            stats["deduplicated"] += 1
+            analysis = await in_flight[key]
+        else:
+            future = loop.run_in_executor(pool, analyze_source, job["source_info"], job["abi"], job["runtime_code"])
+            if key:
+                in_flight[key] = future
+            pending_analysis += 1
+            stats["analyzed"] += 1
+            stats["max_analysis_queue"] = max(stats["max_analysis_queue"], pending_analysis)
+            analysis_depth_samples.append(pending_analysis)
+            try:
+                analysis = await future
+            finally:
+                pending_analysis -= 1
+
+        return finish_contract(address, chain, job, analysis, cache)
+
+    async def run_one(address: str, pool: ProcessPoolExecutor):
+        try:
+            result = await process(address, pool)
+        except Exception as e:
+            stats["errors"] += 1
+            result = {"success": False, "chain": chain, "address": address, "error": str(e)}
+        stats["completed"] += 1
+        on_result(result)
+
+    started = time.monotonic()
+    explorer_limiter = RateLimiter(rate_limit)
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            await asyncio.gather(*(run_one(address, pool) for address in addresses))
+    finally:
+        explorer_limiter = None
+
+    elapsed = time.monotonic() - started
+    stats["elapsed_seconds"] = round(elapsed, 2)
+    stats["contracts_per_second"] = round(stats["completed"] / elapsed, 2) if elapsed > 0 else None
+    stats["avg_analysis_queue"] = (
+        round(sum(analysis_depth_samples) / len(analysis_depth_samples), 2) if analysis_depth_samples else 0
+    )
+    return stats
+
+
 def get_recommendation(risk_level: str, is_verified: bool, is_proxy: bool) -> str:
     """Get recommendation based on analysis"""
     if not is_verified:
@@ -406,18 +950,50 @@ def get_recommendation(risk_level: str, is_verified: bool, is_proxy: bool) -> st
         return "LOW RISK: Contract follows good security practices. Standard caution still advised."
 
 
+def run_bulk(addresses: List[str], chain: str, use_cache: bool, options: dict):
+    """Bulk mode entry point; streams JSON lines when options["stream"] is set"""
+    stream = options.get("stream", False)
+    results = []
+
+    def on_result(result: dict):
+        if stream:
+            print(json.dumps(result), flush=True)
+        else:
+            results.append(result)
+
+    stats = asyncio.run(analyze_contracts_bulk(
+        addresses, chain, on_result, use_cache,
+        workers=options.get("workers"),
+        rate_limit=options.get("rate_limit", BULK_RATE_LIMIT)
+    ))
+
+    if stream:
+        print(json.dumps({"stats": stats}), flush=True)
+    else:
+        print(json.dumps({"success": True, "chain": chain, "results": results, "stats": stats}, indent=2))
+
+
 def main():
     try:
         input_data = json.loads(sys.stdin.read())
 
         address = input_data.get("address")
+        addresses = input_data.get("addresses")
         chain = input_data.get("chain", "ethereum")
+        use_cache = input_data.get("use_cache", True)
+
+        if addresses:
+            if not isinstance(addresses, list):
+                print(json.dumps({"error": "addresses must be a list"}))
+                sys.exit(1)
+            run_bulk(addresses, chain, use_cache, input_data)
+            return
 
         if not address:
             print(json.dumps({"error": "Missing required parameter: address"}))
             sys.exit(1)
 
-        result = analyze_contract(address, chain)
+        result = analyze_contract(address, chain, use_cache)
         print(json.dumps(result, indent=2))
 
     except json.JSONDecodeError:
@@ -9,36 +9,48 @@ import sys
 import os
 import urllib.request
 import urllib.error
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+
+from block_timestamps import get_store
+from event_decoder import classify_events, classify_transfers, decode_logs
+from rate_limiter import RateLimiter
+from selector_db import lookup_signature
 
 # Chain configurations
+# RPC URLs sourced from Chainlist.org (https://chainlist.org)
 CHAIN_CONFIG = {
     "ethereum": {
+        "rpc_url": "https://eth.llamarpc.com",
         "api_url": "https://api.etherscan.io/api",
         "api_key_env": "ETHERSCAN_API_KEY",
         "native_symbol": "ETH",
         "explorer": "https://etherscan.io"
     },
     "polygon": {
+        "rpc_url": "https://polygon-rpc.com",
         "api_url": "https://api.polygonscan.com/api",
         "api_key_env": "POLYGONSCAN_API_KEY",
         "native_symbol": "POL",  # Renamed from MATIC on Sept 4, 2024
         "explorer": "https://polygonscan.com"
     },
     "arbitrum": {
+        "rpc_url": "https://arb1.arbitrum.io/rpc",
         "api_url": "https://api.arbiscan.io/api",
         "api_key_env": "ARBISCAN_API_KEY",
         "native_symbol": "ETH",
         "explorer": "https://arbiscan.io"
     },
     "optimism": {
+        "rpc_url": "https://mainnet.optimism.io",
         "api_url": "https://api-optimistic.etherscan.io/api",
         "api_key_env": "OPTIMISM_API_KEY",
         "native_symbol": "ETH",
         "explorer": "https://optimistic.etherscan.io"
     },
     "base": {
+        "rpc_url": "https://mainnet.base.org",
         "api_url": "https://api.basescan.org/api",
         "api_key_env": "BASESCAN_API_KEY",
         "native_symbol": "ETH",
@@ -46,7 +58,7 @@ CHAIN_CONFIG = {
     }
 }
 
-# Common function signatures
+# Fallback signatures used only when the bundled selector database is unavailable
 FUNCTION_SIGNATURES = {
     "0xa9059cbb": "transfer(address,uint256)",
     "0x095ea7b3": "approve(address,uint256)",
@@ -64,6 +76,12 @@ FUNCTION_SIGNATURES = {
     "0x69328dec": "withdraw (Aave)"
 }
 
+# Bulk mode settings
+RPC_BATCH_SIZE = 100  # Requests per JSON-RPC batch (most public nodes cap at 100-1000)
+EXPLORER_RATE_LIMIT = 4.0  # Explorer calls per second (free tier allows 5)
+EXPLORER_MAX_WORKERS = 4  # Concurrent explorer requests
+MAX_BULK_HASHES = 1000
+
 
 def fetch_api(base_url: str, params: dict, api_key: Optional[str] = None) -> dict:
     """Fetch data from Etherscan-like API"""
@@ -81,6 +99,48 @@ def fetch_api(base_url: str, params: dict, api_key: Optional[str] = None) -> dic
         raise ConnectionError(f"Failed to fetch data: {e}")
 
 
+def rpc_batch(rpc_url: str, calls: List[Tuple[str, list]]) -> List[Optional[dict]]:
+    """Send JSON-RPC calls as batched requests and return results in call order.
+
+    Calls are split into chunks of RPC_BATCH_SIZE. A call that errors on the
+    node yields None instead of failing the whole batch.
+    """
+    results: List[Optional[dict]] = [None] * len(calls)
+
+    for start in range(0, len(calls), RPC_BATCH_SIZE):
+        chunk = calls[start:start + RPC_BATCH_SIZE]
+        payload = [
+            {"jsonrpc": "2.0", "id": start + i, "method": method, "params": params}
+            for i, (method, params) in enumerate(chunk)
+        ]
+
+        req = urllib.request.Request(
+            rpc_url,
+            data=json.dumps(payload).encode(),
+            method="POST",
+            headers={"Content-Type": "application/json", "User-Agent": "TxAnalyzer/1.0"}
+        )
+
+        try:
+            with urllib.request.urlopen(req, timeout=60) as response:
+                replies = json.loads(response.read().decode())
+        except urllib.error.URLError as e:
+            raise ConnectionError(f"RPC batch request failed: {e}")
+
+        # Nodes reject a whole batch with a single error object
+        if isinstance(replies, dict):
+            message = replies.get("error", {}).get("message", "invalid batch response")
+            raise ConnectionError(f"RPC batch request failed: {message}")
+
+        # Batch replies may arrive in any order; match them back by id
+        for reply in replies:
+            reply_id = reply.get("id")
+            if isinstance(reply_id, int) and 0 <= reply_id < len(results) and "error" not in reply:
+                results[reply_id] = reply.get("result")
+
+    return results
+
+
 def get_transaction_receipt(tx_hash: str, chain: str) -> dict:
     """Get transaction receipt"""
     config = CHAIN_CONFIG.get(chain)
@@ -140,11 +200,16 @@ def get_internal_transactions(tx_hash: str, chain: str) -> list:
 
 
 def get_block_timestamp(block_number: int, chain: str) -> int:
-    """Get block timestamp"""
+    """Get block timestamp, consulting the local block timestamp store first"""
     config = CHAIN_CONFIG.get(chain)
     if not config:
         raise ValueError(f"Unsupported chain: {chain}")
 
+    store = get_store(chain)
+    cached = store.get(block_number)
+    if cached is not None:
+        return cached
+
     api_key = os.getenv(config["api_key_env"]) or os.getenv("ETHERSCAN_API_KEY")
 
     params = {
@@ -156,7 +221,11 @@ def get_block_timestamp(block_number: int, chain: str) -> int:
     data = fetch_api(config["api_url"], params, api_key)
 
     if data.get("status") == "1":
-        return int(data["result"].get("timeStamp", 0))
+        timestamp = int(data["result"].get("timeStamp", 0))
+        if timestamp:
+            store.put(block_number, timestamp)
+            store.flush()
+        return timestamp
 
     return 0
 
@@ -167,32 +236,16 @@ def decode_function_signature(input_data: str) -> str:
         return "Native Transfer"
 
     method_id = input_data[:10].lower()
-    return FUNCTION_SIGNATURES.get(method_id, f"Unknown ({method_id})")
-
-
-def analyze_transaction(tx_hash: str, chain: str) -> dict:
-    """Comprehensive transaction analysis"""
-    config = CHAIN_CONFIG.get(chain)
-    if not config:
-        raise ValueError(f"Unsupported chain: {chain}")
-
-    # Validate tx hash format
-    if not tx_hash.startswith("0x") or len(tx_hash) != 66:
-        raise ValueError(f"Invalid transaction hash format: {tx_hash}")
-
-    # Fetch transaction data
-    tx_data = get_transaction_by_hash(tx_hash, chain)
-    if not tx_data:
-        raise ValueError(f"Transaction not found: {tx_hash}")
+    return lookup_signature(method_id) or FUNCTION_SIGNATURES.get(method_id, f"Unknown ({method_id})")
 
-    # Fetch receipt for additional info
-    receipt = get_transaction_receipt(tx_hash, chain)
 
-    # Fetch internal transactions
-    internal_txs = get_internal_transactions(tx_hash, chain)
+def build_transaction_analysis(tx_hash: str, chain: str, tx_data: dict, receipt: Optional[dict],
+                               internal_txs: list, timestamp: int) -> dict:
+    """Assemble the analysis result from already fetched transaction data"""
+    config = CHAIN_CONFIG[chain]
 
     # Parse basic info
-    block_number = int(tx_data.get("blockNumber", "0x0"), 16)
+    block_number = int(tx_data.get("blockNumber") or "0x0", 16)
     value_wei = int(tx_data.get("value", "0x0"), 16)
     gas_limit = int(tx_data.get("gas", "0x0"), 16)
     gas_price_wei = int(tx_data.get("gasPrice", "0x0"), 16)
@@ -206,13 +259,12 @@ def analyze_transaction(tx_hash: str, chain: str) -> dict:
     status = receipt.get("status", "0x1") if receipt else "0x1"
     is_success = status == "0x1"
 
-    # Get timestamp
-    timestamp = get_block_timestamp(block_number, chain)
     timestamp_str = datetime.utcfromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S UTC") if timestamp else "Unknown"
 
     # Parse logs (events)
     logs = receipt.get("logs", []) if receipt else []
     events_count = len(logs)
+    decoded_events = decode_logs(logs)
 
     # Decode function
     input_data = tx_data.get("input", "0x")
@@ -261,22 +313,159 @@ def analyze_transaction(tx_hash: str, chain: str) -> dict:
             "input_data_length": len(input_data),
             "events_emitted": events_count
         },
+        "events": {
+            "decoded": events_count - decoded_events["unknown_count"],
+            "event_counts": decoded_events["event_counts"],
+            "transfer_count": len(decoded_events["transfers"]),
+            "token_transfers": decoded_events["transfers"][:20],  # Limit display
+            "net_flows": decoded_events["net_flows"]
+        },
         "internal_transactions": {
             "count": len(internal_txs),
             "transfers": internal_transfers
         },
         "analysis": {
-            "tx_type": classify_transaction(function_name, value_wei, logs),
+            "tx_type": classify_transaction(function_name, value_wei, logs, decoded_events),
             "complexity": "HIGH" if gas_used > 200000 else "MEDIUM" if gas_used > 50000 else "LOW"
         }
     }
 
 
-def classify_transaction(function_name: str, value_wei: int, logs: list) -> str:
-    """Classify transaction type"""
-    func_lower = function_name.lower()
+def analyze_transaction(tx_hash: str, chain: str) -> dict:
+    """Comprehensive transaction analysis"""
+    config = CHAIN_CONFIG.get(chain)
+    if not config:
+        raise ValueError(f"Unsupported chain: {chain}")
 
-    if "transfer" in func_lower and "from" not in func_lower:
+    # Validate tx hash format
+    if not tx_hash.startswith("0x") or len(tx_hash) != 66:
+        raise ValueError(f"Invalid transaction hash format: {tx_hash}")
+
+    # Fetch transaction data
+    tx_data = get_transaction_by_hash(tx_hash, chain)
+    if not tx_data:
+        raise ValueError(f"Transaction not found: {tx_hash}")
+
+    # Fetch receipt for additional info
+    receipt = get_transaction_receipt(tx_hash, chain)
+
+    # Fetch internal transactions
+    internal_txs = get_internal_transactions(tx_hash, chain)
+
+    # Get timestamp
+    block_number = int(tx_data.get("blockNumber") or "0x0", 16)
+    timestamp = get_block_timestamp(block_number, chain)
+
+    return build_transaction_analysis(tx_hash, chain, tx_data, receipt, internal_txs, timestamp)
+
+
+def analyze_transactions_bulk(tx_hashes: List[str], chain: str, include_internal: bool = True) -> dict:
+    """Analyze many transactions using batched RPC calls.
+
+    Transactions and receipts go out as JSON-RPC batches, each distinct block
+    is fetched once for its timestamp, and internal transactions are pulled
+    from the explorer concurrently under EXPLORER_RATE_LIMIT.
+    """
+    config = CHAIN_CONFIG.get(chain)
+    if not config:
+        raise ValueError(f"Unsupported chain: {chain}")
+
+    # Deduplicate while keeping input order
+    hashes = list(dict.fromkeys(h.lower() for h in tx_hashes))
+    if len(hashes) > MAX_BULK_HASHES:
+        raise ValueError(f"Too many transaction hashes: {len(hashes)} (max {MAX_BULK_HASHES})")
+
+    errors: List[Dict] = []
+    valid = []
+    for tx_hash in hashes:
+        if tx_hash.startswith("0x") and len(tx_hash) == 66:
+            valid.append(tx_hash)
+        else:
+            errors.append({"tx_hash": tx_hash, "error": "Invalid transaction hash format"})
+
+    # Transactions and receipts in one set of batches
+    calls = []
+    for tx_hash in valid:
+        calls.append(("eth_getTransactionByHash", [tx_hash]))
+        calls.append(("eth_getTransactionReceipt", [tx_hash]))
+    replies = rpc_batch(config["rpc_url"], calls)
+
+    found: Dict[str, Tuple[dict, Optional[dict]]] = {}
+    for i, tx_hash in enumerate(valid):
+        tx_data, receipt = replies[2 * i], replies[2 * i + 1]
+        if tx_data:
+            found[tx_hash] = (tx_data, receipt)
+        else:
+            errors.append({"tx_hash": tx_hash, "error": "Transaction not found"})
+
+    # One block lookup per distinct block, skipping blocks already in the store
+    blocks = sorted({
+        int(tx_data["blockNumber"], 16)
+        for tx_data, _ in found.values() if tx_data.get("blockNumber")
+    })
+    store = get_store(chain)
+    timestamps = store.get_many(blocks)
+    missing = [b for b in blocks if b not in timestamps]
+    if missing:
+        block_replies = rpc_batch(config["rpc_url"], [("eth_getBlockByNumber", [hex(b), False]) for b in missing])
+        fetched = {
+            block: int(reply["timestamp"], 16)
+            for block, reply in zip(missing, block_replies) if reply
+        }
+        store.put_many(fetched)
+        store.flush()
+        timestamps.update(fetched)
+
+    # Internal transactions have no RPC equivalent; fan out to the explorer
+    internal: Dict[str, list] = {}
+    if include_internal and found:
+        limiter = RateLimiter(EXPLORER_RATE_LIMIT)
+
+        def fetch_internal(tx_hash: str) -> list:
+            limiter.wait()
+            try:
+                return get_internal_transactions(tx_hash, chain)
+            except ConnectionError:
+                return []
+
+        with ThreadPoolExecutor(max_workers=EXPLORER_MAX_WORKERS) as pool:
+            internal = dict(zip(found, pool.map(fetch_internal, found)))
+
+    transactions = []
+    for tx_hash, (tx_data, receipt) in found.items():
+        block_number = int(tx_data.get("blockNumber") or "0x0", 16)
+        transactions.append(build_transaction_analysis(
+            tx_hash, chain, tx_data, receipt, internal.get(tx_hash, []), timestamps.get(block_number, 0)
+        ))
+
+    return {
+        "success": True,
+        "chain": chain,
+        "requested": len(tx_hashes),
+        "analyzed": len(transactions),
+        "unique_blocks": len(blocks),
+        "blocks_from_cache": len(blocks) - len(missing),
+        "transactions": transactions,
+        "errors": errors
+    }
+
+
+def classify_transaction(function_name: str, value_wei: int, logs: list,
+                         decoded_events: Optional[dict] = None) -> str:
+    """Classify transaction type from emitted events, falling back to the function name"""
+    decoded_events = decoded_events if decoded_events is not None else decode_logs(logs)
+
+    # Swap and lending events identify the action regardless of the entry point
+    event_type = classify_events(decoded_events)
+    if event_type:
+        return event_type
+
+    # Match on the function name only so argument types don't trigger keywords
+    func_lower = function_name.split("(")[0].strip().lower()
+
+    if func_lower == "native transfer":
+        return "Native Token Transfer"
+    elif "transfer" in func_lower and "from" not in func_lower:
         return "Token Transfer"
     elif "approve" in func_lower:
         return "Token Approval"
@@ -292,8 +481,8 @@ def classify_transaction(function_name: str, value_wei: int, logs: list) -> str:
         return "Loan Repayment"
     elif "withdraw" in func_lower:
         return "Withdrawal"
-    elif "native transfer" in func_lower.lower():
-        return "Native Token Transfer"
+    elif (kind := classify_transfers(decoded_events)):
+        return kind
     elif len(logs) > 5:
         return "Complex DeFi Operation"
     else:
@@ -305,8 +494,17 @@ def main():
         input_data = json.loads(sys.stdin.read())
 
         tx_hash = input_data.get("tx_hash")
+        tx_hashes = input_data.get("tx_hashes")
         chain = input_data.get("chain", "ethereum")
 
+        if tx_hashes:
+            if not isinstance(tx_hashes, list):
+                print(json.dumps({"error": "tx_hashes must be a list"}))
+                sys.exit(1)
+            result = analyze_transactions_bulk(tx_hashes, chain, input_data.get("include_internal", True))
+            print(json.dumps(result, indent=2))
+            return
+
         if not tx_hash:
             print(json.dumps({"error": "Missing required parameter: tx_hash"}))
             sys.exit(1)
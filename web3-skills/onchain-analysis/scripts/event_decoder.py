@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Receipt Log Decoder
+Decodes common token, DEX and lending events from transaction receipt logs
+"""
+
+from typing import Dict, List, Optional
+
+WORD = 32
+INT256_SIGN = 1 << 255
+INT24_SIGN = 1 << 23
+
+
+def _address(topic: str) -> str:
+    return "0x" + topic[-40:].lower()
+
+
+def _uint(data: bytes, index: int) -> int:
+    return int.from_bytes(data[index * WORD:(index + 1) * WORD], "big")
+
+
+def _int(data: bytes, index: int) -> int:
+    value = _uint(data, index)
+    return value - (1 << 256) if value & INT256_SIGN else value
+
+
+def _data_address(data: bytes, index: int) -> str:
+    return "0x" + data[index * WORD + 12:(index + 1) * WORD].hex()
+
+
+def _uint_array(data: bytes, offset_index: int) -> List[int]:
+    """Read a dynamic uint256[] whose head offset is at word offset_index"""
+    start = _uint(data, offset_index)
+    length = int.from_bytes(data[start:start + WORD], "big")
+    base = start + WORD
+    return [int.from_bytes(data[base + i * WORD:base + (i + 1) * WORD], "big") for i in range(length)]
+
+
+def _transfer(topics: List[str], data: bytes) -> Dict:
+    # ERC-721 indexes the token id; ERC-20 keeps the amount in data
+    if len(topics) == 4:
+        return {"event": "Transfer", "standard": "ERC721", "from": _address(topics[1]),
+                "to": _address(topics[2]), "token_id": str(int(topics[3], 16))}
+    return {"event": "Transfer", "standard": "ERC20", "from": _address(topics[1]),
+            "to": _address(topics[2]), "amount": str(_uint(data, 0))}
+
+
+def _approval(topics: List[str], data: bytes) -> Dict:
+    if len(topics) == 4:
+        return {"event": "Approval", "standard": "ERC721", "owner": _address(topics[1]),
+                "spender": _address(topics[2]), "token_id": str(int(topics[3], 16))}
+    return {"event": "Approval", "standard": "ERC20", "owner": _address(topics[1]),
+            "spender": _address(topics[2]), "amount": str(_uint(data, 0))}
+
+
+def _approval_for_all(topics: List[str], data: bytes) -> Dict:
+    return {"event": "ApprovalForAll", "standard": "ERC721/1155", "owner": _address(topics[1]),
+            "operator": _address(topics[2]), "approved": bool(_uint(data, 0))}
+
+
+def _transfer_single(topics: List[str], data: bytes) -> Dict:
+    return {"event": "TransferSingle", "standard": "ERC1155", "operator": _address(topics[1]),
+            "from": _address(topics[2]), "to": _address(topics[3]),
+            "token_id": str(_uint(data, 0)), "amount": str(_uint(data, 1))}
+
+
+def _transfer_batch(topics: List[str], data: bytes) -> Dict:
+    ids = _uint_array(data, 0)
+    values = _uint_array(data, 1)
+    return {"event": "TransferBatch", "standard": "ERC1155", "operator": _address(topics[1]),
+            "from": _address(topics[2]), "to": _address(topics[3]),
+            "token_ids": [str(i) for i in ids], "amounts": [str(v) for v in values]}
+
+
+def _swap_v2(topics: List[str], data: bytes) -> Dict:
+    return {"event": "Swap", "standard": "UniswapV2", "sender": _address(topics[1]),
+            "to": _address(topics[2]),
+            "amount0_in": str(_uint(data, 0)), "amount1_in": str(_uint(data, 1)),
+            "amount0_out": str(_uint(data, 2)), "amount1_out": str(_uint(data, 3))}
+
+
+def _swap_v3(topics: List[str], data: bytes) -> Dict:
+    tick = _uint(data, 4) & 0xFFFFFF
+    return {"event": "Swap", "standard": "UniswapV3", "sender": _address(topics[1]),
+            "recipient": _address(topics[2]),
+            "amount0": str(_int(data, 0)), "amount1": str(_int(data, 1)),
+            "sqrt_price_x96": str(_uint(data, 2)), "liquidity": str(_uint(data, 3)),
+            "tick": tick - (1 << 24) if tick & INT24_SIGN else tick}
+
+
+def _aave_supply(topics: List[str], data: bytes) -> Dict:
+    return {"event": "Supply", "standard": "AaveV3", "reserve": _address(topics[1]),
+            "on_behalf_of": _address(topics[2]), "user": _data_address(data, 0),
+            "amount": str(_uint(data, 1))}
+
+
+def _aave_borrow(topics: List[str], data: bytes) -> Dict:
+    return {"event": "Borrow", "standard": "AaveV3", "reserve": _address(topics[1]),
+            "on_behalf_of": _address(topics[2]), "user": _data_address(data, 0),
+            "amount": str(_uint(data, 1)),
+            "interest_rate_mode": "variable" if _uint(data, 2) == 2 else "stable",
+            "borrow_rate_ray": str(_uint(data, 3))}
+
+
+def _aave_repay(topics: List[str], data: bytes) -> Dict:
+    return {"event": "Repay", "standard": "AaveV3", "reserve": _address(topics[1]),
+            "user": _address(topics[2]), "repayer": _address(topics[3]),
+            "amount": str(_uint(data, 0)), "use_atokens": bool(_uint(data, 1))}
+
+
+def _aave_withdraw(topics: List[str], data: bytes) -> Dict:
+    return {"event": "Withdraw", "standard": "AaveV3", "reserve": _address(topics[1]),
+            "user": _address(topics[2]), "to": _address(topics[3]),
+            "amount": str(_uint(data, 0))}
+
+
+def _weth_deposit(topics: List[str], data: bytes) -> Dict:
+    return {"event": "Deposit", "standard": "WETH", "to": _address(topics[1]),
+            "amount": str(_uint(data, 0))}
+
+
+def _weth_withdrawal(topics: List[str], data: bytes) -> Dict:
+    return {"event": "Withdrawal", "standard": "WETH", "from": _address(topics[1]),
+            "amount": str(_uint(data, 0))}
+
+
+# topic0 -> (minimum topic count, minimum data words, decoder)
+EVENT_DECODERS: Dict[str, tuple] = {
+    # Transfer(address,address,uint256)
+    "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef": (3, 0, _transfer),
+    # Approval(address,address,uint256)
+    "0x8c5be1e5ebec7d5bd14f71427d1e84f3dd0314c0f7b2291e5b200ac8c7c3b925": (3, 0, _approval),
+    # ApprovalForAll(address,address,bool)
+    "0x17307eab39ab6107e8899845ad3d59bd9653f200f220920489ca2b5937696c31": (3, 1, _approval_for_all),
+    # TransferSingle(address,address,address,uint256,uint256)
+    "0xc3d58168c5ae7397731d063d5bbf3d657854427343f4c083240f7aacaa2d0f62": (4, 2, _transfer_single),
+    # TransferBatch(address,address,address,uint256[],uint256[])
+    "0x4a39dc06d4c0dbc64b70af90fd698a233a518aa5d07e595d983b8c0526c8f7fb": (4, 4, _transfer_batch),
+    # Swap(address,uint256,uint256,uint256,uint256,address) - Uniswap V2 and forks
+    "0xd78ad95fa46c994b6551d0da85fc275fe613ce37657fb8d5e3d130840159d822": (3, 4, _swap_v2),
+    # Swap(address,address,int256,int256,uint160,uint128,int24) - Uniswap V3 and forks
+    "0xc42079f94a6350d7e6235f29174924f928cc2ac818eb64fed8004e115fbcca67": (3, 5, _swap_v3),
+    # Supply(address,address,address,uint256,uint16) - Aave V3
+    "0x2b627736bca15cd5381dcf80b0bf11fd197d01a037c52b927a881a10fb73ba61": (3, 2, _aave_supply),
+    # Borrow(address,address,address,uint256,uint8,uint256,uint16) - Aave V3
+    "0xb3d084820fb1a9decffb176436bd02558d15fac9b0ddfed8c465bc7359d7dce0": (3, 4, _aave_borrow),
+    # Repay(address,address,address,uint256,bool) - Aave V3
+    "0xa534c8dbe71f871f9f3530e97a74601fea17b426cae02e1c5aee42c96c784051": (4, 2, _aave_repay),
+    # Withdraw(address,address,address,uint256) - Aave V3
+    "0x3115d1449a7b732c986cba18244e897a450f61e1bb8d589cd2e69e6c8924f9f7": (4, 1, _aave_withdraw),
+    # Deposit(address,uint256) - WETH
+    "0xe1fffcc4923d04b559f4d29a8bfc6cda04eb5b0d3c460751c2402c5c5cc9109c": (2, 1, _weth_deposit),
+    # Withdrawal(address,uint256) - WETH
+    "0x7fcf532c15f0a6db0bd6d0e038bea71d30d808c7d98cb3bf7268a95bf5081b65": (2, 1, _weth_withdrawal),
+}
+
+TRANSFER_EVENTS = ("Transfer", "TransferSingle", "TransferBatch")
+
+
+def decode_log(log: dict) -> Optional[Dict]:
+    """Decode a single receipt log, or None if the event is unknown or malformed"""
+    topics = log.get("topics") or []
+    if not topics:
+        return None
+
+    entry = EVENT_DECODERS.get(topics[0].lower())
+    if entry is None:
+        return None
+
+    min_topics, min_words, decoder = entry
+    data_hex = log.get("data") or "0x"
+    try:
+        data = bytes.fromhex(data_hex[2:] if data_hex.startswith("0x") else data_hex)
+    except ValueError:
+        return None
+
+    if len(topics) < min_topics or len(data) < min_words * WORD:
+        return None
+
+    try:
+        decoded = decoder(topics, data)
+    except (ValueError, IndexError):
+        return None
+
+    decoded["contract"] = (log.get("address") or "").lower()
+    log_index = log.get("logIndex")
+    if log_index is not None:
+        decoded["log_index"] = int(log_index, 16) if isinstance(log_index, str) else log_index
+    return decoded
+
+
+def decode_logs(logs: List[dict]) -> Dict:
+    """Decode all logs of a receipt in one pass.
+
+    Returns the decoded events, per-event counts, and token flows: every
+    transfer plus the net amount each address gained or lost per token.
+    """
+    events = []
+    counts: Dict[str, int] = {}
+    transfers = []
+    net_flows: Dict[str, Dict[str, int]] = {}
+    unknown = 0
+
+    for log in logs:
+        event = decode_log(log)
+        if event is None:
+            unknown += 1
+            continue
+
+        events.append(event)
+        key = f"{event['standard']}:{event['event']}"
+        counts[key] = counts.get(key, 0) + 1
+
+        if event["event"] in TRANSFER_EVENTS:
+            transfers.append(event)
+            if event["standard"] == "ERC20":
+                token = net_flows.setdefault(event["contract"], {})
+                amount = int(event["amount"])
+                token[event["from"]] = token.get(event["from"], 0) - amount
+                token[event["to"]] = token.get(event["to"], 0) + amount
+
+    return {
+        "events": events,
+        "event_counts": counts,
+        "unknown_count": unknown,
+        "transfers": transfers,
+        "net_flows": {
+            token: {address: str(amount) for address, amount in flows.items() if amount}
+            for token, flows in net_flows.items()
+        }
+    }
+
+
+def classify_events(decoded: Dict) -> Optional[str]:
+    """Transaction type implied by decoded events, most specific first"""
+    counts = decoded.get("event_counts", {})
+
+    def has(*keys: str) -> bool:
+        return any(counts.get(key) for key in keys)
+
+    if has("UniswapV2:Swap", "UniswapV3:Swap"):
+        return "DEX Swap"
+    if has("AaveV3:Borrow"):
+        return "Lending Borrow"
+    if has("AaveV3:Repay"):
+        return "Loan Repayment"
+    if has("AaveV3:Supply"):
+        return "Lending Deposit"
+    if has("AaveV3:Withdraw"):
+        return "Withdrawal"
+    return None
+
+
+def classify_transfers(decoded: Dict) -> Optional[str]:
+    """Generic classification from transfer and approval events alone"""
+    counts = decoded.get("event_counts", {})
+
+    if counts.get("ERC721:Transfer") or counts.get("ERC1155:TransferSingle") or counts.get("ERC1155:TransferBatch"):
+        return "NFT Transfer"
+    if counts.get("ERC20:Transfer"):
+        return "Token Transfer"
+    if counts.get("ERC20:Approval"):
+        return "Token Approval"
+    if counts.get("ERC721/1155:ApprovalForAll") or counts.get("ERC721:Approval"):
+        return "NFT Approval"
+    if counts.get("WETH:Deposit") or counts.get("WETH:Withdrawal"):
+        return "Wrap/Unwrap"
+    return None
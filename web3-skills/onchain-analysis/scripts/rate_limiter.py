@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Explorer Rate Limiter
+Spaces calls evenly at a fixed rate across threads, shared by the onchain scripts
+"""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces calls evenly at a fixed rate"""
+
+    def __init__(self, rate_per_sec: float):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec > 0 else 0.0
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
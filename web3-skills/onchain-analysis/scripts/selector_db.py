@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Function Selector Database
+Maps 4-byte function selectors to signatures via a bundled, mmap-indexed binary file
+
+File layout (all integers little-endian):
+    header   magic b"FSDB", uint32 version, uint32 record count, uint32 strings offset
+    records  sorted by selector, 12 bytes each: selector[4], uint32 offset, uint32 length
+    strings  UTF-8 signatures referenced by the records
+
+Rebuild the bundled file with:
+    python selector_db.py data/signatures.txt [export.csv ...]
+"""
+
+import mmap
+import os
+import struct
+import sys
+from typing import Iterable, List, Optional, Tuple
+
+MAGIC = b"FSDB"
+VERSION = 1
+HEADER = struct.Struct("<4sIII")
+RECORD = struct.Struct("<4sII")
+
+DB_PATH_ENV = "SELECTOR_DB_PATH"
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "selectors.bin")
+
+# Keccak-256 round constants and rotation offsets, only needed when building
+_RC = [
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+    0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008,
+]
+_ROT = [
+    0, 1, 62, 28, 27,
+    36, 44, 6, 55, 20,
+    3, 10, 43, 25, 39,
+    41, 45, 15, 21, 8,
+    18, 2, 61, 56, 14,
+]
+_MASK = (1 << 64) - 1
+
+
+def _rol(x, n):
+    return ((x << n) | (x >> (64 - n))) & _MASK if n else x
+
+
+def _keccak_f(a):
+    for rc in _RC:
+        c = [a[x] ^ a[x + 5] ^ a[x + 10] ^ a[x + 15] ^ a[x + 20] for x in range(5)]
+        d = [c[(x - 1) % 5] ^ _rol(c[(x + 1) % 5], 1) for x in range(5)]
+        a = [a[i] ^ d[i % 5] for i in range(25)]
+        b = [0] * 25
+        for x in range(5):
+            for y in range(5):
+                b[y + 5 * ((2 * x + 3 * y) % 5)] = _rol(a[x + 5 * y], _ROT[x + 5 * y])
+        a = [b[i] ^ (~b[(i % 5 + 1) % 5 + 5 * (i // 5)] & b[(i % 5 + 2) % 5 + 5 * (i // 5)]) for i in range(25)]
+        a[0] ^= rc
+    return a
+
+
+def keccak256(data: bytes) -> bytes:
+    """Keccak-256 as used by Ethereum (not NIST SHA3-256)"""
+    rate = 136
+    padded = bytearray(data) + b"\x01" + b"\x00" * ((-len(data) - 1) % rate)
+    padded[-1] |= 0x80
+    state = [0] * 25
+    for off in range(0, len(padded), rate):
+        block = padded[off:off + rate]
+        for i in range(rate // 8):
+            state[i] ^= int.from_bytes(block[8 * i:8 * i + 8], "little")
+        state = _keccak_f(state)
+    return b"".join(state[i].to_bytes(8, "little") for i in range(4))
+
+
+class SelectorDatabase:
+    """Read-only selector lookups that binary-search the mapped file"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count, strings_offset = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"Not a selector database: {path}")
+
+        self.count = count
+        self._strings_offset = strings_offset
+
+    def _selector_at(self, index: int) -> bytes:
+        start = HEADER.size + index * RECORD.size
+        return self._mm[start:start + 4]
+
+    def lookup(self, selector: bytes) -> List[str]:
+        """All known signatures for a 4-byte selector, most common first"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._selector_at(mid) < selector:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        signatures = []
+        while lo < self.count:
+            found, offset, length = RECORD.unpack_from(self._mm, HEADER.size + lo * RECORD.size)
+            if found != selector:
+                break
+            start = self._strings_offset + offset
+            signatures.append(self._mm[start:start + length].decode())
+            lo += 1
+
+        return signatures
+
+    def close(self):
+        self._mm.close()
+
+
+_database: Optional[SelectorDatabase] = None
+_database_loaded = False
+
+
+def get_database() -> Optional[SelectorDatabase]:
+    """Open the selector database on first use; None if the file is missing"""
+    global _database, _database_loaded
+    if not _database_loaded:
+        _database_loaded = True
+        try:
+            _database = SelectorDatabase(os.getenv(DB_PATH_ENV) or DEFAULT_DB_PATH)
+        except (OSError, ValueError):
+            _database = None
+    return _database
+
+
+def parse_selector(selector: str) -> Optional[bytes]:
+    """Parse '0xa9059cbb' (or calldata starting with it) into 4 raw bytes"""
+    hex_part = selector[2:10] if selector[:2].lower() == "0x" else selector[:8]
+    if len(hex_part) != 8:
+        return None
+    try:
+        return bytes.fromhex(hex_part)
+    except ValueError:
+        return None
+
+
+def lookup_signatures(selector: str) -> List[str]:
+    """Signatures matching a hex selector, most common first"""
+    database = get_database()
+    raw = parse_selector(selector)
+    if database is None or raw is None:
+        return []
+    return database.lookup(raw)
+
+
+def lookup_signature(selector: str) -> Optional[str]:
+    """Most common signature for a hex selector, or None"""
+    signatures = lookup_signatures(selector)
+    return signatures[0] if signatures else None
+
+
+def read_signature_lines(lines: Iterable[str]) -> Iterable[Tuple[bytes, str]]:
+    """Yield (selector, signature) pairs from signature lists.
+
+    Accepts bare signatures, which are hashed, and "selector,signature" or
+    "selector signature" rows as found in public 4-byte exports, which are
+    trusted as-is so large dumps need no hashing.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        for sep in (",", " ", "\t"):
+            head, _, tail = line.partition(sep)
+            raw = parse_selector(head) if tail and len(head.removeprefix("0x")) == 8 else None
+            if raw is not None:
+                yield raw, tail.strip()
+                break
+        else:
+            yield keccak256(line.encode())[:4], line
+
+
+def build_database(pairs: Iterable[Tuple[bytes, str]], path: str) -> int:
+    """Write a selector database file; earlier pairs win ties within a selector"""
+    seen = set()
+    entries = []
+    for selector, signature in pairs:
+        if (selector, signature) not in seen:
+            seen.add((selector, signature))
+            entries.append((selector, signature))
+
+    # sorted() is stable, so input order is kept among equal selectors
+    entries = sorted(entries, key=lambda entry: entry[0])
+
+    strings = bytearray()
+    records = bytearray()
+    for selector, signature in entries:
+        encoded = signature.encode()
+        records += RECORD.pack(selector, len(strings), len(encoded))
+        strings += encoded
+
+    strings_offset = HEADER.size + len(records)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(entries), strings_offset))
+        f.write(records)
+        f.write(strings)
+    os.replace(tmp_path, path)
+
+    return len(entries)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: selector_db.py SIGNATURES [SIGNATURES ...]", file=sys.stderr)
+        sys.exit(1)
+
+    def pairs():
+        for source in sys.argv[1:]:
+            with open(source, encoding="utf-8") as f:
+                yield from read_signature_lines(f)
+
+    count = build_database(pairs(), DEFAULT_DB_PATH)
+    print(f"Wrote {count} selectors to {DEFAULT_DB_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,15 +4,33 @@ Jupiter Quote Script
 Gets swap quotes from Jupiter aggregator
 """
 
+import hashlib
 import json
+import os
 import sys
+import threading
+import time
 import urllib.request
 import urllib.error
-from typing import Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from rate_limiter import RateLimitedError, RateLimiter
+from token_registry import lookup_mint, lookup_symbol
 
 # Note: Jupiter API v6 was deprecated Sept 2025. Use the current API endpoint.
 JUPITER_API = "https://api.jup.ag/swap/v1"
 
+# Ladder mode
+QUOTE_RATE_LIMIT = 5.0  # Quote requests per second
+QUOTE_MAX_WORKERS = 8
+QUOTE_CACHE_TTL = 5  # Seconds a quote is reused for identical requests
+QUOTE_RETRIES = 3  # Attempts after a 429 response
+MAX_LADDER_QUOTES = 200
+
+CACHE_DIR_ENV = "JUPITER_QUOTE_CACHE_DIR"
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "spoon-skills", "jupiter_quotes")
+
 # Common token mints
 TOKEN_MINTS = {
     "SOL": "So11111111111111111111111111111111111111112",
@@ -50,12 +68,28 @@ def resolve_mint(token: str) -> str:
     if len(token) >= 32 and len(token) <= 44:
         return token
 
+    # Fall back to the token registry for less common symbols
+    entry = lookup_symbol(token)
+    if entry:
+        return entry["mint"]
+
     raise ValueError(f"Unknown token: {token}")
 
 
 def get_decimals(mint: str) -> int:
     """Get decimals for a token mint"""
-    return TOKEN_DECIMALS.get(mint, 9)  # Default to 9
+    if mint in TOKEN_DECIMALS:
+        return TOKEN_DECIMALS[mint]
+    entry = lookup_mint(mint)
+    return entry["decimals"] if entry else 9  # Default to 9
+
+
+def token_symbol(token: str, mint: str) -> str:
+    """Display symbol for a token given as a symbol or a mint address"""
+    if token.upper() in TOKEN_MINTS or token != mint:
+        return token.upper()
+    entry = lookup_mint(mint)
+    return entry["symbol"] if entry else token
 
 
 def fetch_json(url: str) -> dict:
@@ -64,6 +98,11 @@ def fetch_json(url: str) -> dict:
         req = urllib.request.Request(url, headers={"User-Agent": "JupiterQuote/1.0"})
         with urllib.request.urlopen(req, timeout=30) as response:
             return json.loads(response.read().decode())
+    except urllib.error.HTTPError as e:
+        if e.code == 429:
+            retry_after = e.headers.get("Retry-After")
+            raise RateLimitedError(f"Rate limited: {e}", float(retry_after) if retry_after and retry_after.isdigit() else None)
+        raise ConnectionError(f"Failed to fetch data: {e}")
     except urllib.error.URLError as e:
         raise ConnectionError(f"Failed to fetch data: {e}")
 
@@ -80,6 +119,68 @@ def get_jupiter_quote(input_mint: str, output_mint: str, amount: int, slippage_b
     return data
 
 
+class QuoteCache:
+    """Short-lived quote cache shared across runs, one file per request"""
+
+    def __init__(self, ttl: float = QUOTE_CACHE_TTL, cache_dir: Optional[str] = None):
+        self.ttl = ttl
+        self.cache_dir = cache_dir or os.getenv(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR
+
+    def _path(self, request: tuple) -> str:
+        digest = hashlib.sha256(json.dumps(request).encode()).hexdigest()[:32]
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def get(self, request: tuple) -> Optional[Dict]:
+        if self.ttl <= 0:
+            return None
+        try:
+            with open(self._path(request), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if time.time() - entry.get("fetched_at", 0) > self.ttl:
+            return None
+        return entry.get("quote")
+
+    def put(self, request: tuple, quote: Dict):
+        """Store a quote; best effort, an unwritable cache directory only loses the entry"""
+        if self.ttl <= 0:
+            return
+        path = self._path(request)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"fetched_at": time.time(), "quote": quote}, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+
+def fetch_quote(request: tuple, limiter: RateLimiter, cache: QuoteCache) -> Dict:
+    """Quote for an (input mint, output mint, raw amount, slippage) request.
+
+    Served from the cache when fresh; otherwise fetched under the shared
+    rate limit, backing off and retrying when the API answers 429.
+    """
+    quote = cache.get(request)
+    if quote is not None:
+        return quote
+
+    for attempt in range(QUOTE_RETRIES + 1):
+        limiter.wait()
+        try:
+            quote = get_jupiter_quote(*request)
+            break
+        except RateLimitedError as e:
+            if attempt == QUOTE_RETRIES:
+                raise
+            time.sleep(e.retry_after or 2 ** attempt)
+
+    cache.put(request, quote)
+    return quote
+
+
 def format_quote(quote: dict, input_symbol: str, output_symbol: str) -> Dict:
     """Format quote data for display"""
     input_mint = quote.get("inputMint", "")
@@ -165,13 +266,124 @@ def get_swap_quote(input_token: str, output_token: str, amount: float, slippage_
     quote = get_jupiter_quote(input_mint, output_mint, amount_raw, slippage_bps)
 
     # Format response
-    return format_quote(quote, input_token.upper(), output_token.upper())
+    return format_quote(quote, token_symbol(input_token, input_mint), token_symbol(output_token, output_mint))
+
+
+def ladder_amounts(options: dict) -> List[float]:
+    """Ladder sizes: an explicit amounts list, or min_amount to max_amount in geometric steps"""
+    if options.get("amounts"):
+        return [float(a) for a in options["amounts"]]
+
+    low, high = float(options.get("min_amount", 0)), float(options.get("max_amount", 0))
+    steps = int(options.get("steps", 20))
+    if low <= 0 or high < low or steps < 1:
+        raise ValueError("Ladder needs amounts, or min_amount <= max_amount with steps >= 1")
+    if steps == 1:
+        return [low]
+    ratio = (high / low) ** (1 / (steps - 1))
+    return [round(low * ratio ** i, 9) for i in range(steps - 1)] + [high]
+
+
+def price_impact_curve(amounts: List[float], quotes: List[Optional[Dict]], out_decimals: int) -> List[Dict]:
+    """Execution price per size, and how far it falls behind the smallest size"""
+    curve = []
+    best_price = None
+    for amount, quote in zip(amounts, quotes):
+        if quote is None:
+            continue
+        out_amount = int(quote.get("outAmount", 0)) / (10 ** out_decimals)
+        price = out_amount / amount if amount > 0 else 0
+        if best_price is None:
+            best_price = price
+        curve.append({
+            "amount_in": amount,
+            "amount_out": round(out_amount, 9),
+            "price": round(price, 9),
+            "price_impact_pct": round(float(quote.get("priceImpactPct", 0)) * 100, 4),
+            "vs_smallest_pct": round((best_price - price) / best_price * 100, 4) if best_price else None,
+            "route": [step.get("swapInfo", {}).get("label", "Unknown") for step in quote.get("routePlan", [])]
+        })
+    return curve
+
+
+def get_quote_ladder(pairs: List, amounts: List[float], slippage_bps: int = 50,
+                     rate_limit: float = QUOTE_RATE_LIMIT, cache_ttl: float = QUOTE_CACHE_TTL) -> Dict:
+    """Quote every pair at every ladder size concurrently.
+
+    Identical (input, output, amount, slippage) requests are fetched once,
+    all requests share one rate limiter, and quotes are reused from a short
+    TTL cache. Returns a price-impact curve per pair.
+    """
+    resolved = []
+    for pair in pairs:
+        input_token, output_token = (pair["input"], pair["output"]) if isinstance(pair, dict) else pair
+        input_mint, output_mint = resolve_mint(input_token), resolve_mint(output_token)
+        resolved.append((input_token, output_token, input_mint, output_mint))
+
+    requests = {}
+    for _, _, input_mint, output_mint in resolved:
+        in_decimals = get_decimals(input_mint)
+        for amount in amounts:
+            request = (input_mint, output_mint, int(amount * (10 ** in_decimals)), slippage_bps)
+            requests[request] = None
+
+    if len(requests) > MAX_LADDER_QUOTES:
+        raise ValueError(f"Too many quotes: {len(requests)} (max {MAX_LADDER_QUOTES})")
+
+    limiter = RateLimiter(rate_limit)
+    cache = QuoteCache(cache_ttl)
+    errors = {}
+
+    def run(request: tuple):
+        try:
+            requests[request] = fetch_quote(request, limiter, cache)
+        except (ConnectionError, ValueError) as e:
+            errors[request] = str(e)
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=QUOTE_MAX_WORKERS) as pool:
+        list(pool.map(run, requests))
+    elapsed = time.monotonic() - started
+
+    results = []
+    for input_token, output_token, input_mint, output_mint in resolved:
+        in_decimals = get_decimals(input_mint)
+        keys = [(input_mint, output_mint, int(a * (10 ** in_decimals)), slippage_bps) for a in amounts]
+        results.append({
+            "input": {"mint": input_mint, "symbol": token_symbol(input_token, input_mint)},
+            "output": {"mint": output_mint, "symbol": token_symbol(output_token, output_mint)},
+            "curve": price_impact_curve(amounts, [requests[k] for k in keys], get_decimals(output_mint)),
+            "errors": [{"amount_in": a, "error": errors[k]} for a, k in zip(amounts, keys) if k in errors]
+        })
+
+    return {
+        "success": True,
+        "slippage_bps": slippage_bps,
+        "pairs": results,
+        "stats": {
+            "requested": len(resolved) * len(amounts),
+            "unique_quotes": len(requests),
+            "errors": len(errors),
+            "elapsed_seconds": round(elapsed, 2)
+        }
+    }
 
 
 def main():
     try:
         input_data = json.loads(sys.stdin.read())
 
+        if input_data.get("pairs"):
+            result = get_quote_ladder(
+                input_data["pairs"],
+                ladder_amounts(input_data),
+                int(input_data.get("slippage_bps", 50)),
+                float(input_data.get("rate_limit", QUOTE_RATE_LIMIT)),
+                float(input_data.get("cache_ttl", QUOTE_CACHE_TTL))
+            )
+            print(json.dumps(result, indent=2))
+            return
+
         input_token = input_data.get("input_mint") or input_data.get("input_token", "SOL")
         output_token = input_data.get("output_mint") or input_data.get("output_token", "USDC")
         amount = input_data.get("amount")
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Solana API Rate Limiter
+Fixed-rate call spacing and the 429 error shared by the Jupiter and Magic Eden scripts
+"""
+
+import threading
+import time
+from typing import Optional
+
+
+class RateLimitedError(ConnectionError):
+    """HTTP 429 from an API, with the server's Retry-After in seconds when given"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces calls evenly at a fixed rate"""
+
+    def __init__(self, rate_per_sec: float):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec > 0 else 0.0
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
@@ -4,13 +4,17 @@ Solana Balance Script
 Fetches SOL and SPL token balances for a wallet
 """
 
+import base64
 import json
+import struct
 import sys
 import os
 import urllib.request
 import urllib.error
 from typing import Dict, List, Optional
 
+from token_registry import lookup_mint
+
 # Default RPC endpoints
 DEFAULT_RPC = "https://api.mainnet-beta.solana.com"
 
@@ -31,6 +35,29 @@ KNOWN_TOKENS = {
 TOKEN_PROGRAM_ID = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
 TOKEN_2022_PROGRAM_ID = "TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb"
 
+TOKEN_PROGRAMS = {
+    TOKEN_PROGRAM_ID: "spl-token",
+    TOKEN_2022_PROGRAM_ID: "spl-token-2022"
+}
+
+STAKE_PROGRAM_ID = "Stake11111111111111111111111111111111111111"
+
+# StakeStateV2 layout (200 bytes): u32 state, Meta {u64 rent_exempt_reserve,
+# staker, withdrawer, Lockup (48 bytes)}, then for delegated accounts
+# Delegation {voter, u64 stake, u64 activation_epoch, u64 deactivation_epoch, ...}
+STAKE_ACCOUNT_SIZE = 200
+STAKER_OFFSET = 12
+WITHDRAWER_OFFSET = 44
+STAKE_LAYOUT = struct.Struct("<I8x32s32s48x32sQQQ")  # Bytes 0-180; the tail is never read
+STAKE_STATES = {0: "uninitialized", 1: "initialized", 2: "delegated", 3: "rewards_pool"}
+EPOCH_MAX = 2 ** 64 - 1
+
+BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+RPC_BATCH_SIZE = 100  # Calls per batched request
+MULTIPLE_ACCOUNTS_LIMIT = 100  # getMultipleAccounts maximum
+MAX_BULK_WALLETS = 1000
+
 
 def rpc_request(method: str, params: list, rpc_url: str = None) -> dict:
     """Make JSON-RPC request to Solana"""
@@ -58,6 +85,48 @@ def rpc_request(method: str, params: list, rpc_url: str = None) -> dict:
         raise ConnectionError(f"RPC request failed: {e}")
 
 
+def rpc_batch(calls: List[tuple], rpc_url: str = None) -> List[dict]:
+    """Send (method, params) calls as JSON-RPC batches; responses come back in call order"""
+    url = rpc_url or os.getenv("SOLANA_RPC_URL", DEFAULT_RPC)
+    responses: List[dict] = [{"error": {"message": "No response from RPC"}} for _ in calls]
+
+    for start in range(0, len(calls), RPC_BATCH_SIZE):
+        payload = [
+            {"jsonrpc": "2.0", "id": start + i, "method": method, "params": params}
+            for i, (method, params) in enumerate(calls[start:start + RPC_BATCH_SIZE])
+        ]
+
+        try:
+            req = urllib.request.Request(
+                url,
+                data=json.dumps(payload).encode(),
+                headers={
+                    "Content-Type": "application/json",
+                    "User-Agent": "SolanaBalance/1.0"
+                }
+            )
+            with urllib.request.urlopen(req, timeout=30) as response:
+                replies = json.loads(response.read().decode())
+        except urllib.error.URLError as e:
+            raise ConnectionError(f"RPC request failed: {e}")
+
+        # Providers that refuse batches answer with a single error object
+        if isinstance(replies, dict):
+            raise ConnectionError(f"RPC batch rejected: {replies.get('error', replies)}")
+
+        # Replies may arrive in any order; match them by id
+        for reply in replies:
+            reply_id = reply.get("id")
+            if isinstance(reply_id, int) and 0 <= reply_id < len(responses):
+                responses[reply_id] = reply
+
+    return responses
+
+
+def token_accounts_call(address: str, program_id: str) -> tuple:
+    return ("getTokenAccountsByOwner", [address, {"programId": program_id}, {"encoding": "jsonParsed"}])
+
+
 def get_sol_balance(address: str) -> Dict:
     """Get SOL balance for an address"""
     result = rpc_request("getBalance", [address])
@@ -74,21 +143,8 @@ def get_sol_balance(address: str) -> Dict:
     }
 
 
-def get_token_accounts(address: str) -> List[Dict]:
-    """Get all SPL token accounts for an address"""
-    # Get Token Program accounts
-    params = [
-        address,
-        {"programId": TOKEN_PROGRAM_ID},
-        {"encoding": "jsonParsed"}
-    ]
-
-    result = rpc_request("getTokenAccountsByOwner", params)
-
-    if "error" in result:
-        return []
-
-    accounts = result.get("result", {}).get("value", [])
+def parse_token_accounts(accounts: List[Dict], program: str) -> List[Dict]:
+    """Non-zero balances from jsonParsed getTokenAccountsByOwner results"""
     token_balances = []
 
     for account in accounts:
@@ -103,66 +159,151 @@ def get_token_accounts(address: str) -> List[Dict]:
             ui_amount = token_amount.get("uiAmount", 0)
 
             if amount > 0:
-                token_info = KNOWN_TOKENS.get(mint, {"symbol": "UNKNOWN", "decimals": decimals})
+                token_info = KNOWN_TOKENS.get(mint) or lookup_mint(mint) or {"symbol": "UNKNOWN"}
                 token_balances.append({
                     "mint": mint,
                     "symbol": token_info["symbol"],
                     "balance": ui_amount,
                     "raw_amount": str(amount),
                     "decimals": decimals,
-                    "token_account": account.get("pubkey")
+                    "token_account": account.get("pubkey"),
+                    "program": program
                 })
         except Exception:
             continue
 
+    return token_balances
+
+
+def sort_token_balances(token_balances: List[Dict]) -> List[Dict]:
     # Sort by symbol (known tokens first)
     token_balances.sort(key=lambda x: (x["symbol"] == "UNKNOWN", x["symbol"]))
-
     return token_balances
 
 
-def get_stake_accounts(address: str) -> Dict:
-    """Get stake accounts for an address using getProgramAccounts with stake program"""
-    # Stake Program ID
-    STAKE_PROGRAM_ID = "Stake11111111111111111111111111111111111111"
-
-    # Note: getProgramAccounts with memcmp filter for stake authority
-    # This is a simplified approach - stake accounts have complex structure
-    params = [
-        STAKE_PROGRAM_ID,
-        {
-            "encoding": "jsonParsed",
+def collect_token_balances(responses: List[dict]) -> List[Dict]:
+    """Sorted balances from one getTokenAccountsByOwner response per token program"""
+    token_balances = []
+    for program, result in zip(TOKEN_PROGRAMS.values(), responses):
+        if "error" not in result:
+            token_balances += parse_token_accounts(result.get("result", {}).get("value", []), program)
+    return sort_token_balances(token_balances)
+
+
+def get_token_accounts(address: str) -> List[Dict]:
+    """Get all SPL Token and Token-2022 accounts for an address in one batch"""
+    responses = rpc_batch([token_accounts_call(address, program_id) for program_id in TOKEN_PROGRAMS])
+    return collect_token_balances(responses)
+
+
+def b58encode(data: bytes) -> str:
+    value = int.from_bytes(data, "big")
+    chars = []
+    while value:
+        value, digit = divmod(value, 58)
+        chars.append(BASE58_ALPHABET[digit])
+    leading = len(data) - len(data.lstrip(b"\0"))
+    return "1" * leading + "".join(reversed(chars))
+
+
+def stake_accounts_calls(address: str) -> List[tuple]:
+    """getProgramAccounts calls for stake accounts where the address is staker or withdrawer.
+
+    Both memcmp filters plus the dataSize filter let the node skip every
+    other stake account, and dataSlice drops the bytes after the delegation.
+    """
+    calls = []
+    for offset in (STAKER_OFFSET, WITHDRAWER_OFFSET):
+        calls.append(("getProgramAccounts", [STAKE_PROGRAM_ID, {
+            "encoding": "base64",
+            "dataSlice": {"offset": 0, "length": STAKE_LAYOUT.size},
             "filters": [
-                {"memcmp": {"offset": 12, "bytes": address}}  # Staker authority offset
+                {"dataSize": STAKE_ACCOUNT_SIZE},
+                {"memcmp": {"offset": offset, "bytes": address}}
             ]
-        }
-    ]
+        }]))
+    return calls
 
-    result = rpc_request("getProgramAccounts", params)
 
-    # Handle response
-    if "error" in result or not result.get("result"):
-        return {"count": 0, "total_staked": 0, "accounts": [], "note": "No stake accounts found or RPC error"}
+def stake_status(activation_epoch: int, deactivation_epoch: int, current_epoch: Optional[int]) -> str:
+    """Activation state by epoch, ignoring partial warmup and cooldown"""
+    if current_epoch is None:
+        return "unknown"
+    if deactivation_epoch != EPOCH_MAX:
+        return "deactivating" if deactivation_epoch >= current_epoch else "inactive"
+    return "activating" if activation_epoch >= current_epoch else "active"
 
-    accounts = result.get("result", [])
 
+def parse_stake_accounts(accounts: List[Dict], current_epoch: Optional[int] = None) -> List[Dict]:
+    """Decode raw base64 stake account data returned by getProgramAccounts"""
+    parsed = []
+    for entry in accounts:
+        account = entry.get("account", {})
+        try:
+            data = base64.b64decode(account.get("data", [""])[0])
+            state, staker, withdrawer, voter, stake, activation, deactivation = STAKE_LAYOUT.unpack_from(data)
+        except (ValueError, struct.error):
+            continue
+
+        lamports = account.get("lamports", 0)
+        stake_account = {
+            "address": entry.get("pubkey"),
+            "state": STAKE_STATES.get(state, "unknown"),
+            "lamports": lamports,
+            "sol": round(lamports / 1e9, 9),
+            "staker": b58encode(staker),
+            "withdrawer": b58encode(withdrawer)
+        }
+        if state == 2:
+            stake_account.update({
+                "voter": b58encode(voter),
+                "delegated_sol": round(stake / 1e9, 9),
+                "activation_epoch": activation,
+                "deactivation_epoch": None if deactivation == EPOCH_MAX else deactivation,
+                "status": stake_status(activation, deactivation, current_epoch)
+            })
+        parsed.append(stake_account)
+    return parsed
+
+
+def collect_stake_accounts(responses: List[dict], current_epoch: Optional[int] = None) -> Dict:
+    """Merge the staker and withdrawer query results into one summary"""
+    if any("error" in response for response in responses):
+        errors = [response["error"] for response in responses if "error" in response]
+        return {"count": 0, "total_staked": 0, "accounts": [], "note": f"RPC error: {errors[0]}"}
+
+    accounts = {}
+    for response in responses:
+        for stake_account in parse_stake_accounts(response.get("result") or [], current_epoch):
+            accounts.setdefault(stake_account["address"], stake_account)
+
+    ordered = sorted(accounts.values(), key=lambda a: a["lamports"], reverse=True)
     return {
-        "count": len(accounts),
-        "note": "Use Solana Explorer or CLI for detailed stake account info"
+        "count": len(ordered),
+        "total_staked": round(sum(a.get("delegated_sol", 0) for a in ordered if a.get("status") != "inactive"), 9),
+        "total_lamports": sum(a["lamports"] for a in ordered),
+        "current_epoch": current_epoch,
+        "accounts": ordered
     }
 
 
-def get_wallet_balance(address: str) -> Dict:
-    """Get comprehensive wallet balance"""
-    # Validate address format (basic check)
-    if len(address) < 32 or len(address) > 44:
+def get_stake_accounts(address: str) -> Dict:
+    """Stake accounts the address controls as staker or withdrawer"""
+    validate_address(address)
+    epoch_result, *stake_results = rpc_batch([("getEpochInfo", [])] + stake_accounts_calls(address))
+    current_epoch = (epoch_result.get("result") or {}).get("epoch")
+    return collect_stake_accounts(stake_results, current_epoch)
+
+
+def validate_address(address: str):
+    # Basic check: base58 public keys are 32-44 characters
+    if not isinstance(address, str) or len(address) < 32 or len(address) > 44:
         raise ValueError(f"Invalid Solana address format: {address}")
 
-    # Get SOL balance
-    sol_balance = get_sol_balance(address)
 
-    # Get SPL token balances
-    token_balances = get_token_accounts(address)
+def build_wallet_balance(address: str, lamports: int, token_balances: List[Dict]) -> Dict:
+    """Wallet summary from its lamports and parsed token balances"""
+    sol = lamports / 1e9
 
     # Filter for significant balances
     significant_tokens = [t for t in token_balances if t["balance"] > 0.001]
@@ -177,8 +318,8 @@ def get_wallet_balance(address: str) -> Dict:
         "address": address,
         "network": "mainnet-beta",
         "sol_balance": {
-            "sol": round(sol_balance["sol"], 9),
-            "lamports": sol_balance["lamports"],
+            "sol": round(sol, 9),
+            "lamports": lamports,
             "rent_exempt_minimum": 0.00203928  # Approximate minimum for rent exemption
         },
         "token_holdings": {
@@ -188,25 +329,131 @@ def get_wallet_balance(address: str) -> Dict:
             "other_tokens": other_tokens[:10]  # Limit display
         },
         "summary": {
-            "has_sol": sol_balance["sol"] > 0,
+            "has_sol": sol > 0,
             "has_tokens": len(significant_tokens) > 0,
             "estimated_staked_sol": sum(t["balance"] for t in liquid_staking),
-            "activity_status": "ACTIVE" if sol_balance["sol"] > 0 or len(significant_tokens) > 0 else "EMPTY"
+            "activity_status": "ACTIVE" if sol > 0 or len(significant_tokens) > 0 else "EMPTY"
         }
     }
 
 
+def get_wallet_balance(address: str, include_stake: bool = True) -> Dict:
+    """Get comprehensive wallet balance.
+
+    getBalance, the SPL Token and Token-2022 account queries and, when
+    requested, the stake account lookups go out in a single JSON-RPC batch.
+    """
+    validate_address(address)
+
+    token_calls = [token_accounts_call(address, program_id) for program_id in TOKEN_PROGRAMS]
+    stake_calls = [("getEpochInfo", [])] + stake_accounts_calls(address) if include_stake else []
+    responses = rpc_batch([("getBalance", [address])] + token_calls + stake_calls)
+    sol_result = responses[0]
+    token_results = responses[1:1 + len(token_calls)]
+
+    if "error" in sol_result:
+        raise ValueError(f"RPC error: {sol_result['error']}")
+
+    lamports = sol_result.get("result", {}).get("value", 0)
+    result = build_wallet_balance(address, lamports, collect_token_balances(token_results))
+
+    if include_stake:
+        epoch_result, *stake_results = responses[1 + len(token_calls):]
+        stake_accounts = collect_stake_accounts(stake_results, (epoch_result.get("result") or {}).get("epoch"))
+        result["stake_accounts"] = stake_accounts
+        result["summary"]["estimated_staked_sol"] = round(
+            result["summary"]["estimated_staked_sol"] + stake_accounts["total_staked"], 9)
+
+    return result
+
+
+def get_lamports(addresses: List[str]) -> Dict[str, Optional[int]]:
+    """Lamports for many accounts via getMultipleAccounts, 100 accounts per call.
+
+    Only the balance is needed, so dataSlice skips the account data entirely.
+    Accounts that do not exist map to None.
+    """
+    chunks = [addresses[i:i + MULTIPLE_ACCOUNTS_LIMIT] for i in range(0, len(addresses), MULTIPLE_ACCOUNTS_LIMIT)]
+    responses = rpc_batch([
+        ("getMultipleAccounts", [chunk, {"encoding": "base64", "dataSlice": {"offset": 0, "length": 0}}])
+        for chunk in chunks
+    ])
+
+    lamports: Dict[str, Optional[int]] = {}
+    for chunk, result in zip(chunks, responses):
+        if "error" in result:
+            raise ValueError(f"RPC error: {result['error']}")
+        for address, account in zip(chunk, result.get("result", {}).get("value", [])):
+            lamports[address] = account.get("lamports", 0) if account else None
+    return lamports
+
+
+def get_wallet_balances(addresses: List[str], include_tokens: bool = True) -> Dict:
+    """Balances for many wallets in a handful of round trips.
+
+    SOL balances come from getMultipleAccounts; token accounts for both token
+    programs are fetched with batched getTokenAccountsByOwner calls.
+    """
+    addresses = list(dict.fromkeys(addresses))
+    if len(addresses) > MAX_BULK_WALLETS:
+        raise ValueError(f"Too many wallets: {len(addresses)} (max {MAX_BULK_WALLETS})")
+
+    errors = {}
+    valid = []
+    for address in addresses:
+        try:
+            validate_address(address)
+            valid.append(address)
+        except ValueError as e:
+            errors[address] = str(e)
+
+    lamports = get_lamports(valid)
+
+    token_balances: Dict[str, List[Dict]] = {address: [] for address in valid}
+    if include_tokens:
+        calls = [token_accounts_call(address, program_id) for address in valid for program_id in TOKEN_PROGRAMS]
+        responses = rpc_batch(calls)
+        per_wallet = len(TOKEN_PROGRAMS)
+        for i, address in enumerate(valid):
+            token_balances[address] = collect_token_balances(responses[i * per_wallet:(i + 1) * per_wallet])
+
+    results = []
+    for address in addresses:
+        if address in errors:
+            results.append({"success": False, "address": address, "error": errors[address]})
+            continue
+        result = build_wallet_balance(address, lamports.get(address) or 0, token_balances[address])
+        result["account_exists"] = lamports.get(address) is not None
+        results.append(result)
+
+    return {
+        "success": True,
+        "network": "mainnet-beta",
+        "count": len(results),
+        "results": results
+    }
+
+
 def main():
     try:
         input_data = json.loads(sys.stdin.read())
 
         address = input_data.get("address")
+        addresses = input_data.get("addresses")
+
+        if addresses:
+            if not isinstance(addresses, list):
+                print(json.dumps({"error": "addresses must be a list"}))
+                sys.exit(1)
+            result = get_wallet_balances(addresses, input_data.get("include_tokens", True))
+            print(json.dumps(result, indent=2))
+            return
 
         if not address:
             print(json.dumps({"error": "Missing required parameter: address"}))
             sys.exit(1)
 
-        result = get_wallet_balance(address)
+        result = get_wallet_balance(address, input_data.get("include_stake", True))
         print(json.dumps(result, indent=2))
 
     except json.JSONDecodeError:
@@ -4,15 +4,49 @@ Solana NFT Script
 Queries Solana NFT data from Magic Eden
 """
 
+import bisect
 import json
+import os
 import sys
+import time
 import urllib.request
 import urllib.error
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 from datetime import datetime
 
+try:
+    import numpy as np
+except ImportError:  # Statistics fall back to pure Python
+    np = None
+
+from rate_limiter import RateLimitedError, RateLimiter
+
 MAGIC_EDEN_API = "https://api-mainnet.magiceden.dev/v2"
 
+# Crawler settings; the public API allows 120 requests per minute
+ME_RATE_LIMIT = 2.0  # Requests per second
+ME_MAX_WORKERS = 4
+ME_RETRIES = 4  # Attempts after a 429 response
+LISTINGS_PAGE_SIZE = 100  # Listings endpoint maximum
+ACTIVITIES_PAGE_SIZE = 500
+MAX_LISTINGS = 10000
+DEFAULT_ACTIVITY_LIMIT = 1000
+MAX_ACTIVITY_LIMIT = 10000
+
+CACHE_TTL = 300  # Seconds a crawl is reused
+CACHE_DIR_ENV = "MAGIC_EDEN_CACHE_DIR"
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "spoon-skills", "magiceden")
+
+# Listing depth is reported at these distances above the floor
+DEPTH_LEVELS = (0.05, 0.10, 0.25, 0.50)
+# A price bucket of this width (fraction of floor) holding this many times the
+# average of the two buckets on either side, and at least WALL_MIN_LISTINGS
+# listings, is a wall
+WALL_BUCKET = 0.02
+WALL_FACTOR = 2.0
+WALL_MIN_LISTINGS = 5
+
 # Popular collections
 POPULAR_COLLECTIONS = {
     "mad_lads": "madlads",
@@ -40,49 +74,211 @@ def fetch_json(url: str) -> dict:
     except urllib.error.HTTPError as e:
         if e.code == 404:
             raise ValueError("Collection not found")
+        if e.code == 429:
+            retry_after = e.headers.get("Retry-After")
+            raise RateLimitedError("API error: 429", float(retry_after) if retry_after and retry_after.isdigit() else None)
         raise ConnectionError(f"API error: {e.code}")
     except urllib.error.URLError as e:
         raise ConnectionError(f"Failed to fetch data: {e}")
 
 
-def get_collection_stats(collection_symbol: str) -> Dict:
-    """Get collection statistics from Magic Eden"""
-    url = f"{MAGIC_EDEN_API}/collections/{collection_symbol}/stats"
-
-    try:
-        data = fetch_json(url)
-    except ValueError:
-        # Try normalized symbol
-        normalized = POPULAR_COLLECTIONS.get(collection_symbol.lower(), collection_symbol)
-        if normalized != collection_symbol:
-            url = f"{MAGIC_EDEN_API}/collections/{normalized}/stats"
-            data = fetch_json(url)
-        else:
-            raise
-
-    return data
+def fetch_json_limited(url: str, limiter: RateLimiter) -> dict:
+    """fetch_json under a shared rate limit, backing off and retrying on 429"""
+    for attempt in range(ME_RETRIES + 1):
+        limiter.wait()
+        try:
+            return fetch_json(url)
+        except RateLimitedError as e:
+            if attempt == ME_RETRIES:
+                raise
+            time.sleep(e.retry_after or 2 ** attempt)
+
+
+def fetch_pages(endpoint: str, page_size: int, limit: int, limiter: RateLimiter,
+                expected: Optional[int] = None) -> List[Dict]:
+    """All items of an offset-paginated endpoint, up to limit.
+
+    Pages covering the expected count are requested concurrently; after
+    that, pages are read one at a time until a short page marks the end,
+    so a stale count never truncates the crawl.
+    """
+    limit = max(1, limit)
+    separator = "&" if "?" in endpoint else "?"
+
+    def page(offset: int) -> List[Dict]:
+        size = min(page_size, limit - offset)
+        data = fetch_json_limited(f"{endpoint}{separator}offset={offset}&limit={size}", limiter)
+        return data if isinstance(data, list) else []
 
+    target = min(limit, expected if expected is not None else page_size)
+    offsets = list(range(0, max(target, 1), page_size))
+    with ThreadPoolExecutor(max_workers=ME_MAX_WORKERS) as pool:
+        pages = list(pool.map(page, offsets))
+
+    items = [item for chunk in pages for item in chunk]
+    offset = offsets[-1] + page_size
+    last = pages[-1]
+    while len(last) == min(page_size, limit - offsets[-1]) and offset < limit:
+        last = page(offset)
+        items.extend(last)
+        offsets.append(offset)
+        offset += page_size
+    return items[:limit]
+
+
+class CrawlCache:
+    """Per-collection crawl results on disk, reused for a TTL"""
+
+    def __init__(self, ttl: float = CACHE_TTL, cache_dir: Optional[str] = None):
+        self.ttl = ttl
+        self.cache_dir = cache_dir or os.getenv(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR
+
+    def _path(self, symbol: str) -> str:
+        return os.path.join(self.cache_dir, f"{symbol}.json")
+
+    def get(self, symbol: str, activity_limit: int) -> Optional[Dict]:
+        if self.ttl <= 0:
+            return None
+        try:
+            with open(self._path(symbol), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if time.time() - entry.get("fetched_at", 0) > self.ttl or entry.get("activity_limit", 0) < activity_limit:
+            return None
+        return entry
+
+    def put(self, symbol: str, entry: Dict):
+        """Store a crawl; best effort, an unwritable cache directory only loses the entry"""
+        if self.ttl <= 0:
+            return
+        path = self._path(symbol)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+
+def crawl_collection(symbol: str, activity_limit: int = DEFAULT_ACTIVITY_LIMIT,
+                     cache_ttl: float = CACHE_TTL, rate_limit: float = ME_RATE_LIMIT) -> Dict:
+    """Stats, every listing and the most recent activity for a collection.
+
+    Listings and sales are kept compactly (price in lamports plus the few
+    fields the analysis uses) and cached per collection for cache_ttl seconds.
+    """
+    activity_limit = max(1, min(activity_limit, MAX_ACTIVITY_LIMIT))
+    cache = CrawlCache(cache_ttl)
+    cached = cache.get(symbol, activity_limit)
+    if cached:
+        cached["cached"] = True
+        return cached
+
+    limiter = RateLimiter(rate_limit)
+    stats = fetch_json_limited(f"{MAGIC_EDEN_API}/collections/{symbol}/stats", limiter)
+    listed_count = stats.get("listedCount") or 0
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        listings_job = pool.submit(fetch_pages, f"{MAGIC_EDEN_API}/collections/{symbol}/listings",
+                                   LISTINGS_PAGE_SIZE, MAX_LISTINGS, limiter, listed_count)
+        activities_job = pool.submit(fetch_pages, f"{MAGIC_EDEN_API}/collections/{symbol}/activities",
+                                     ACTIVITIES_PAGE_SIZE, activity_limit, limiter, activity_limit)
+        listings, activities = listings_job.result(), activities_job.result()
+
+    entry = {
+        "symbol": symbol,
+        "fetched_at": time.time(),
+        "activity_limit": activity_limit,
+        "stats": stats,
+        "listings": [
+            {"price": int(l["price"] * 1e9), "seller": l.get("seller", "")}
+            for l in listings if l.get("price")
+        ],
+        "sales": [
+            {"price": int(a["price"] * 1e9), "buyer": a.get("buyer", ""), "blockTime": a.get("blockTime")}
+            for a in activities if a.get("type") == "buyNow" and a.get("price")
+        ],
+        "activity_count": len(activities)
+    }
+    cache.put(symbol, entry)
+    entry["cached"] = False
+    return entry
 
-def get_collection_listings(collection_symbol: str, limit: int = 10) -> List[Dict]:
-    """Get current listings for a collection"""
-    url = f"{MAGIC_EDEN_API}/collections/{collection_symbol}/listings?limit={limit}"
 
-    try:
-        data = fetch_json(url)
-        return data if isinstance(data, list) else []
-    except:
+def percentiles(sorted_prices: List[float], points=(10, 25, 50, 75, 90)) -> Dict[str, float]:
+    """Linear-interpolated percentiles of ascending prices"""
+    if not sorted_prices:
+        return {}
+    if np is not None:
+        values = np.percentile(np.asarray(sorted_prices), points)
+    else:
+        values = []
+        last = len(sorted_prices) - 1
+        for point in points:
+            rank = last * point / 100
+            low = int(rank)
+            high = min(low + 1, last)
+            values.append(sorted_prices[low] + (sorted_prices[high] - sorted_prices[low]) * (rank - low))
+    return {f"p{point}": round(float(value), 4) for point, value in zip(points, values)}
+
+
+def listing_depth(sorted_prices: List[float], floor: float) -> List[Dict]:
+    """Listings and SOL needed to sweep the book up to each level above the floor"""
+    if not sorted_prices:
         return []
+    if np is not None:
+        prices = np.asarray(sorted_prices)
+        cumulative = np.cumsum(prices)
+        counts = np.searchsorted(prices, [floor * (1 + level) for level in DEPTH_LEVELS], side="right")
+    else:
+        cumulative, total = [], 0.0
+        for price in sorted_prices:
+            total += price
+            cumulative.append(total)
+        counts = [bisect.bisect_right(sorted_prices, floor * (1 + level)) for level in DEPTH_LEVELS]
+    return [
+        {
+            "within_pct": int(level * 100),
+            "max_price": round(floor * (1 + level), 4),
+            "listings": int(count),
+            "sweep_cost_sol": round(float(cumulative[count - 1]), 4) if count else 0
+        }
+        for level, count in zip(DEPTH_LEVELS, counts)
+    ]
 
 
-def get_collection_activities(collection_symbol: str, limit: int = 10) -> List[Dict]:
-    """Get recent activities for a collection"""
-    url = f"{MAGIC_EDEN_API}/collections/{collection_symbol}/activities?limit={limit}"
-
-    try:
-        data = fetch_json(url)
-        return data if isinstance(data, list) else []
-    except:
+def listing_walls(sorted_prices: List[float], floor: float) -> List[Dict]:
+    """Price buckets between the floor and twice the floor where listings pile up"""
+    if not sorted_prices or floor <= 0:
         return []
+    width = floor * WALL_BUCKET
+    buckets = int(1 / WALL_BUCKET)
+    if np is not None:
+        prices = np.asarray(sorted_prices)
+        indices = ((prices[prices < floor * 2] - floor) // width).astype(int)
+        counts = np.bincount(indices[indices >= 0], minlength=buckets)[:buckets].tolist()
+    else:
+        counts = [0] * buckets
+        for price in sorted_prices:
+            index = int((price - floor) // width)
+            if 0 <= index < buckets:
+                counts[index] += 1
+
+    walls = []
+    for i, count in enumerate(counts):
+        if count < WALL_MIN_LISTINGS:
+            continue
+        neighbours = counts[max(0, i - 2):i] + counts[i + 1:i + 3]
+        if count >= WALL_FACTOR * sum(neighbours) / len(neighbours):
+            walls.append({
+                "price_from": round(floor + i * width, 4),
+                "price_to": round(floor + (i + 1) * width, 4),
+                "listings": count
+            })
+    return walls
 
 
 def format_sol_price(lamports: int) -> float:
@@ -90,19 +286,16 @@ def format_sol_price(lamports: int) -> float:
     return lamports / 1e9 if lamports else 0
 
 
-def analyze_collection(collection: str) -> Dict:
-    """Comprehensive collection analysis"""
+def analyze_collection(collection: str, activity_limit: int = DEFAULT_ACTIVITY_LIMIT,
+                       cache_ttl: float = CACHE_TTL) -> Dict:
+    """Comprehensive collection analysis over every listing and recent activity"""
     # Normalize collection name
     symbol = POPULAR_COLLECTIONS.get(collection.lower(), collection.lower())
 
-    # Get stats
-    stats = get_collection_stats(symbol)
-
-    # Get listings
-    listings = get_collection_listings(symbol, 20)
-
-    # Get activities
-    activities = get_collection_activities(symbol, 10)
+    crawl = crawl_collection(symbol, activity_limit, cache_ttl)
+    stats = crawl["stats"]
+    listings = sorted(crawl["listings"], key=lambda l: l["price"])
+    recent_sales = sorted(crawl["sales"], key=lambda s: s.get("blockTime") or 0, reverse=True)
 
     # Parse stats
     floor_price = format_sol_price(stats.get("floorPrice", 0))
@@ -111,13 +304,13 @@ def analyze_collection(collection: str) -> Dict:
     avg_price_24h = format_sol_price(stats.get("avgPrice24hr", 0))
 
     # Analyze listings
-    listing_prices = [format_sol_price(l.get("price", 0)) for l in listings if l.get("price")]
-    min_listing = min(listing_prices) if listing_prices else floor_price
-    max_listing_top10 = max(listing_prices[:10]) if listing_prices else floor_price
+    listing_prices = [format_sol_price(l["price"]) for l in listings]
+    min_listing = listing_prices[0] if listing_prices else floor_price
+    max_listing_top10 = listing_prices[min(9, len(listing_prices) - 1)] if listing_prices else floor_price
+    book_floor = min_listing or floor_price
 
     # Analyze activities
-    recent_sales = [a for a in activities if a.get("type") == "buyNow"]
-    sale_prices = [format_sol_price(s.get("price", 0)) for s in recent_sales]
+    sale_prices = sorted(format_sol_price(s["price"]) for s in recent_sales)
 
     return {
         "success": True,
@@ -137,16 +330,22 @@ def analyze_collection(collection: str) -> Dict:
             "floor_listing": round(min_listing, 4),
             "price_range": {
                 "min": round(min_listing, 4),
-                "max_top10": round(max_listing_top10, 4)
-            }
+                "max_top10": round(max_listing_top10, 4),
+                "max": round(listing_prices[-1], 4) if listing_prices else 0
+            },
+            "percentiles": percentiles(listing_prices),
+            "depth": listing_depth(listing_prices, book_floor),
+            "walls": listing_walls(listing_prices, book_floor)
         },
         "recent_activity": {
+            "activities_scanned": crawl["activity_count"],
             "sales_count": len(recent_sales),
             "avg_sale_price": round(sum(sale_prices) / len(sale_prices), 4) if sale_prices else 0,
+            "sale_percentiles": percentiles(sale_prices),
             "recent_sales": [
                 {
-                    "price_sol": round(format_sol_price(s.get("price", 0)), 4),
-                    "buyer": s.get("buyer", "")[:8] + "..." if s.get("buyer") else "Unknown",
+                    "price_sol": round(format_sol_price(s["price"]), 4),
+                    "buyer": s["buyer"][:8] + "..." if s.get("buyer") else "Unknown",
                     "timestamp": s.get("blockTime")
                 }
                 for s in recent_sales[:5]
@@ -156,6 +355,11 @@ def analyze_collection(collection: str) -> Dict:
             "liquidity": "HIGH" if listed_count > 100 else "MEDIUM" if listed_count > 20 else "LOW",
             "price_trend": "STABLE",  # Would need historical data for accurate trend
             "recommendation": get_market_recommendation(floor_price, listed_count, len(recent_sales))
+        },
+        "crawl": {
+            "cached": crawl["cached"],
+            "fetched_at": datetime.utcfromtimestamp(crawl["fetched_at"]).isoformat(),
+            "numpy": np is not None
         }
     }
 
@@ -230,7 +434,8 @@ def main():
         elif action == "nft" and mint:
             result = get_nft_by_mint(mint)
         elif collection:
-            result = analyze_collection(collection)
+            activity_limit = max(1, min(int(input_data.get("activity_limit", DEFAULT_ACTIVITY_LIMIT)), MAX_ACTIVITY_LIMIT))
+            result = analyze_collection(collection, activity_limit, float(input_data.get("cache_ttl", CACHE_TTL)))
         else:
             result = get_top_collections()
 
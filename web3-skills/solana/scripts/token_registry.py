@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Solana Token Registry
+Mint metadata and symbol lookups via a bundled, mmap-indexed binary file
+
+File layout (all integers little-endian):
+    header   magic b"SPLT", uint32 version, uint32 token count,
+             uint32 symbol index offset, uint32 strings offset
+    records  sorted by mint, 52 bytes each: mint[44] (ASCII, NUL padded),
+             uint8 decimals, 3 bytes padding, uint32 offset, uint32 length
+    symbols  uint32 record indices sorted by upper-case symbol, then list rank
+    strings  UTF-8 "symbol\\0name" pairs referenced by the records
+
+Rebuild the bundled file with:
+    python token_registry.py data/tokens.csv [jupiter_tokens.json ...]
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from typing import Dict, Iterable, Optional, Tuple
+
+MAGIC = b"SPLT"
+VERSION = 1
+HEADER = struct.Struct("<4sIIII")
+RECORD = struct.Struct("<44sB3xII")
+INDEX = struct.Struct("<I")
+
+REGISTRY_PATH_ENV = "SOLANA_TOKEN_REGISTRY"
+DEFAULT_REGISTRY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "tokens.bin")
+
+MINT_WIDTH = 44
+
+
+class TokenRegistry:
+    """Read-only mint and symbol lookups that binary-search the mapped file"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count, symbols_offset, strings_offset = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"Not a token registry: {path}")
+
+        self.count = count
+        self._symbols_offset = symbols_offset
+        self._strings_offset = strings_offset
+
+    def _mint_at(self, index: int) -> bytes:
+        start = HEADER.size + index * RECORD.size
+        return self._mm[start:start + MINT_WIDTH]
+
+    def _entry(self, index: int) -> Dict:
+        mint, decimals, offset, length = RECORD.unpack_from(self._mm, HEADER.size + index * RECORD.size)
+        start = self._strings_offset + offset
+        symbol, _, name = self._mm[start:start + length].decode().partition("\0")
+        return {"mint": mint.rstrip(b"\0").decode(), "symbol": symbol, "name": name, "decimals": decimals}
+
+    def _symbol_at(self, position: int) -> str:
+        index = INDEX.unpack_from(self._mm, self._symbols_offset + position * INDEX.size)[0]
+        _, _, offset, length = RECORD.unpack_from(self._mm, HEADER.size + index * RECORD.size)
+        start = self._strings_offset + offset
+        return self._mm[start:start + length].decode().partition("\0")[0].upper()
+
+    def get(self, mint: str) -> Optional[Dict]:
+        """Metadata for a mint address: symbol, name and decimals"""
+        key = mint.encode().ljust(MINT_WIDTH, b"\0")
+        if len(key) != MINT_WIDTH:
+            return None
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._mint_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self._mint_at(lo) == key:
+            return self._entry(lo)
+        return None
+
+    def find_symbol(self, symbol: str) -> Optional[Dict]:
+        """Highest-ranked token with this symbol (case-insensitive)"""
+        target = symbol.upper()
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._symbol_at(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self._symbol_at(lo) == target:
+            index = INDEX.unpack_from(self._mm, self._symbols_offset + lo * INDEX.size)[0]
+            return self._entry(index)
+        return None
+
+    def close(self):
+        self._mm.close()
+
+
+_registry: Optional[TokenRegistry] = None
+_registry_loaded = False
+
+
+def get_registry() -> Optional[TokenRegistry]:
+    """Open the token registry on first use; None if the file is missing"""
+    global _registry, _registry_loaded
+    if not _registry_loaded:
+        _registry_loaded = True
+        try:
+            _registry = TokenRegistry(os.getenv(REGISTRY_PATH_ENV) or DEFAULT_REGISTRY_PATH)
+        except (OSError, ValueError):
+            _registry = None
+    return _registry
+
+
+def lookup_mint(mint: str) -> Optional[Dict]:
+    """Registry metadata for a mint, or None"""
+    registry = get_registry()
+    return registry.get(mint) if registry else None
+
+
+def lookup_symbol(symbol: str) -> Optional[Dict]:
+    """Registry metadata for the best-known token with a symbol, or None"""
+    registry = get_registry()
+    return registry.find_symbol(symbol) if registry else None
+
+
+def read_token_file(path: str) -> Iterable[Tuple[str, str, str, int]]:
+    """Yield (mint, symbol, name, decimals) from a CSV list or a Jupiter token list export.
+
+    CSV rows are "mint,symbol,decimals,name". JSON exports may be a list of
+    tokens or an object with a "tokens" list, using either "address" or "id"
+    for the mint.
+    """
+    import csv  # Only needed when building
+
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            data = json.load(f)
+            tokens = data.get("tokens", []) if isinstance(data, dict) else data
+            for token in tokens:
+                mint = token.get("address") or token.get("id")
+                decimals = token.get("decimals")
+                if mint and token.get("symbol") and isinstance(decimals, int):
+                    yield mint, token["symbol"], token.get("name", ""), decimals
+            return
+
+        for row in csv.reader(line for line in f if line.strip() and not line.startswith("#")):
+            if len(row) >= 3:
+                yield row[0].strip(), row[1].strip(), ",".join(row[3:]).strip(), int(row[2])
+
+
+def build_registry(tokens: Iterable[Tuple[str, str, str, int]], path: str) -> int:
+    """Write a registry file; earlier tokens win duplicate mints and rank first per symbol"""
+    entries = {}
+    for rank, (mint, symbol, name, decimals) in enumerate(tokens):
+        if mint not in entries and 32 <= len(mint) <= MINT_WIDTH and 0 <= decimals <= 255 and "\0" not in symbol:
+            entries[mint] = (rank, symbol, name.replace("\0", ""), decimals)
+
+    mints = sorted(entries, key=lambda m: m.encode().ljust(MINT_WIDTH, b"\0"))
+
+    strings = bytearray()
+    records = bytearray()
+    for mint in mints:
+        _, symbol, name, decimals = entries[mint]
+        encoded = f"{symbol}\0{name}".encode()
+        records += RECORD.pack(mint.encode(), decimals, len(strings), len(encoded))
+        strings += encoded
+
+    symbol_order = sorted(range(len(mints)), key=lambda i: (entries[mints[i]][1].upper(), entries[mints[i]][0]))
+    symbols = b"".join(INDEX.pack(i) for i in symbol_order)
+
+    symbols_offset = HEADER.size + len(records)
+    strings_offset = symbols_offset + len(symbols)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(mints), symbols_offset, strings_offset))
+        f.write(records)
+        f.write(symbols)
+        f.write(strings)
+    os.replace(tmp_path, path)
+
+    return len(mints)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: token_registry.py TOKENS [TOKENS ...]", file=sys.stderr)
+        sys.exit(1)
+
+    def tokens():
+        for source in sys.argv[1:]:
+            yield from read_token_file(source)
+
+    count = build_registry(tokens(), DEFAULT_REGISTRY_PATH)
+    print(f"Wrote {count} tokens to {DEFAULT_REGISTRY_PATH}")
+
+
+if __name__ == "__main__":
+    main()